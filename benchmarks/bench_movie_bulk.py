@@ -0,0 +1,64 @@
+"""영화 일괄 저장 벤치마크: /movie/save 방식(건별 find_one + save)과 bulk upsert 비교
+
+DB_IP, DB_PORT, DB_PASSWORD로 지정한 MongoDB에 임시 데이터베이스를 만들어 측정 후 삭제한다.
+
+사용법:
+    python -m benchmarks.bench_movie_bulk --count 10000
+"""
+import argparse
+import asyncio
+import time
+from odmantic import AIOEngine
+from src.final_backend.database import get_client, close_db
+from src.final_backend.index_manager import ensure_indexes
+from src.final_backend.movie_crud import save_movie_to_db, bulk_upsert_movies
+
+BENCH_DB_NAME = "bench_movie_bulk"
+
+
+def sample_movie(movie_id: int) -> dict:
+    return {
+        "movie_id": movie_id,
+        "title": f"movie {movie_id}",
+        "original_title": f"movie {movie_id}",
+        "overview": "overview " * 20,
+        "poster_path": f"/{movie_id}.jpg",
+        "original_language": "ko",
+        "genres": [18, 35],
+        "release_date": "2024-01-01",
+        "cast": [{"id": i, "name": f"actor {i}"} for i in range(8)],
+        "director": {"id": 1, "name": "director"},
+    }
+
+
+async def movie_stream(count: int):
+    for movie_id in range(count):
+        yield sample_movie(movie_id)
+
+
+async def main(args):
+    client = get_client()
+    await client.drop_database(BENCH_DB_NAME)
+    engine = AIOEngine(client=client, database=BENCH_DB_NAME)
+    await ensure_indexes(engine)
+    try:
+        started = time.perf_counter()
+        for movie_id in range(args.count):
+            await save_movie_to_db(engine, sample_movie(movie_id))
+        per_item = time.perf_counter() - started
+        print(f"per-item save : {args.count:,} movies in {per_item:7.2f}s ({args.count / per_item:8.0f}/s)")
+
+        await engine.database["movie"].delete_many({})
+        started = time.perf_counter()
+        result = await bulk_upsert_movies(engine, movie_stream(args.count))
+        bulk = time.perf_counter() - started
+        print(f"bulk upsert   : {args.count:,} movies in {bulk:7.2f}s ({args.count / bulk:8.0f}/s) inserted={result['inserted']}")
+    finally:
+        await client.drop_database(BENCH_DB_NAME)
+        close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10_000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,135 @@
+"""`/movie/list` 처리 CPU 벤치마크: 변경 전 ODMantic 모델 변환과 현재 `fetch_movies_by_ids` 비교
+
+DB 왕복 시간은 제외하고 드라이버가 반환한 문서를 응답으로 만드는 CPU 시간만 측정한다.
+DB 대신 미리 만든 문서를 돌려주는 컬렉션 stub을 엔진에 연결해 두 함수를 그대로 호출한다
+(projection은 서버에서 적용되므로 stub은 find에 projection이 있으면 카드 필드만 남긴 문서를 반환).
+
+사용법:
+    python -m benchmarks.bench_movie_list --sizes 20 200
+"""
+import argparse
+import asyncio
+import logging
+import time
+from bson import ObjectId
+from odmantic import AIOEngine
+from src.final_backend.models import Movie
+from src.final_backend.movie_crud import fetch_movies_by_ids
+
+
+def full_doc(movie_id: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "movie_id": movie_id,
+        "title": f"movie {movie_id}",
+        "original_title": f"movie {movie_id}",
+        "overview": "overview " * 60,
+        "poster_path": f"/{movie_id}.jpg",
+        "original_language": "ko",
+        "genres": [18, 35],
+        "release_date": "2024-01-01",
+        "cast": [{"id": i, "name": f"actor {i}", "character": f"role {i}"} for i in range(8)],
+        "director": {"id": 1, "name": "director"},
+    }
+
+
+def projected_doc(doc: dict) -> dict:
+    return {
+        "movie_id": doc["movie_id"],
+        "title": doc["title"],
+        "genres": doc["genres"],
+        "director": {"name": doc["director"]["name"]},
+        "poster_path": doc["poster_path"],
+        "cast": [{"name": member["name"]} for member in doc["cast"]],
+    }
+
+
+class StubCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+class StubCollection:
+    """Motor 컬렉션 대신 미리 만든 문서를 반환"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.projected = [projected_doc(doc) for doc in docs]
+
+    def find(self, query, projection=None):
+        return StubCursor(self.projected if projection else self.docs)
+
+    def aggregate(self, pipeline, session=None):
+        # engine.find(Movie, ...)가 사용하는 경로
+        return StubCursor(self.docs)
+
+
+class StubEngine(AIOEngine):
+    def __init__(self, docs):
+        self.collection = StubCollection(docs)
+
+    def get_collection(self, model):
+        return self.collection
+
+    def _get_session(self, session):
+        return None
+
+
+async def before(engine: AIOEngine, movie_ids):
+    # 변경 전 fetch_movies_by_ids (전체 문서 조회 후 모델 검증, debug 로그용 f-string 포맷)
+    logging.debug(f"Start fetching movies with IDs: {movie_ids}")
+    movies = await engine.find(Movie, Movie.movie_id.in_(movie_ids))
+    logging.debug(f"Fetched raw movies data: {movies}")
+    processed = [
+        {
+            "movie_id": movie.movie_id,
+            "title": movie.title,
+            "genres": movie.genres,
+            "director": movie.director.get("name") if movie.director else None,
+            "poster_path": movie.poster_path,
+            "cast": [member.get("name") for member in movie.cast] if movie.cast else [],
+        }
+        for movie in movies
+    ]
+    logging.debug(f"Processed movies data: {processed}")
+    return processed
+
+
+async def after(engine: AIOEngine, movie_ids):
+    movies, _ = await fetch_movies_by_ids(engine, movie_ids)
+    return movies
+
+
+async def measure(func, engine, movie_ids, rounds: int) -> float:
+    started = time.process_time()
+    for _ in range(rounds):
+        await func(engine, movie_ids)
+    return (time.process_time() - started) / rounds * 1e6
+
+
+async def main(args):
+    for size in args.sizes:
+        movie_ids = list(range(size))
+        engine = StubEngine([full_doc(movie_id) for movie_id in movie_ids])
+        assert await before(engine, movie_ids) == await after(engine, movie_ids)
+        before_us = await measure(before, engine, movie_ids, args.rounds)
+        after_us = await measure(after, engine, movie_ids, args.rounds)
+        print(f"ids={size:>4}  before={before_us:9.1f}us/call  after={after_us:8.1f}us/call  ({before_us / after_us:4.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 200])
+    parser.add_argument("--rounds", type=int, default=500)
+    logging.basicConfig(level=logging.INFO)  # 운영 환경처럼 debug 로그는 꺼진 상태
+    asyncio.run(main(parser.parse_args()))
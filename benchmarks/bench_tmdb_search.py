@@ -0,0 +1,73 @@
+"""`/tmdb/search` 세부 정보 보강 벤치마크 (지연을 추가한 가짜 TMDb 사용)
+
+사용법:
+    python -m benchmarks.bench_tmdb_search --delay-ms 50 --limit 10
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from src.final_backend.router import tmdb_router
+from src.final_backend.tmdb_cache import tmdb_cache
+
+
+def fake_tmdb(delay_seconds: float, limit: int):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay_seconds)
+        path = request.url.path
+        if path.endswith("/search/movie"):
+            return httpx.Response(200, json={"results": [{"id": i, "title": f"movie {i}"} for i in range(limit)]})
+        credits = {
+            "cast": [{"id": i, "name": f"actor {i}", "character": "role"} for i in range(10)],
+            "crew": [{"id": 99, "name": "director", "job": "Director"}],
+        }
+        if path.endswith("/credits"):
+            return httpx.Response(200, json=credits)
+        return httpx.Response(200, json={
+            "genres": [{"id": 1, "name": "드라마"}],
+            "production_countries": [{"name": "Korea"}],
+            "credits": credits,
+        })
+
+    return httpx.MockTransport(handler)
+
+
+async def legacy_search(client: httpx.AsyncClient, limit: int):
+    # 변경 전 방식: 영화마다 credits, details를 순서대로 요청
+    response = await client.get(f"{tmdb_router.TMDB_BASE_URL}/search/movie")
+    for movie in response.json()["results"][:limit]:
+        await client.get(f"{tmdb_router.TMDB_BASE_URL}/movie/{movie['id']}/credits")
+        await client.get(f"{tmdb_router.TMDB_BASE_URL}/movie/{movie['id']}")
+
+
+async def measure(label: str, search, rounds: int):
+    latencies = []
+    for _ in range(rounds):
+        # 캐시 없이 upstream 지연만 측정
+        tmdb_cache.clear()
+        started = time.perf_counter()
+        await search()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    print(f"{label:<28} p50={latencies[len(latencies) // 2] * 1000:8.1f}ms")
+
+
+async def main(args):
+    transport = fake_tmdb(args.delay_ms / 1000, args.limit)
+    async with httpx.AsyncClient(transport=transport) as client:
+        await measure("legacy (2N sequential)", lambda: legacy_search(client, args.limit), args.rounds)
+        for concurrency in (1, tmdb_router.TMDB_ENRICH_CONCURRENCY):
+            tmdb_router.TMDB_ENRICH_CONCURRENCY = concurrency
+            await measure(
+                f"concurrent (limit={concurrency})",
+                lambda: tmdb_router.search_and_enrich(client, "q", args.limit),
+                args.rounds,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay-ms", type=float, default=50)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
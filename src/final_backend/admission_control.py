@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Dict
+from starlette import status
+from starlette.responses import JSONResponse
+
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+# 경로별 `동시 실행 수:대기열 크기` (쉼표로 구분)
+ADMISSION_ROUTES = os.getenv(
+    "ADMISSION_ROUTES",
+    "/user/login=8:32,/tmdb/search=4:16,/similarity/details=8:32",
+)
+# 대기열에서 이 시간(초)보다 오래 기다리면 실행하지 않고 503
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "2"))
+
+
+def parse_routes(spec: str) -> Dict[str, tuple]:
+    routes = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        path, limits = item.strip().rsplit("=", 1)
+        concurrency, max_queue = limits.split(":")
+        routes[path] = (int(concurrency), int(max_queue))
+    return routes
+
+
+class RouteGate:
+    """경로 하나의 동시 실행 수 제한과 FIFO 대기열
+
+    실행 중인 요청이 끝나면 대기 중인 첫 요청에게 바로 슬롯을 넘긴다.
+    """
+
+    def __init__(self, path: str, concurrency: int, max_queue: int, max_wait: float = ADMISSION_MAX_WAIT_SECONDS):
+        self.path = path
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters: deque = deque()
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.max_waiting = 0
+        # 최근 처리 시간 지수 이동 평균 (Retry-After 계산용)
+        self.avg_service_seconds = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.max_waiting = max(self.max_waiting, len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # 시간 초과와 동시에 슬롯을 넘겨받은 경우 다음 요청에게 다시 넘김
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected_timeout += 1
+                return False
+            raise
+        self.admitted += 1
+        return True
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def record(self, seconds: float):
+        self.avg_service_seconds = seconds if not self.avg_service_seconds else (
+            0.9 * self.avg_service_seconds + 0.1 * seconds
+        )
+
+    def retry_after(self) -> int:
+        # 대기열이 모두 처리되는 데 걸리는 예상 시간
+        backlog = (self.waiting + 1) / self.concurrency
+        return max(1, math.ceil(backlog * self.avg_service_seconds))
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_service_ms": round(self.avg_service_seconds * 1000, 3),
+        }
+
+
+class AdmissionController:
+    """비용이 큰 경로(bcrypt 로그인, TMDB 검색, 유사도 상세)의 동시 실행 수를 제한해
+    트래픽이 몰려도 나머지 API 지연 시간이 함께 늘어나지 않도록 초과 요청을 미리 503으로 거절
+    """
+
+    def __init__(self, routes: Dict[str, tuple], enabled: bool = ADMISSION_CONTROL_ENABLED):
+        self.enabled = enabled
+        self.gates = {path: RouteGate(path, *limits) for path, limits in routes.items()}
+
+    def gate_for(self, path: str):
+        if not self.enabled:
+            return None
+        return self.gates.get(path.rstrip("/") or "/")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "routes": {path: gate.stats() for path, gate in self.gates.items()},
+        }
+
+
+class AdmissionControlMiddleware:
+    """요청 경로에 해당하는 RouteGate가 있으면 슬롯을 얻은 뒤에만 실행 (ASGI 미들웨어)"""
+
+    def __init__(self, app, controller: "AdmissionController" = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope, receive, send):
+        gate = self.controller.gate_for(scope["path"]) if scope["type"] == "http" else None
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+        if not await gate.acquire():
+            logging.warning(f"Admission rejected {gate.path} (active={gate.active}, waiting={gate.waiting})")
+            response = JSONResponse(
+                {"detail": "요청이 많아 잠시 후 다시 시도해 주세요."},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(gate.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.record(time.perf_counter() - started)
+            gate.release()
+
+
+admission_controller = AdmissionController(parse_routes(ADMISSION_ROUTES))
@@ -0,0 +1,70 @@
+import os
+import time
+from typing import Dict, Optional, Set
+from src.final_backend.models import User
+from src.final_backend.ttl_cache import TTLCache
+
+# 토큰 → 사용자 캐시 유지 시간(초)
+# 여러 워커 실행 시 다른 워커의 변경은 이 시간 안에 반영되므로 짧게 유지
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "30"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+
+class PrincipalCache:
+    """검증된 bearer 토큰에서 사용자 문서로 가는 캐시
+
+    - 만료 시간은 AUTH_CACHE_TTL과 토큰 exp 중 빠른 쪽
+    - 요청마다 원본 문서로 새 User 객체를 만들어 요청 간에 객체를 공유하지 않음
+    - 회원정보/비밀번호 변경, 탈퇴 시 invalidate_user()로 해당 이메일의 토큰을 모두 제거
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL, max_entries: int = AUTH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self._cache = TTLCache(ttl, max_entries, on_remove=self._forget_token)
+        self._tokens_by_email: Dict[str, Set[str]] = {}
+        self.invalidations = 0
+
+    def _forget_token(self, token: str, entry: tuple):
+        tokens = self._tokens_by_email.get(entry[0])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_email[entry[0]]
+
+    def get(self, token: str) -> Optional[User]:
+        entry = self._cache.get(token)
+        if entry is None:
+            return None
+        return User.model_validate_doc(entry[1])
+
+    def set(self, token: str, user: User, token_exp: Optional[float] = None):
+        ttl = self.ttl
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        self._cache.set(token, (user.email, user.model_dump_doc()), ttl)
+        if token in self._cache:
+            self._tokens_by_email.setdefault(user.email, set()).add(token)
+
+    def invalidate_user(self, email: str):
+        tokens = self._tokens_by_email.get(email)
+        if not tokens:
+            return
+        self.invalidations += 1
+        for token in list(tokens):
+            self._cache.pop(token)
+
+    def clear(self):
+        self._cache.clear()
+        self._tokens_by_email.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self._cache.stats(),
+            "users": len(self._tokens_by_email),
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache()
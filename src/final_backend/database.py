@@ -1,12 +1,157 @@
 import os
+import threading
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from odmantic import AIOEngine
+from pymongo import monitoring
 
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_IP = os.getenv("DB_IP")
 DB_PORT = os.getenv("DB_PORT")
 DATABASE_URL = f"mongodb://root:{DB_PASSWORD}@{DB_IP}:{DB_PORT}"
 
-# MongoDB와 연결 설정
-client = AsyncIOMotorClient(DATABASE_URL)
-engine = AIOEngine(client=client, database="cinetalk")
+DB_NAME = "cinetalk"
+CHAT_DB_NAME = "chat"
+
+# 커넥션 풀 설정 (환경 변수로 조정 가능)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000"))
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """커넥션 풀 이벤트를 집계해 풀 크기 산정에 필요한 지표를 제공"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open_connections = 0
+            self.checked_out = 0
+            self.max_checked_out = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.total_wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(0, self.open_connections - 1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+            self._record_wait(getattr(event, "duration", None))
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self._record_wait(getattr(event, "duration", None))
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def _record_wait(self, duration: Optional[float]):
+        if duration is None:
+            return
+        self.total_wait_seconds += duration
+        self.max_wait_seconds = max(self.max_wait_seconds, duration)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_wait = self.total_wait_seconds / self.checkouts if self.checkouts else 0.0
+            return {
+                "max_pool_size": MONGO_MAX_POOL_SIZE,
+                "min_pool_size": MONGO_MIN_POOL_SIZE,
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+pool_stats = PoolStats()
+
+# 앱 전체에서 공유하는 MongoDB 클라이언트 (lifespan에서 생성/종료)
+client: Optional[AsyncIOMotorClient] = None
+_engines: dict = {}
+
+
+def connect_db() -> AsyncIOMotorClient:
+    global client
+    if client is None:
+        client = AsyncIOMotorClient(
+            DATABASE_URL,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            event_listeners=[pool_stats],
+        )
+    return client
+
+
+def close_db():
+    global client
+    if client is not None:
+        client.close()
+        client = None
+    _engines.clear()
+    pool_stats.reset()
+
+
+def get_client() -> AsyncIOMotorClient:
+    # lifespan 밖(스크립트 등)에서 호출되면 지연 생성
+    return connect_db()
+
+
+def get_database(name: str = DB_NAME):
+    return get_client()[name]
+
+
+def _get_engine(database: str) -> AIOEngine:
+    engine = _engines.get(database)
+    if engine is None:
+        engine = AIOEngine(client=get_client(), database=database)
+        _engines[database] = engine
+    return engine
+
+
+# AIOEngine을 FastAPI 의존성으로 제공
+async def get_engine() -> AIOEngine:
+    return _get_engine(DB_NAME)
+
+
+async def get_chat_engine() -> AIOEngine:
+    return _get_engine(CHAT_DB_NAME)
@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import os
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import List, Optional, Tuple
+from odmantic import AIOEngine
+from pymongo import ReturnDocument
+from src.final_backend.models import EmailOutbox
+
+# SMTP 서버 설정 (로컬 테스트 시 aiosmtpd 등으로 대체 가능: SMTP_STARTTLS=false)
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "10"))
+# 이 시간 동안 보낼 메일이 없으면 SMTP 세션을 닫음 (서버의 idle timeout보다 짧게)
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "60"))
+EMAIL_FROM = os.getenv("EMAIL_FROM", "Cinemate")
+
+# 백그라운드 전송 워커 설정
+EMAIL_OUTBOX_ENABLED = os.getenv("EMAIL_OUTBOX_ENABLED", "true").lower() == "true"
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "5"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_OUTBOX_RETRY_BASE_SECONDS", "2"))
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_OUTBOX_RETRY_MAX_SECONDS", "300"))
+# 전송 중(sending) 상태로 이 시간이 지나면 워커가 죽은 것으로 보고 다시 가져감
+EMAIL_OUTBOX_LOCK_SECONDS = int(os.getenv("EMAIL_OUTBOX_LOCK_SECONDS", "600"))
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", "7"))
+
+# 전송이 끝난 기록에서 지우는 필드 (인증번호/임시 비밀번호가 DB에 남지 않도록)
+CLEARED_BODY = {"body_text": None, "body_html": None, "locked_at": None}
+
+
+def build_message(outbox: dict) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg["From"] = EMAIL_FROM
+    msg["To"] = outbox["to"]
+    msg["Subject"] = outbox["subject"]
+    if outbox.get("body_text"):
+        msg.attach(MIMEText(outbox["body_text"], "plain"))
+    if outbox.get("body_html"):
+        msg.attach(MIMEText(outbox["body_html"], "html"))
+    return msg
+
+
+def is_permanent_error(error: Exception) -> bool:
+    # 5xx 응답(수신자 거부 등)은 재시도해도 같은 결과
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    code = getattr(error, "smtp_code", None)
+    return isinstance(code, int) and 500 <= code < 600
+
+
+class SmtpSession:
+    """한 번 연결(STARTTLS + 로그인)한 SMTP 세션을 여러 메일에 재사용
+
+    전용 스레드 하나에서만 호출하므로 별도 잠금은 두지 않는다.
+    """
+
+    def __init__(self):
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.connects = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        try:
+            if SMTP_STARTTLS:
+                server.starttls()
+            if SMTP_USER:
+                server.login(SMTP_USER, SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        self.connects += 1
+        return server
+
+    def _ensure(self) -> smtplib.SMTP:
+        if self._server is not None and time.monotonic() - self._last_used > SMTP_IDLE_SECONDS:
+            self.close()
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+
+    def send(self, msg: MIMEMultipart):
+        try:
+            self._ensure().sendmail(EMAIL_FROM, [msg["To"]], msg.as_string())
+        except smtplib.SMTPServerDisconnected:
+            # 서버가 세션을 먼저 끊은 경우 한 번만 다시 연결해서 전송
+            self._server = None
+            self._ensure().sendmail(EMAIL_FROM, [msg["To"]], msg.as_string())
+        except smtplib.SMTPRecipientsRefused:
+            self._last_used = time.monotonic()
+            raise
+        except Exception:
+            self.close()
+            raise
+        self._last_used = time.monotonic()
+
+    def send_batch(self, outboxes: List[dict]) -> List[Tuple[dict, Optional[Exception]]]:
+        results = []
+        for outbox in outboxes:
+            try:
+                self.send(build_message(outbox))
+                results.append((outbox, None))
+            except Exception as e:
+                results.append((outbox, e))
+        return results
+
+    def close(self):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+
+class EmailOutboxWorker:
+    """email_outbox 컬렉션에 쌓인 메일을 백그라운드에서 묶어서 전송
+
+    - 요청 핸들러는 enqueue()로 문서 한 건만 저장하고 바로 반환
+    - 워커는 find_one_and_update로 메일을 선점하므로 여러 워커를 띄워도 중복 전송하지 않음
+    - 일시적 오류는 지수 백오프로 재시도, 영구 오류나 최대 횟수 초과 시 failed로 기록
+    """
+
+    def __init__(self, batch_size: int = EMAIL_OUTBOX_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.session = SmtpSession()
+        # SMTP 세션은 스레드 하나에서만 사용
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.running = False
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+        self.last_error: Optional[str] = None
+
+    def _notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def enqueue(
+        self,
+        engine: AIOEngine,
+        to: str,
+        subject: str,
+        kind: str,
+        body_text: Optional[str] = None,
+        body_html: Optional[str] = None,
+    ) -> EmailOutbox:
+        now = datetime.utcnow()
+        outbox = EmailOutbox(
+            to=to,
+            subject=subject,
+            kind=kind,
+            body_text=body_text,
+            body_html=body_html,
+            created_at=now,
+            next_attempt_at=now,
+        )
+        await engine.save(outbox)
+        self.enqueued += 1
+        self._notify()
+        return outbox
+
+    async def _claim_batch(self, collection) -> List[dict]:
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=EMAIL_OUTBOX_LOCK_SECONDS)
+        claimed = []
+        while len(claimed) < self.batch_size:
+            doc = await collection.find_one_and_update(
+                {
+                    "$or": [
+                        {"status": "pending", "next_attempt_at": {"$lte": now}},
+                        {"status": "sending", "locked_at": {"$lt": stale}},
+                    ]
+                },
+                {"$set": {"status": "sending", "locked_at": now}},
+                sort=[("next_attempt_at", 1)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc is None:
+                break
+            claimed.append(doc)
+        return claimed
+
+    def _retry_delay(self, attempts: int) -> float:
+        return min(
+            EMAIL_OUTBOX_RETRY_BASE_SECONDS * (2 ** (attempts - 1)),
+            EMAIL_OUTBOX_RETRY_MAX_SECONDS,
+        )
+
+    async def _record(self, collection, doc: dict, error: Optional[Exception]):
+        now = datetime.utcnow()
+        attempts = doc.get("attempts", 0) + 1
+        expires_at = now + timedelta(days=EMAIL_OUTBOX_RETENTION_DAYS)
+        if error is None:
+            self.sent += 1
+            update = {"status": "sent", "sent_at": now, "expires_at": expires_at, **CLEARED_BODY}
+        elif is_permanent_error(error) or attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS:
+            self.failed += 1
+            self.last_error = str(error)
+            logging.error(f"Email to {doc['to']} failed after {attempts} attempts: {error}")
+            update = {"status": "failed", "last_error": str(error), "expires_at": expires_at, **CLEARED_BODY}
+        else:
+            self.retried += 1
+            self.last_error = str(error)
+            update = {
+                "status": "pending",
+                "last_error": str(error),
+                "next_attempt_at": now + timedelta(seconds=self._retry_delay(attempts)),
+                "locked_at": None,
+            }
+        await collection.update_one({"_id": doc["_id"]}, {"$set": {"attempts": attempts, **update}})
+
+    async def process_batch(self, engine: AIOEngine) -> int:
+        collection = engine.get_collection(EmailOutbox)
+        batch = await self._claim_batch(collection)
+        if not batch:
+            return 0
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+        results = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.session.send_batch, batch
+        )
+        for doc, error in results:
+            await self._record(collection, doc, error)
+        self.batches += 1
+        return len(batch)
+
+    async def run(self, engine: AIOEngine):
+        self._wakeup = asyncio.Event()
+        self.running = True
+        try:
+            while True:
+                self._wakeup.clear()
+                try:
+                    processed = await self.process_batch(engine)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # DB 오류 등으로 워커가 죽지 않도록 기록 후 다음 주기에 재시도
+                    processed = 0
+                    self.last_error = str(e)
+                    logging.error(f"Email outbox batch failed: {e}")
+                # 가득 찬 배치를 보냈다면 남은 메일이 있을 수 있으므로 바로 다음 배치
+                if processed >= self.batch_size:
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=EMAIL_OUTBOX_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.running = False
+            self._wakeup = None
+
+    def shutdown(self):
+        if self._executor is not None:
+            # 진행 중인 전송이 끝난 뒤 같은 스레드에서 SMTP 세션을 닫음
+            self._executor.submit(self.session.close)
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def stats(self, engine: AIOEngine) -> dict:
+        collection = engine.get_collection(EmailOutbox)
+        counts = {"pending": 0, "sending": 0, "sent": 0, "failed": 0}
+        async for row in collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        return {
+            "running": self.running,
+            "batch_size": self.batch_size,
+            "max_attempts": EMAIL_OUTBOX_MAX_ATTEMPTS,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "batches": self.batches,
+            "smtp_connects": self.session.connects,
+            "last_error": self.last_error,
+            "outbox": counts,
+        }
+
+
+email_outbox = EmailOutboxWorker()
@@ -0,0 +1,73 @@
+import os
+from typing import Dict, Iterable, Optional, Set
+from src.final_backend.ttl_cache import TTLCache
+
+# 유저별 피드 캐시 유지 시간(초)과 최대 유저 수
+FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL", "30"))
+FEED_CACHE_MAX_USERS = int(os.getenv("FEED_CACHE_MAX_USERS", "5000"))
+
+
+class FeedCache:
+    """유저별 `/user/feed` 페이지 캐시
+
+    - 유저가 팔로우/언팔로우하면 invalidate_user()로 해당 유저의 피드 제거
+    - 팔로우 중인 유저가 영화 목록을 바꾸면 invalidate_friend()로 그 유저를 포함한 피드만 제거
+      (피드를 만들 때 사용한 팔로잉 목록을 역방향으로 기록해 두어 DB 조회 없이 찾음)
+    """
+
+    def __init__(self, ttl: float = FEED_CACHE_TTL, max_users: int = FEED_CACHE_MAX_USERS):
+        # user_id -> (팔로잉 id 집합, {(offset, limit): 응답})
+        self._cache = TTLCache(ttl, max_users, on_remove=self._forget_friends)
+        self._dependents: Dict[str, Set[str]] = {}
+        self.invalidations = 0
+
+    def _forget_friends(self, user_id: str, entry: tuple):
+        for friend_id in entry[0]:
+            dependents = self._dependents.get(friend_id)
+            if dependents is not None:
+                dependents.discard(user_id)
+                if not dependents:
+                    del self._dependents[friend_id]
+
+    def get(self, user_id: str, offset: int, limit: int) -> Optional[dict]:
+        entry = self._cache.get(user_id, count=False)
+        page = entry[1].get((offset, limit)) if entry is not None else None
+        self._cache.record(page is not None)
+        return page
+
+    def set(self, user_id: str, friend_ids: Iterable[str], offset: int, limit: int, page: dict):
+        friends = set(friend_ids)
+        entry = self._cache.get(user_id, count=False)
+        if entry is None or entry[0] != friends:
+            entry = (friends, {})
+            self._cache.set(user_id, entry)
+            if user_id not in self._cache:
+                return
+            for friend_id in friends:
+                self._dependents.setdefault(friend_id, set()).add(user_id)
+        entry[1][(offset, limit)] = page
+
+    def invalidate_user(self, user_id: str):
+        if self._cache.pop(user_id) is not None:
+            self.invalidations += 1
+
+    def invalidate_friend(self, friend_id: str):
+        for user_id in list(self._dependents.get(friend_id, ())):
+            self.invalidate_user(user_id)
+
+    def clear(self):
+        self._cache.clear()
+        self._dependents.clear()
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        stats["users"] = stats.pop("entries")
+        stats["max_users"] = stats.pop("max_entries")
+        return {
+            **stats,
+            "pages": sum(len(entry[1]) for entry in self._cache.values()),
+            "invalidations": self.invalidations,
+        }
+
+
+feed_cache = FeedCache()
@@ -0,0 +1,94 @@
+import logging
+import os
+from typing import List, Type
+from odmantic import AIOEngine, Model
+from odmantic.index import ODMBaseIndex
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+from src.final_backend.models import INDEXED_MODELS
+
+# 선언과 옵션이 다른 기존 인덱스를 삭제 후 다시 만들지 여부
+INDEX_REPLACE_CONFLICTS = os.getenv("INDEX_REPLACE_CONFLICTS", "false").lower() == "true"
+
+# 비교할 인덱스 옵션
+INDEX_OPTIONS = ("unique", "expireAfterSeconds", "sparse")
+
+
+def declared_indexes(model: Type[Model]) -> List[IndexModel]:
+    return [
+        index.get_pymongo_index() if isinstance(index, ODMBaseIndex) else index
+        for index in model.__indexes__()
+    ]
+
+
+def _same_definition(declared: dict, existing: dict) -> bool:
+    if [tuple(key) for key in declared["key"].items()] != [tuple(key) for key in existing["key"]]:
+        return False
+    return all(declared.get(option) == existing.get(option) for option in INDEX_OPTIONS)
+
+
+async def _index_usage(collection) -> dict:
+    # 서버 재시작 이후 인덱스별 사용 횟수
+    try:
+        stats = await collection.aggregate([{"$indexStats": {}}]).to_list(length=None)
+    except Exception:
+        return {}
+    return {stat["name"]: stat.get("accesses", {}).get("ops", 0) for stat in stats}
+
+
+async def reconcile_indexes(engine: AIOEngine, apply: bool = True, models=INDEXED_MODELS) -> dict:
+    """모델에 선언된 인덱스와 실제 인덱스를 비교하고 apply=True면 없는 인덱스를 생성
+
+    같은 이름의 인덱스가 이미 같은 정의로 있으면 아무것도 하지 않으므로 여러 번 실행해도 안전하다.
+    결과: 컬렉션별 ok/created/missing/conflict/error 인덱스와 선언되지 않은(undeclared)·사용되지 않은(unused) 인덱스
+    """
+    report = {}
+    for model in models:
+        collection = engine.get_collection(model)
+        existing = await collection.index_information()
+        result = {"ok": [], "created": [], "missing": [], "conflict": [], "error": {}}
+        declared_names = set()
+
+        for index in declared_indexes(model):
+            declared = index.document
+            name = declared["name"]
+            declared_names.add(name)
+            current = existing.get(name)
+            if current is not None and _same_definition(declared, current):
+                result["ok"].append(name)
+                continue
+            if current is not None and not (apply and INDEX_REPLACE_CONFLICTS):
+                result["conflict"].append(name)
+                continue
+            if not apply:
+                result["missing"].append(name)
+                continue
+            try:
+                if current is not None:
+                    await collection.drop_index(name)
+                await collection.create_indexes([index])
+                result["created"].append(name)
+            except OperationFailure as e:
+                # 예: unique 인덱스 생성 시 기존 중복 데이터
+                result["error"][name] = str(e)
+                logging.error(f"Failed to create index {model.__collection__}.{name}: {e}")
+
+        usage = await _index_usage(collection)
+        result["undeclared"] = [name for name in existing if name != "_id_" and name not in declared_names]
+        result["unused"] = [
+            name for name, ops in usage.items() if name != "_id_" and ops == 0
+        ]
+        report[model.__collection__] = result
+    return report
+
+
+async def ensure_indexes(engine: AIOEngine) -> dict:
+    report = await reconcile_indexes(engine, apply=True)
+    for collection, result in report.items():
+        if result["created"]:
+            logging.info(f"Created indexes on {collection}: {result['created']}")
+        if result["conflict"] or result["error"]:
+            logging.warning(
+                f"Index problems on {collection}: conflict={result['conflict']} error={list(result['error'])}"
+            )
+    return report
@@ -1,13 +1,83 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from src.final_backend.router.user_router import user_router
 from src.final_backend.router.movie_router import movie_router
 from src.final_backend.router.sim_router import sim_router
 from src.final_backend.router.tmdb_router import tmdb_router
-from motor.motor_asyncio import AsyncIOMotorClient
-from src.final_backend.database import DATABASE_URL
+from src.final_backend.router.stats_router import stats_router
+from src.final_backend.database import connect_db, close_db, get_engine, get_chat_engine
+from src.final_backend.index_manager import ensure_indexes
+from src.final_backend.similarity_crud import load_live_similarity
+from src.final_backend.similarity_engine import LIVE_SIMILARITY_ENABLED
+from src.final_backend.tmdb_cache import tmdb_cache
+from src.final_backend.tmdb_client import open_tmdb_client, close_tmdb_client
+from src.final_backend.movie_catalog import movie_catalog, MOVIE_CATALOG_WATCH
+from src.final_backend.password_hasher import password_hasher
+from src.final_backend.email_outbox import email_outbox, EMAIL_OUTBOX_ENABLED
+from src.final_backend.user_crud import sync_follow_edges
+from src.final_backend.user_deletion import recover_user_deletions
+from src.final_backend.profile_images import profile_image_store, UploadSizeLimitMiddleware
+from src.final_backend.rate_limiter import rate_limiter, MongoBucketBackend
+from src.final_backend.admission_control import AdmissionControlMiddleware
 
-app = FastAPI()
+
+def _log_task_error(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logging.error(f"Background task failed: {task.exception()}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 앱 시작 시 공유 MongoDB 클라이언트 생성 및 모델에 선언된 인덱스(TTL 포함) 생성/검증
+    connect_db()
+    open_tmdb_client()
+    await ensure_indexes(await get_engine())
+    if tmdb_cache.backend is not None:
+        await tmdb_cache.backend.ensure_indexes()
+    if isinstance(rate_limiter.backend, MongoBucketBackend):
+        await rate_limiter.backend.ensure_indexes()
+    # 실시간 유사도 엔진은 시작을 막지 않도록 백그라운드에서 계산
+    background_tasks = []
+    # User.following 기준으로 follow 컬렉션(팔로워 인덱스)의 빠진/남은 관계 복구
+    background_tasks.append(asyncio.create_task(sync_follow_edges(await get_engine())))
+    # 어떤 유저도 참조하지 않는 프로필 이미지 정리
+    background_tasks.append(asyncio.create_task(profile_image_store.sweep_orphans(await get_engine())))
+    # 채팅방 레지스트리 동기화 후 중단된 회원탈퇴 정리 작업 재개
+    background_tasks.append(
+        asyncio.create_task(recover_user_deletions(await get_engine(), await get_chat_engine()))
+    )
+    if LIVE_SIMILARITY_ENABLED:
+        background_tasks.append(asyncio.create_task(load_live_similarity(await get_engine())))
+    # 여러 워커 실행 시 다른 워커의 영화 저장도 카탈로그 스냅샷에 반영
+    if MOVIE_CATALOG_WATCH:
+        background_tasks.append(asyncio.create_task(movie_catalog.watch(await get_engine())))
+    # 인증/임시 비밀번호 메일은 outbox에 쌓아 두고 백그라운드에서 전송
+    if EMAIL_OUTBOX_ENABLED:
+        background_tasks.append(asyncio.create_task(email_outbox.run(await get_engine())))
+    for task in background_tasks:
+        task.add_done_callback(_log_task_error)
+    yield
+    for task in background_tasks:
+        if not task.done():
+            task.cancel()
+    # 앱 종료 시 커넥션 풀 정리
+    await close_tmdb_client()
+    password_hasher.shutdown()
+    email_outbox.shutdown()
+    profile_image_store.shutdown()
+    close_db()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# 프로필 이미지 업로드 본문이 임시 파일로 모두 저장되기 전에 크기 제한
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# 비용이 큰 경로의 동시 실행 수 제한 (CORS 미들웨어 안쪽에 두어 503 응답에도 CORS 헤더 포함)
+app.add_middleware(AdmissionControlMiddleware)
 
 # * = 모든 도메인 요청 허용
 origins = ["*"]
@@ -24,24 +94,10 @@ app.include_router(user_router)
 app.include_router(movie_router)
 app.include_router(sim_router)
 app.include_router(tmdb_router)
+app.include_router(stats_router)
 
 
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
 
-
-async def create_ttl_index():
-    # MongoDB 클라이언트 연결
-    client = AsyncIOMotorClient(DATABASE_URL)  # MongoDB URL
-    db = client["cinetalk"]  # 데이터베이스 이름
-    collection = db["email_verification"]  # 컬렉션 이름
-
-    # TTL Index 생성
-    await collection.create_index("expires_at", expireAfterSeconds=0)
-
-
-@app.on_event("startup")
-async def startup_event():
-    # 앱 시작 시 TTL Index 생성
-    await create_ttl_index()
@@ -1,19 +1,44 @@
-from odmantic import Model, ObjectId, Index
+from odmantic import Model, ObjectId, Index, Field
+from pymongo import IndexModel
 from typing import Optional, List
 from datetime import datetime
 
 
+# 인덱스는 모델 옆에 선언하고 앱 시작 시 index_manager에서 생성/검증
 class User(Model):
-    email: str
-    nickname: str
+    email: str = Field(unique=True)
+    nickname: str = Field(unique=True)
     password: str
     profile: Optional[str] = None
     movie_list: Optional[List[int]] = []
     following: Optional[List[ObjectId]] = []
 
+    model_config = {
+        # 탈퇴 시 팔로워 조회 ({"following": {"$in": [...]}})
+        "indexes": lambda: [Index(User.following)],
+    }
+
+
+class Follow(Model):
+    # User.following과 함께 유지하는 팔로우 관계 (팔로워 목록/수 조회용 역방향 인덱스)
+    follower: ObjectId
+    followee: ObjectId
+    created_at: datetime
+
+    model_config = {
+        "collection": "follow",
+        "indexes": lambda: [
+            Index(Follow.follower, Follow.followee, unique=True),
+            # 팔로워 목록 ({"followee": ...} 최신순)
+            Index(Follow.followee, Follow.created_at),
+            # 팔로잉 목록 ({"follower": ...} 최신순)
+            Index(Follow.follower, Follow.created_at),
+        ],
+    }
+
 
 class Movie(Model):
-    movie_id: int
+    movie_id: int = Field(unique=True)
     title: str
     original_title: Optional[str] = None
     overview: Optional[str] = None
@@ -23,9 +48,81 @@ class Movie(Model):
     release_date: Optional[str] = None
     cast: Optional[List[dict]] = None
     director: Optional[dict] = None
+    # TMDb write-through로 채워지는 필드
+    genre_names: Optional[List[str]] = None
+    production_countries: Optional[List[str]] = None
+    updated_at: Optional[datetime] = None
 
 
 class EmailVerification(Model):
-    email: str
+    # 이메일당 인증 문서 하나 (upsert로 교체)
+    email: str = Field(unique=True)
     verification_code: str
     expires_at: datetime
+
+    model_config = {
+        # 만료 시간이 지나면 MongoDB가 자동 삭제 (TTL Index)
+        "indexes": lambda: [IndexModel("expires_at", expireAfterSeconds=0)],
+    }
+
+
+class EmailOutbox(Model):
+    to: str
+    subject: str
+    # 인증번호/임시 비밀번호가 담기므로 전송이 끝나면 본문은 지운다
+    body_text: Optional[str] = None
+    body_html: Optional[str] = None
+    kind: str
+    status: str = "pending"  # pending | sending | sent | failed
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: datetime
+    next_attempt_at: datetime
+    locked_at: Optional[datetime] = None
+    sent_at: Optional[datetime] = None
+    # 전송 완료/실패 기록의 보존 기한 (TTL Index)
+    expires_at: Optional[datetime] = None
+
+    model_config = {
+        "collection": "email_outbox",
+        # 전송 대기 메일 조회 ({"status": ..., "next_attempt_at": {"$lte": ...}})
+        "indexes": lambda: [
+            Index(EmailOutbox.status, EmailOutbox.next_attempt_at),
+            IndexModel("expires_at", expireAfterSeconds=0),
+        ],
+    }
+
+
+class ChatCollection(Model):
+    # chat 데이터베이스의 채팅방 컬렉션과 참여 유저 (탈퇴 시 이름 검색 없이 바로 삭제)
+    name: str = Field(unique=True)
+    members: List[ObjectId] = []
+
+    model_config = {
+        "collection": "chat_registry",
+        "indexes": lambda: [Index(ChatCollection.members)],
+    }
+
+
+class UserDeletionJob(Model):
+    # 회원탈퇴 후 백그라운드에서 진행하는 연관 데이터 정리 작업
+    user_id: ObjectId
+    email: str
+    profile: Optional[str] = None
+    status: str = "pending"  # pending | running | done | failed
+    completed_steps: List[str] = []
+    progress: dict = {}
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {
+        "collection": "user_deletion_job",
+        # 재시작 시 끝나지 않은 작업 조회
+        "indexes": lambda: [Index(UserDeletionJob.status)],
+    }
+
+
+# 앱 시작 시 인덱스를 확인할 모델 목록
+INDEXED_MODELS = [User, Follow, Movie, EmailVerification, EmailOutbox, ChatCollection, UserDeletionJob]
@@ -0,0 +1,87 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional
+from odmantic import AIOEngine
+from src.final_backend.models import Movie
+
+# 여러 워커 실행 시 Movie 컬렉션 change stream으로 스냅샷 무효화 (replica set 필요)
+MOVIE_CATALOG_WATCH = os.getenv("MOVIE_CATALOG_WATCH", "false").lower() == "true"
+
+# `/movie/all`에 보이는 필드 (이 필드가 바뀌지 않은 update는 스냅샷을 무효화하지 않음)
+CATALOG_FIELDS = {"movie_id", "title", "original_title", "poster_path", "genres", "cast", "director", "original_language"}
+
+
+def changes_catalog(change: dict) -> bool:
+    if change.get("operationType") != "update":
+        return True
+    description = change.get("updateDescription") or {}
+    fields = list(description.get("updatedFields") or {}) + list(description.get("removedFields") or [])
+    return any(field.split(".")[0] in CATALOG_FIELDS for field in fields)
+
+
+class CatalogSnapshot:
+    """`/movie/all` 응답 본문을 미리 직렬화해 두는 불변 스냅샷"""
+
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.body = body
+        # 워커마다 version이 달라도 같은 내용이면 같은 ETag가 되도록 본문 해시 사용
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class MovieCatalog:
+    """영화 목록이 바뀔 때만 다시 만드는 인메모리 카탈로그
+
+    저장/일괄 저장 시 invalidate()로 version을 올리면 다음 조회에서 한 번만 다시 만든다.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.rebuilds = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self.version += 1
+
+    async def get(self, build: Callable[[], Awaitable[List[dict]]]) -> CatalogSnapshot:
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.version == self.version:
+            return snapshot
+        async with self._lock:
+            if self.snapshot is not None and self.snapshot.version == self.version:
+                return self.snapshot
+            version = self.version
+            movies = await build()
+            body = json.dumps({"movies": movies}, ensure_ascii=False).encode("utf-8")
+            # 만드는 동안 invalidate()가 호출되었다면 다음 조회에서 다시 만든다
+            self.snapshot = CatalogSnapshot(version, body)
+            self.rebuilds += 1
+            return self.snapshot
+
+    async def watch(self, engine: AIOEngine):
+        """Movie 컬렉션 변경을 감지해 스냅샷 무효화 (다른 워커에서 저장한 경우 포함)"""
+        try:
+            async with engine.get_collection(Movie).watch() as stream:
+                async for change in stream:
+                    if changes_catalog(change):
+                        self.invalidate()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Movie catalog change stream stopped: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "snapshot_version": self.snapshot.version if self.snapshot else None,
+            "etag": self.snapshot.etag if self.snapshot else None,
+            "bytes": len(self.snapshot.body) if self.snapshot else 0,
+            "rebuilds": self.rebuilds,
+        }
+
+
+movie_catalog = MovieCatalog()
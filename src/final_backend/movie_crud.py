@@ -1,20 +1,45 @@
 import requests
+import os
+from datetime import datetime, timedelta
 from fastapi import HTTPException
+from odmantic import AIOEngine
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from src.final_backend.models import Movie
-from src.final_backend.database import engine
-from typing import Dict, List
+from src.final_backend.movie_catalog import movie_catalog
+from typing import AsyncIterable, Dict, List, Optional, Tuple
+from pydantic import ValidationError
 import logging
 
+# TMDb에서 가져온 영화 정보를 다시 조회하지 않고 로컬에서 사용할 기간(일)
+MOVIE_LOCAL_TTL_DAYS = int(os.getenv("MOVIE_LOCAL_TTL_DAYS", "30"))
+
+# 영화 저장 시 필요한 항목
+REQUIRED_MOVIE_FIELDS = ["movie_id", "title", "original_title", "overview", "poster_path", "original_language", "genres", "release_date", "cast", "director"]
+
+# 일괄 저장 시 한 번의 bulk_write로 보내는 영화 수
+MOVIE_BULK_CHUNK_SIZE = int(os.getenv("MOVIE_BULK_CHUNK_SIZE", "1000"))
+
+# 로컬 우선 조회 시 필요한 필드
+LOCAL_DETAIL_PROJECTION = {
+    "_id": 0,
+    "movie_id": 1,
+    "cast": 1,
+    "director": 1,
+    "genre_names": 1,
+    "production_countries": 1,
+    "updated_at": 1,
+}
+
 # 영화 저장 함수
-async def save_movie_to_db(movie_data: Dict):
+async def save_movie_to_db(engine: AIOEngine, movie_data: Dict):
     # 기존 데이터 확인
     existing_movie = await engine.find_one(Movie, Movie.movie_id == movie_data['movie_id'])
     if existing_movie:
         return {"message": f"Movie '{existing_movie.title}' already exists in the database."}
 
     #필요항목 확인단계
-    required_fields = ["movie_id", "title", "original_title", "overview", "poster_path", "original_language", "genres", "release_date", "cast", "director"]
-    missing_fields = [field for field in required_fields if field not in movie_data]
+    missing_fields = [field for field in REQUIRED_MOVIE_FIELDS if field not in movie_data]
     if missing_fields:
         raise HTTPException(
             status_code=400,
@@ -22,67 +47,230 @@ async def save_movie_to_db(movie_data: Dict):
         )
 
     # MongoDB 저장
-    movie = Movie(
-        movie_id=movie_data["movie_id"],
-        title=movie_data["title"],
-        original_title=movie_data["original_title"],
-        overview=movie_data["overview"],
-        poster_path=movie_data["poster_path"],
-        original_language=movie_data["original_language"],
-        genres=movie_data['genres'],
-        release_date=movie_data["release_date"],
-        cast=movie_data["cast"],
-        director=movie_data["director"],
-    )
-    await engine.save(movie)
+    movie = Movie(**{field: movie_data[field] for field in REQUIRED_MOVIE_FIELDS})
+    doc = movie.model_dump_doc()
+    del doc["_id"]
+    # 조회 이후 다른 요청이 같은 movie_id를 먼저 저장했을 수 있으므로 없을 때만 추가 (movie_id 유니크 인덱스)
+    try:
+        result = await engine.get_collection(Movie).update_one(
+            {"movie_id": movie.movie_id},
+            {"$setOnInsert": doc},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        result = None
+    if result is None or result.upserted_id is None:
+        return {"message": f"Movie '{movie.title}' already exists in the database."}
+    movie_catalog.invalidate()
     return {"message": f"Movie '{movie.title}' has been saved to the database."}
 
+# /movie/all 응답에 필요한 필드만 조회
+CATALOG_PROJECTION = {
+    "_id": 0,
+    "movie_id": 1,
+    "title": 1,
+    "original_title": 1,
+    "poster_path": 1,
+    "genres": 1,
+    "cast.name": 1,
+    "director.name": 1,
+    "original_language": 1,
+}
+
+
+def format_catalog_movie(doc: dict) -> dict:
+    cast = doc.get("cast")
+    director = doc.get("director")
+    return {
+        "movie_id": doc["movie_id"],
+        "title": doc.get("title"),
+        "original_title": doc.get("original_title"),
+        "poster_path": doc.get("poster_path"),
+        "genres": doc.get("genres", []),
+        "cast": [c.get("name") for c in cast] if cast else None,
+        "director": director.get("name") if director else None,
+        "original_language": doc.get("original_language"),
+    }
+
+
+async def iter_movies(engine: AIOEngine, after: Optional[int] = None, limit: Optional[int] = None):
+    """movie_id 오름차순으로 영화를 하나씩 반환 (keyset 페이지네이션, 모델 검증 없이 projection만 조회)"""
+    query = {"movie_id": {"$gt": after}} if after is not None else {}
+    cursor = engine.get_collection(Movie).find(query, CATALOG_PROJECTION).sort("movie_id", 1)
+    if limit:
+        cursor = cursor.limit(limit)
+    async for doc in cursor:
+        yield format_catalog_movie(doc)
+
+
 # 모든 영화 데이터를 JSON으로 반환하는 함수
-async def fetch_all_movies():
-    # 모든 영화 데이터를 조회
-    movies = await engine.find(Movie)
-
-    # 영화 데이터를 리스트로 변환
-    movie_data = []
-    for movie in movies:
-        filtered_cast_names = [c["name"] for c in movie.cast] if movie.cast else None
-
-        director_name = movie.director["name"] if movie.director else None
-
-        # 영화 정보를 딕셔너리로 저장
-        movie_data.append({
-            "movie_id": movie.movie_id,
-            "title": movie.title,
-            "original_title": movie.original_title,
-            # "overview": movie.overview,
-            "poster_path": movie.poster_path,
-            "genres": movie.genres,
-            "cast": filtered_cast_names,
-            "director": director_name,
-            "original_language": movie.original_language,
-            # "release_date": movie.release_date,
-        })
-
-    return movie_data
-
-async def fetch_movies_by_ids(movie_ids: list[int]):
-    logging.debug(f"Start fetching movies with IDs: {movie_ids}")
+async def fetch_all_movies(engine: AIOEngine, after: Optional[int] = None, limit: Optional[int] = None):
+    return [movie async for movie in iter_movies(engine, after, limit)]
+
+# /movie/list 응답에 필요한 필드만 조회
+MOVIE_CARD_PROJECTION = {
+    "_id": 0,
+    "movie_id": 1,
+    "title": 1,
+    "genres": 1,
+    "director.name": 1,
+    "poster_path": 1,
+    "cast.name": 1,
+}
+
+
+def format_movie_card(doc: dict) -> dict:
+    director = doc.get("director")
+    cast = doc.get("cast")
+    return {
+        "movie_id": doc["movie_id"],
+        "title": doc.get("title"),
+        "genres": doc.get("genres", []),
+        "director": director.get("name") if director else None,
+        "poster_path": doc.get("poster_path"),
+        "cast": [member.get("name") for member in cast] if cast else [],
+    }
+
+
+async def fetch_movies_by_ids(engine: AIOEngine, movie_ids: list[int]) -> Tuple[List[dict], List[int]]:
+    """요청 순서대로 영화 카드 목록과 DB에 없는 영화 ID 목록을 반환 (중복 ID는 한 번만 포함)"""
+    unique_ids = list(dict.fromkeys(movie_ids))
+    logging.debug("Start fetching %d movies", len(unique_ids))
     try:
-        movies = await engine.find(Movie, Movie.movie_id.in_(movie_ids))
-        logging.debug(f"Fetched raw movies data: {movies}")
-        processed_movies = [
-            {
-                "movie_id": movie.movie_id,
-                "title": movie.title,
-                "genres": movie.genres,
-                "director": movie.director.get("name") if movie.director else None,
-                "poster_path": movie.poster_path,
-                "cast": [member.get("name") for member in movie.cast] if movie.cast else [],
-            }
-            for movie in movies
-        ]
-        logging.debug(f"Processed movies data: {processed_movies}")
-        return processed_movies
+        # 모델 검증 없이 필요한 필드만 조회
+        docs = await engine.get_collection(Movie).find(
+            {"movie_id": {"$in": unique_ids}}, MOVIE_CARD_PROJECTION
+        ).to_list(length=len(unique_ids))
+        by_id = {doc["movie_id"]: doc for doc in docs}
+        movies = [format_movie_card(by_id[movie_id]) for movie_id in unique_ids if movie_id in by_id]
+        missing_ids = [movie_id for movie_id in unique_ids if movie_id not in by_id]
+        logging.debug("Fetched %d movies, %d missing", len(movies), len(missing_ids))
+        return movies, missing_ids
     except Exception as e:
         logging.error(f"Error in fetch_movies_by_ids: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def is_fresh_local_movie(doc: dict) -> bool:
+    # TMDb write-through로 저장된 적이 있고 오래되지 않은 데이터만 사용
+    updated_at = doc.get("updated_at")
+    if updated_at is None or doc.get("genre_names") is None:
+        return False
+    return updated_at > datetime.utcnow() - timedelta(days=MOVIE_LOCAL_TTL_DAYS)
+
+
+async def fetch_local_movie_details(engine: AIOEngine, movie_ids: List[int]) -> Dict[int, dict]:
+    """movie_id 목록 중 로컬 Movie 컬렉션에 최신 데이터가 있는 영화만 한 번의 조회로 반환"""
+    if not movie_ids:
+        return {}
+    docs = await engine.get_collection(Movie).find(
+        {"movie_id": {"$in": movie_ids}}, LOCAL_DETAIL_PROJECTION
+    ).to_list(length=len(movie_ids))
+    return {doc["movie_id"]: doc for doc in docs if is_fresh_local_movie(doc)}
+
+
+async def upsert_movie_records(engine: AIOEngine, records: List[dict]):
+    """TMDb에서 가져온 영화 정보를 movie_id 기준으로 Movie 컬렉션에 upsert
+
+    `/movie/save`로 저장된 기본 항목(카탈로그에 보이는 필드)은 새로 추가될 때만 쓰고($setOnInsert),
+    write-through 전용 필드(genre_names, production_countries, updated_at)만 항상 갱신한다.
+    따라서 카탈로그 스냅샷은 새 영화가 추가됐을 때만 무효화된다.
+    """
+    if not records:
+        return
+    now = datetime.utcnow()
+    operations = []
+    for record in records:
+        catalog_fields = {key: value for key, value in record.items() if key in REQUIRED_MOVIE_FIELDS and key != "movie_id"}
+        extra_fields = {key: value for key, value in record.items() if key not in REQUIRED_MOVIE_FIELDS}
+        operations.append(
+            UpdateOne(
+                {"movie_id": record["movie_id"]},
+                {"$setOnInsert": catalog_fields, "$set": {**extra_fields, "updated_at": now}},
+                upsert=True,
+            )
+        )
+    try:
+        result = await engine.get_collection(Movie).bulk_write(operations, ordered=False)
+        if result.upserted_count:
+            movie_catalog.invalidate()
+    except Exception as e:
+        logging.error(f"Error in upsert_movie_records: {e}")
+
+
+def validate_movie_data(movie_data) -> Tuple[Optional[dict], Optional[str]]:
+    """save_movie_to_db와 같은 필수 항목 및 Movie 모델 타입 검증, (저장할 필드, 오류) 반환"""
+    if not isinstance(movie_data, dict):
+        return None, "Movie must be a JSON object"
+    missing_fields = [field for field in REQUIRED_MOVIE_FIELDS if field not in movie_data]
+    if missing_fields:
+        return None, f"Missing required fields: {', '.join(missing_fields)}"
+    try:
+        movie = Movie(**{field: movie_data[field] for field in REQUIRED_MOVIE_FIELDS})
+    except ValidationError as e:
+        return None, f"Invalid fields: {', '.join(str(err['loc'][0]) for err in e.errors())}"
+    return {field: getattr(movie, field) for field in REQUIRED_MOVIE_FIELDS}, None
+
+
+async def _write_movie_chunk(engine: AIOEngine, chunk: List[Tuple[int, dict]], results: List[dict]):
+    # 같은 요청 안에서 movie_id가 중복되면 마지막 항목만 저장
+    latest = {}
+    for index, record in chunk:
+        previous = latest.get(record["movie_id"])
+        if previous is not None:
+            results.append({
+                "index": previous[0], "movie_id": record["movie_id"], "status": "rejected",
+                "error": "Duplicate movie_id in request (a later item is used)",
+            })
+        latest[record["movie_id"]] = (index, record)
+    items = list(latest.values())
+    operations = [
+        UpdateOne({"movie_id": record["movie_id"]}, {"$set": record}, upsert=True)
+        for _, record in items
+    ]
+
+    write_errors = {}
+    upserted = set()
+    try:
+        result = await engine.get_collection(Movie).bulk_write(operations, ordered=False)
+        upserted = set(result.upserted_ids)
+    except BulkWriteError as e:
+        details = e.details
+        upserted = {item["index"] for item in details.get("upserted", [])}
+        write_errors = {error["index"]: error.get("errmsg", "Write error") for error in details.get("writeErrors", [])}
+
+    for position, (index, record) in enumerate(items):
+        if position in write_errors:
+            results.append({"index": index, "movie_id": record["movie_id"], "status": "rejected", "error": write_errors[position]})
+        else:
+            status = "inserted" if position in upserted else "updated"
+            results.append({"index": index, "movie_id": record["movie_id"], "status": status})
+
+
+async def bulk_upsert_movies(engine: AIOEngine, movies: AsyncIterable, chunk_size: int = MOVIE_BULK_CHUNK_SIZE) -> dict:
+    """영화 여러 편을 chunk 단위 unordered upsert(movie_id 기준)로 저장하고 항목별 결과 반환"""
+    results: List[dict] = []
+    chunk: List[Tuple[int, dict]] = []
+    index = 0
+    async for movie_data in movies:
+        record, error = validate_movie_data(movie_data)
+        if error:
+            results.append({
+                "index": index,
+                "movie_id": movie_data.get("movie_id") if isinstance(movie_data, dict) else None,
+                "status": "rejected", "error": error,
+            })
+        else:
+            chunk.append((index, record))
+            if len(chunk) >= chunk_size:
+                await _write_movie_chunk(engine, chunk, results)
+                chunk = []
+        index += 1
+    if chunk:
+        await _write_movie_chunk(engine, chunk, results)
+
+    results.sort(key=lambda item: item["index"])
+    summary = {status: sum(1 for item in results if item["status"] == status) for status in ("inserted", "updated", "rejected")}
+    if summary["inserted"] or summary["updated"]:
+        movie_catalog.invalidate()
+    return {**summary, "total": index, "results": results}
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from starlette import status
+
+# bcrypt cost factor (변경 시 다음 로그인에서 새 cost로 다시 해시)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt 전용 스레드 수 (bcrypt는 GIL을 해제하므로 스레드로 병렬 처리 가능)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# 작업 중인 요청 외에 대기할 수 있는 최대 요청 수, 넘으면 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+# bcrypt 알고리즘을 사용하여 비밀번호를 암호화
+# min/max rounds를 같게 두어 cost가 다른 기존 해시는 needs_update 대상이 됨
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasher:
+    """bcrypt 해시/검증을 이벤트 루프 밖의 전용 스레드 풀에서 실행"""
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_queue: int = PASSWORD_HASH_MAX_QUEUE,
+        context: CryptContext = pwd_context,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.context = context
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.total_run_seconds = 0.0
+        self.max_run_seconds = 0.0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _record(self, wait: float, run: float):
+        with self._lock:
+            self.completed += 1
+            self.total_wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            self.total_run_seconds += run
+            self.max_run_seconds = max(self.max_run_seconds, run)
+
+    async def _run(self, func, *args):
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="요청이 많아 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": "1"},
+            )
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._record(started - submitted, time.perf_counter() - started)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """검증 후 cost factor가 바뀐 해시라면 새 해시를 함께 반환"""
+        valid, new_hash = await self._run(self.context.verify_and_update, password, hashed_password)
+        if new_hash:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self.completed
+            return {
+                "bcrypt_rounds": BCRYPT_ROUNDS,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self.pending,
+                "queued": max(0, self.pending - self.workers),
+                "completed": completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "avg_hash_ms": round(self.total_run_seconds / completed * 1000, 3) if completed else 0.0,
+                "max_hash_ms": round(self.max_run_seconds * 1000, 3),
+                "avg_queue_wait_ms": round(self.total_wait_seconds / completed * 1000, 3) if completed else 0.0,
+                "max_queue_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
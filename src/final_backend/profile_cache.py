@@ -0,0 +1,44 @@
+import os
+from typing import Dict, Iterable, Tuple
+from src.final_backend.ttl_cache import TTLCache
+
+# 유저 id별 공개 프로필 캐시 유지 시간(초), 0이면 사용하지 않음
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "10"))
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "20000"))
+
+
+class ProfileCache:
+    """`/user/batch`에서 반복 조회되는 유저 공개 프로필(닉네임, 프로필 이미지, 영화 목록) 캐시
+
+    닉네임/프로필 이미지/영화 목록/팔로우 변경과 탈퇴 시 invalidate()로 제거한다.
+    """
+
+    def __init__(self, ttl: float = PROFILE_CACHE_TTL, max_entries: int = PROFILE_CACHE_MAX_ENTRIES):
+        self._cache = TTLCache(ttl, max_entries)
+
+    def get_many(self, user_ids: Iterable[str]) -> Tuple[Dict[str, dict], list]:
+        """캐시에 있는 프로필과 DB에서 조회해야 할 id 목록을 반환"""
+        found, missing = {}, []
+        for user_id in user_ids:
+            profile = self._cache.get(user_id)
+            if profile is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = profile
+        return found, missing
+
+    def set_many(self, profiles: Dict[str, dict]):
+        for user_id, profile in profiles.items():
+            self._cache.set(user_id, profile)
+
+    def invalidate(self, user_id: str):
+        self._cache.pop(user_id)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+profile_cache = ProfileCache()
@@ -0,0 +1,353 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.responses import FileResponse, JSONResponse, Response
+from odmantic import AIOEngine
+from starlette import status
+from starlette.concurrency import run_in_threadpool
+from src.final_backend.models import User
+from src.final_backend.ttl_cache import TTLCache
+
+PROFILE_IMAGE_DIR = os.getenv("PROFILE_IMAGE_DIR", "profile_images")
+# 업로드 최대 크기 (기본 5MB)
+PROFILE_IMAGE_MAX_BYTES = int(os.getenv("PROFILE_IMAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+PROFILE_IMAGE_CHUNK_SIZE = 64 * 1024
+# 업로드 요청 본문에서 이미지 외 부분(multipart 경계/헤더)으로 허용하는 크기
+PROFILE_UPLOAD_OVERHEAD_BYTES = int(os.getenv("PROFILE_UPLOAD_OVERHEAD_BYTES", str(64 * 1024)))
+PROFILE_UPLOAD_PATH = "/user/profile/upload"
+# 썸네일 한 변 크기(px)와 형식 (webp 또는 jpeg)
+PROFILE_THUMBNAIL_SIZES = tuple(
+    int(size) for size in os.getenv("PROFILE_THUMBNAIL_SIZES", "64,128,512").split(",")
+)
+PROFILE_THUMBNAIL_FORMAT = os.getenv("PROFILE_THUMBNAIL_FORMAT", "webp").lower()
+PROFILE_IMAGE_WORKERS = int(os.getenv("PROFILE_IMAGE_WORKERS", "2"))
+# 압축 폭탄 방지용 최대 픽셀 수
+PROFILE_IMAGE_MAX_PIXELS = int(os.getenv("PROFILE_IMAGE_MAX_PIXELS", str(40_000_000)))
+# 최근에 업로드(또는 중복 업로드)된 파일은 참조가 없어도 이 시간 동안 삭제하지 않음
+PROFILE_IMAGE_GRACE_SECONDS = int(os.getenv("PROFILE_IMAGE_GRACE_SECONDS", "300"))
+# 유저 id → 프로필 이미지 경로 메모리 캐시 (조회 시 DB 생략)
+PROFILE_PATH_CACHE_TTL = float(os.getenv("PROFILE_PATH_CACHE_TTL", "60"))
+PROFILE_PATH_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_PATH_CACHE_MAX_ENTRIES", "50000"))
+
+# 내용 해시로 저장된 파일 이름 (`<sha256>.<ext>` 또는 `<sha256>_<size>.<ext>`)
+CONTENT_FILE_PATTERN = re.compile(r"^[0-9a-f]{64}(_\d+)?\.(jpg|png|webp|gif)$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+THUMBNAIL_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+IMAGE_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+
+
+def thumbnail_path(profile_path: str, size: int) -> str:
+    stem, _ = os.path.splitext(profile_path)
+    return f"{stem}_{size}.{THUMBNAIL_EXTENSIONS[PROFILE_THUMBNAIL_FORMAT]}"
+
+
+def _process_image(tmp_path: str, final_stem: str, sizes: Tuple[int, ...], fmt: str, max_pixels: int) -> str:
+    """검증 후 썸네일을 만들고 원본과 함께 최종 경로로 옮김 (프로세스 풀에서 실행)
+
+    모든 파일을 임시 이름으로 쓴 뒤 os.replace로 옮기므로 다른 요청이 쓰다 만 파일을 읽지 않는다.
+    같은 이미지를 동시에 올려도 내용이 같은 파일로 덮어쓰므로 안전하다.
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    with Image.open(tmp_path) as image:
+        extension = IMAGE_EXTENSIONS.get(image.format)
+        if extension is None:
+            raise ValueError(f"unsupported image format: {image.format}")
+        image.load()
+        # 휴대폰 사진의 EXIF 회전 정보 반영 후 RGB로 변환
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        thumbnails = []
+        for size in sizes:
+            thumb = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            thumb_tmp = f"{tmp_path}.{size}"
+            if fmt == "webp":
+                thumb.save(thumb_tmp, "WEBP", quality=85, method=4)
+            else:
+                thumb.save(thumb_tmp, "JPEG", quality=85, optimize=True, progressive=True)
+            thumbnails.append((thumb_tmp, f"{final_stem}_{size}.{THUMBNAIL_EXTENSIONS[fmt]}"))
+
+    final_path = f"{final_stem}.{extension}"
+    for thumb_tmp, thumb_final in thumbnails:
+        os.replace(thumb_tmp, thumb_final)
+    os.replace(tmp_path, final_path)
+    return final_path
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"프로필 이미지는 최대 {PROFILE_IMAGE_MAX_BYTES // (1024 * 1024)}MB까지 업로드할 수 있습니다.",
+    )
+
+
+def _etag(path: str) -> str:
+    # 내용 해시(또는 이전 업로드의 uuid) 이름은 파일 내용이 바뀌지 않으므로 강한 ETag로 사용
+    return f'"{os.path.splitext(os.path.basename(path))[0]}"'
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class ProfileImageStore:
+    """프로필 이미지를 내용 해시(sha256) 이름으로 저장하는 저장소
+
+    - 크기 제한을 두고 나눠서 저장하며 썸네일은 프로세스 풀에서 생성
+    - 같은 이미지는 한 번만 저장하고 여러 유저가 같은 파일을 참조
+    - 다른 유저가 참조 중이거나 최근에 업로드된 파일은 삭제하지 않음
+    - 유저 id → 이미지 경로를 메모리에 보관해 자주 조회되는 프로필 이미지는 DB 조회 생략
+    """
+
+    def __init__(self, directory: str = PROFILE_IMAGE_DIR, workers: int = PROFILE_IMAGE_WORKERS):
+        self.directory = directory
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._paths = TTLCache(PROFILE_PATH_CACHE_TTL, PROFILE_PATH_CACHE_MAX_ENTRIES)
+        self.uploads = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.removed = 0
+        self.not_modified = 0
+
+    async def _write_upload(self, file: UploadFile, tmp_path: str) -> str:
+        # 요청 본문 크기는 UploadSizeLimitMiddleware에서 먼저 제한하고, 여기서는 파일 부분만 정확히 확인
+        written = 0
+        digest = hashlib.sha256()
+        buffer = await run_in_threadpool(open, tmp_path, "wb")
+        try:
+            while True:
+                chunk = await file.read(PROFILE_IMAGE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > PROFILE_IMAGE_MAX_BYTES:
+                    raise _too_large()
+                digest.update(chunk)
+                await run_in_threadpool(buffer.write, chunk)
+        finally:
+            await run_in_threadpool(buffer.close)
+        return digest.hexdigest()
+
+    def _existing(self, stem: str) -> Optional[str]:
+        # 같은 내용의 원본과 썸네일이 모두 있으면 그 경로 반환
+        for extension in IMAGE_EXTENSIONS.values():
+            path = f"{stem}.{extension}"
+            if os.path.exists(path) and all(
+                os.path.exists(thumbnail_path(path, size)) for size in PROFILE_THUMBNAIL_SIZES
+            ):
+                return path
+        return None
+
+    async def save(self, file: UploadFile) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = os.path.join(self.directory, f".upload-{uuid.uuid4()}")
+        try:
+            content_hash = await self._write_upload(file, tmp_path)
+            stem = os.path.join(self.directory, content_hash)
+            existing = self._existing(stem)
+            if existing is not None:
+                # 이미 있는 이미지: 삭제 대기 중인 파일이 지워지지 않도록 수정 시간 갱신
+                os.utime(existing)
+                self._cleanup(tmp_path)
+                self.deduplicated += 1
+                return existing
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            try:
+                path = await asyncio.get_running_loop().run_in_executor(
+                    self._executor,
+                    _process_image,
+                    tmp_path,
+                    stem,
+                    PROFILE_THUMBNAIL_SIZES,
+                    PROFILE_THUMBNAIL_FORMAT,
+                    PROFILE_IMAGE_MAX_PIXELS,
+                )
+            except Exception as e:
+                logging.info(f"Rejected profile image upload: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="이미지 파일을 처리할 수 없습니다.",
+                )
+        except HTTPException:
+            self.rejected += 1
+            self._cleanup(tmp_path)
+            raise
+        self.uploads += 1
+        return path
+
+    def _cleanup(self, tmp_path: str):
+        for path in [tmp_path] + [f"{tmp_path}.{size}" for size in PROFILE_THUMBNAIL_SIZES]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def resolve(self, profile_path: str, size: Optional[int] = None) -> str:
+        # 요청한 크기 이상인 가장 작은 썸네일, 없으면(이전 업로드 등) 원본
+        if size is not None:
+            for thumb_size in sorted(PROFILE_THUMBNAIL_SIZES):
+                if thumb_size >= size:
+                    path = thumbnail_path(profile_path, thumb_size)
+                    if os.path.exists(path):
+                        return path
+                    break
+        return profile_path
+
+    def content_path(self, filename: str) -> Optional[str]:
+        # 내용 해시 이름만 허용 (경로 조작 방지)
+        if not CONTENT_FILE_PATTERN.match(filename):
+            return None
+        return os.path.join(self.directory, filename)
+
+    def _remove_files(self, profile_path: str) -> int:
+        removed = 0
+        for path in [profile_path] + [thumbnail_path(profile_path, size) for size in PROFILE_THUMBNAIL_SIZES]:
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+        self.removed += removed
+        return removed
+
+    async def remove_if_unreferenced(self, engine: AIOEngine, profile_path: Optional[str]) -> int:
+        """다른 유저가 참조하지 않고 최근에 업로드되지 않은 이미지만 삭제 (남은 파일은 sweep_orphans에서 정리)"""
+        if not profile_path or not os.path.exists(profile_path):
+            return 0
+        if await engine.get_collection(User).count_documents({"profile": profile_path}, limit=1):
+            return 0
+        if time.time() - os.path.getmtime(profile_path) < PROFILE_IMAGE_GRACE_SECONDS:
+            return 0
+        return self._remove_files(profile_path)
+
+    async def sweep_orphans(self, engine: AIOEngine) -> int:
+        """어떤 유저도 참조하지 않는 이미지와 오래된 업로드 임시 파일 삭제"""
+        if not os.path.isdir(self.directory):
+            return 0
+        referenced = set(await engine.get_collection(User).distinct("profile"))
+        now = time.time()
+        removed = 0
+        for entry in os.scandir(self.directory):
+            if now - entry.stat().st_mtime < PROFILE_IMAGE_GRACE_SECONDS:
+                continue
+            if entry.name.startswith(".upload-"):
+                os.remove(entry.path)
+                removed += 1
+                continue
+            stem, extension = os.path.splitext(entry.name)
+            # 썸네일은 원본과 함께 삭제
+            if "_" in stem or extension.lstrip(".") not in IMAGE_EXTENSIONS.values():
+                continue
+            if entry.path not in referenced:
+                removed += self._remove_files(entry.path)
+        return removed
+
+    def cached_path(self, user_id: str) -> Optional[str]:
+        return self._paths.get(user_id)
+
+    def remember(self, user_id: str, profile_path: str):
+        self._paths.set(user_id, profile_path)
+
+    def forget(self, user_id: str):
+        self._paths.pop(user_id)
+
+    def serve(self, request: Request, path: str, immutable: bool = False) -> Response:
+        """강한 ETag/Last-Modified와 함께 파일 반환, 조건부 요청이 일치하면 304"""
+        mtime = os.path.getmtime(path)
+        headers = {
+            "ETag": _etag(path),
+            "Last-Modified": formatdate(mtime, usegmt=True),
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        }
+        if _not_modified(request, headers["ETag"], mtime):
+            self.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return FileResponse(path, headers=headers)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "max_bytes": PROFILE_IMAGE_MAX_BYTES,
+            "thumbnail_sizes": list(PROFILE_THUMBNAIL_SIZES),
+            "thumbnail_format": PROFILE_THUMBNAIL_FORMAT,
+            "workers": self.workers,
+            "uploads": self.uploads,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "removed_files": self.removed,
+            "not_modified": self.not_modified,
+            "cached_paths": len(self._paths),
+            "path_hits": self._paths.hits,
+            "path_misses": self._paths.misses,
+        }
+
+
+profile_image_store = ProfileImageStore()
+
+
+class UploadSizeLimitMiddleware:
+    """업로드 경로의 요청 본문 크기를 multipart 파싱(임시 파일 저장) 전에 제한 (ASGI 미들웨어)
+
+    - Content-Length가 한도를 넘으면 본문을 읽지 않고 바로 413
+    - Content-Length가 없거나 실제 본문이 더 길면 읽는 도중 한도를 넘는 순간 413
+    """
+
+    def __init__(
+        self,
+        app,
+        path: str = PROFILE_UPLOAD_PATH,
+        max_bytes: int = PROFILE_IMAGE_MAX_BYTES + PROFILE_UPLOAD_OVERHEAD_BYTES,
+        store: Optional[ProfileImageStore] = None,
+    ):
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+        self.store = store or profile_image_store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].rstrip("/") != self.path:
+            await self.app(scope, receive, send)
+            return
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            self.store.rejected += 1
+            error = _too_large()
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    self.store.rejected += 1
+                    # FastAPI는 본문 파싱 중 발생한 HTTPException을 그대로 응답으로 변환
+                    raise _too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,160 @@
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException, Request
+from pymongo import ReturnDocument
+from starlette import status
+from src.final_backend.database import get_database
+
+# 버킷 크기(연속 허용 횟수)와 분당 충전량
+RATE_LIMIT_EMAIL_BURST = int(os.getenv("RATE_LIMIT_EMAIL_BURST", "3"))
+RATE_LIMIT_EMAIL_PER_MINUTE = float(os.getenv("RATE_LIMIT_EMAIL_PER_MINUTE", "1"))
+RATE_LIMIT_IP_BURST = int(os.getenv("RATE_LIMIT_IP_BURST", "20"))
+RATE_LIMIT_IP_PER_MINUTE = float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", "10"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# "memory"(기본, 워커별) 또는 "mongo"(여러 워커가 버킷을 공유)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_COLLECTION = "rate_limit"
+# 프록시 뒤에서 실행할 때만 X-Forwarded-For의 첫 번째 주소를 클라이언트 IP로 사용
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+
+
+class MemoryBucketBackend:
+    """워커 메모리의 토큰 버킷 (키 수는 LRU로 제한)"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def consume(self, key: str, burst: int, per_second: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class MongoBucketBackend:
+    """여러 워커가 공유하는 MongoDB 토큰 버킷
+
+    충전과 차감을 pipeline update 한 번(find_one_and_update)으로 처리하므로 동시에 요청해도 토큰이 중복 사용되지 않는다.
+    """
+
+    def __init__(self, collection_getter: Callable[[], Any]):
+        self._collection_getter = collection_getter
+
+    @property
+    def collection(self):
+        return self._collection_getter()
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def consume(self, key: str, burst: int, per_second: float) -> Tuple[bool, float]:
+        now = datetime.utcnow()
+        # 버킷이 가득 차는 시간이 지나면 문서가 없는 것과 같으므로 TTL로 삭제
+        expires_at = now + timedelta(seconds=burst / per_second if per_second > 0 else 86400)
+        elapsed_seconds = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        doc = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {
+                    "$set": {
+                        "tokens": {
+                            "$min": [
+                                burst,
+                                {"$add": [{"$ifNull": ["$tokens", burst]}, {"$multiply": [elapsed_seconds, per_second]}]},
+                            ]
+                        },
+                        "updated_at": now,
+                        "expires_at": expires_at,
+                    }
+                },
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}}},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["allowed"], doc["tokens"]
+
+    def __len__(self):
+        return 0
+
+
+class RateLimiter:
+    """이메일 주소와 클라이언트 IP별 토큰 버킷
+
+    DB 조회나 메일 발송 전에 호출해 남용 요청을 429로 거절한다.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryBucketBackend()
+        self.allowed = 0
+        self.rejected: Dict[str, int] = {}
+
+    async def check(self, scope: str, key: str, burst: int, per_minute: float):
+        per_second = per_minute / 60
+        allowed, tokens = await self.backend.consume(f"{scope}:{key}", burst, per_second)
+        if allowed:
+            self.allowed += 1
+            return
+        self.rejected[scope] = self.rejected.get(scope, 0) + 1
+        retry_after = int((1 - tokens) / per_second) + 1 if per_second > 0 else 60
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    def stats(self) -> dict:
+        return {
+            "backend": "mongo" if isinstance(self.backend, MongoBucketBackend) else "memory",
+            "email": {"burst": RATE_LIMIT_EMAIL_BURST, "per_minute": RATE_LIMIT_EMAIL_PER_MINUTE},
+            "ip": {"burst": RATE_LIMIT_IP_BURST, "per_minute": RATE_LIMIT_IP_PER_MINUTE},
+            "tracked_keys": len(self.backend),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def email_rate_limit(action: str):
+    """`email` 쿼리 매개변수와 클라이언트 IP로 요청 횟수를 제한하는 FastAPI 의존성"""
+
+    async def dependency(request: Request):
+        await rate_limiter.check(f"{action}:ip", client_ip(request), RATE_LIMIT_IP_BURST, RATE_LIMIT_IP_PER_MINUTE)
+        email: Optional[str] = request.query_params.get("email")
+        if email:
+            await rate_limiter.check(
+                f"{action}:email", email.strip().lower(), RATE_LIMIT_EMAIL_BURST, RATE_LIMIT_EMAIL_PER_MINUTE
+            )
+
+    return dependency
+
+
+def _create_backend():
+    if RATE_LIMIT_BACKEND != "mongo":
+        return None
+    return MongoBucketBackend(lambda: get_database()[RATE_LIMIT_COLLECTION])
+
+
+rate_limiter = RateLimiter(backend=_create_backend())
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, HTTPException, Query, Body, Depends, Header, Request
+from fastapi.responses import StreamingResponse, Response
+from typing import Optional
+import json
+from odmantic import AIOEngine
+from src.final_backend.database import get_engine
 from src.final_backend.movie_crud import (
     save_movie_to_db,
     fetch_movies_by_ids,
     fetch_all_movies,
+    iter_movies,
+    bulk_upsert_movies,
 )
+from src.final_backend.movie_catalog import movie_catalog
 import logging
 
 # APIRouter 생성 시 prefix와 tags 설정
@@ -12,33 +20,110 @@ movie_router = APIRouter(prefix="/movie", tags=["Movie"])
 
 # 영화 저장 엔드포인트
 @movie_router.post("/save")
-async def save_movie(movie: dict = Body(...)):
+async def save_movie(
+    movie: dict = Body(...), engine: AIOEngine = Depends(get_engine)
+):
     try:
-        result = await save_movie_to_db(movie)
+        result = await save_movie_to_db(engine, movie)
         return result
     except Exception as e:
         logging.error(f"Error saving movie with data {movie}: {e}")
         raise HTTPException(status_code=500, detail="Failed to save movie.")
 
 
+async def _iter_json_array(items: list):
+    for item in items:
+        yield item
+
+
+async def _iter_ndjson(request: Request):
+    # 요청 본문을 받는 대로 한 줄씩 JSON으로 변환 (본문 전체를 메모리에 올리지 않음)
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_ndjson_line(line)
+    if buffer.strip():
+        yield _parse_ndjson_line(buffer)
+
+
+def _parse_ndjson_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None  # validate_movie_data에서 rejected 처리
+
+
+# 영화 일괄 저장 엔드포인트 (JSON 배열 또는 NDJSON)
+@movie_router.post("/bulk")
+async def save_movies_bulk(request: Request, engine: AIOEngine = Depends(get_engine)):
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type:
+        movies = _iter_ndjson(request)
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON.")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON.")
+        movies = _iter_json_array(body)
+
+    try:
+        return await bulk_upsert_movies(engine, movies)
+    except Exception as e:
+        logging.error(f"Error in /movie/bulk: {e}")
+        raise HTTPException(status_code=500, detail="Failed to save movies.")
+
+
 # 모든 영화 조회 엔드포인트
 @movie_router.get("/all")
-async def get_all_movies():
+async def get_all_movies(
+    after: Optional[int] = Query(None, description="이 movie_id 다음부터 조회 (keyset 페이지네이션)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="한 페이지의 최대 영화 수"),
+    response_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    if_none_match: Optional[str] = Header(None),
+    engine: AIOEngine = Depends(get_engine),
+):
+    if after is None and limit is None and response_format == "json":
+        # 전체 목록은 미리 직렬화한 스냅샷으로 응답 (목록이 바뀌기 전까지 DB 조회 없음)
+        try:
+            snapshot = await movie_catalog.get(lambda: fetch_all_movies(engine))
+        except Exception:
+            raise HTTPException(status_code=500, detail="Failed to fetch movies.")
+        headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+        if if_none_match and snapshot.etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+    if response_format == "ndjson":
+        # 커서에서 읽는 대로 한 줄씩 전송 (전체 목록을 메모리에 만들지 않음)
+        async def stream():
+            async for movie in iter_movies(engine, after, limit):
+                yield json.dumps(movie, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
     try:
-        movies = await fetch_all_movies()
-        return {"movies": movies}
+        movies = await fetch_all_movies(engine, after, limit)
+        next_after = movies[-1]["movie_id"] if limit and len(movies) == limit else None
+        return {"movies": movies, "next_after": next_after}
     except Exception:
         raise HTTPException(status_code=500, detail="Failed to fetch movies.")
 
 
 # 영화 ID로 조회 엔드포인트
 @movie_router.get("/list")
-async def get_movies_by_ids(movie_ids: list[int] = Query(...)):
+async def get_movies_by_ids(
+    movie_ids: list[int] = Query(...), engine: AIOEngine = Depends(get_engine)
+):
     try:
-        movies = await fetch_movies_by_ids(movie_ids)
+        movies, missing_ids = await fetch_movies_by_ids(engine, movie_ids)
         if not movies:
-            return {"message": "No movies found for the provided IDs."}
-        return {"movies": movies}
+            return {"message": "No movies found for the provided IDs.", "missing_ids": missing_ids}
+        return {"movies": movies, "missing_ids": missing_ids}
     except Exception as e:
         logging.error(f"Exception in /movies/list: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch movies.")
@@ -0,0 +1,97 @@
+from fastapi import APIRouter, Depends
+from odmantic import AIOEngine
+from starlette.concurrency import run_in_threadpool
+from src.final_backend.database import pool_stats, get_engine
+from src.final_backend.auth_cache import principal_cache
+from src.final_backend.feed_cache import feed_cache
+from src.final_backend.profile_cache import profile_cache
+from src.final_backend.profile_images import profile_image_store
+from src.final_backend.email_outbox import email_outbox
+from src.final_backend.rate_limiter import rate_limiter
+from src.final_backend.admission_control import admission_controller
+from src.final_backend.index_manager import reconcile_indexes
+from src.final_backend.password_hasher import password_hasher
+from src.final_backend.similarity_engine import similarity_engine
+from src.final_backend.tmdb_cache import tmdb_cache
+from src.final_backend.movie_catalog import movie_catalog
+
+# 운영 지표 조회용 APIRouter
+stats_router = APIRouter(prefix="/stats", tags=["Stats"])
+
+
+# MongoDB 커넥션 풀 사용 현황 (checked-out 커넥션 수, 대기 시간)
+@stats_router.get("/db")
+async def get_db_pool_stats():
+    return pool_stats.snapshot()
+
+
+# 실시간 유사도 엔진 상태 (사용자/영화 수, 대기 중인 변경 행 수)
+@stats_router.get("/similarity")
+async def get_similarity_engine_stats():
+    return await run_in_threadpool(similarity_engine.stats)
+
+
+# TMDb 응답 캐시 hit/miss/eviction 카운터
+@stats_router.get("/tmdb")
+async def get_tmdb_cache_stats():
+    return tmdb_cache.stats()
+
+
+# /movie/all 카탈로그 스냅샷 버전과 재생성 횟수
+@stats_router.get("/catalog")
+async def get_movie_catalog_stats():
+    return movie_catalog.stats()
+
+
+# 모델에 선언된 인덱스 검증 결과 (없는/옵션이 다른/선언되지 않은/사용되지 않은 인덱스)
+@stats_router.get("/indexes")
+async def get_index_report(engine: AIOEngine = Depends(get_engine)):
+    return await reconcile_indexes(engine, apply=False)
+
+
+# bcrypt 스레드 풀 대기열과 해시/대기 시간
+@stats_router.get("/passwords")
+async def get_password_hasher_stats():
+    return password_hasher.stats()
+
+
+# 메일 outbox 상태별 건수와 전송/재시도/실패 횟수
+@stats_router.get("/email")
+async def get_email_outbox_stats(engine: AIOEngine = Depends(get_engine)):
+    return await email_outbox.stats(engine)
+
+
+# 토큰 → 사용자 캐시 hit/miss/무효화 횟수
+@stats_router.get("/auth")
+async def get_auth_cache_stats():
+    return principal_cache.stats()
+
+
+# 유저별 피드 캐시 hit/miss/무효화 횟수
+@stats_router.get("/feed")
+async def get_feed_cache_stats():
+    return feed_cache.stats()
+
+
+# /user/batch 공개 프로필 캐시 hit/miss
+@stats_router.get("/profiles")
+async def get_profile_cache_stats():
+    return profile_cache.stats()
+
+
+# 프로필 이미지 업로드/거부 횟수와 썸네일 설정
+@stats_router.get("/images")
+async def get_profile_image_stats():
+    return profile_image_store.stats()
+
+
+# 인증 메일/비밀번호 재설정 요청 제한 현황 (허용/거절 횟수)
+@stats_router.get("/ratelimit")
+async def get_rate_limit_stats():
+    return rate_limiter.stats()
+
+
+# 경로별 동시 실행 수 제한 현황 (실행/대기 중인 요청 수, 거절 횟수)
+@stats_router.get("/admission")
+async def get_admission_stats():
+    return admission_controller.stats()
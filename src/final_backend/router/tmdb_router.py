@@ -1,7 +1,14 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends, BackgroundTasks
 import httpx
-from typing import List, Optional
+from odmantic import AIOEngine
+from typing import List, Optional, Tuple
+import asyncio
+import logging
 import os
+from src.final_backend.tmdb_cache import tmdb_cache, make_cache_key
+from src.final_backend.tmdb_client import get_tmdb_client
+from src.final_backend.database import get_engine
+from src.final_backend.movie_crud import fetch_local_movie_details, upsert_movie_records
 
 # APIRouter 생성
 tmdb_router = APIRouter(prefix="/tmdb", tags=["TMDB"])
@@ -9,9 +16,172 @@ tmdb_router = APIRouter(prefix="/tmdb", tags=["TMDB"])
 # TMDb API Key
 tmdbApiKey = os.getenv("TMDB_KEY")
 
+# TMDb API 기본 URL
+TMDB_BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+
+# 검색 결과 세부 정보를 동시에 요청할 최대 개수
+TMDB_ENRICH_CONCURRENCY = int(os.getenv("TMDB_ENRICH_CONCURRENCY", "8"))
+
+# 검색으로 가져온 영화 정보를 Movie 컬렉션에 저장하고, 저장된 영화는 로컬에서 먼저 조회
+TMDB_WRITE_THROUGH = os.getenv("TMDB_WRITE_THROUGH", "true").lower() == "true"
+
+
+async def tmdb_get(client: httpx.AsyncClient, kind: str, path: str, params: dict) -> dict:
+    # 엔드포인트와 정규화한 파라미터를 키로 캐시 조회, miss 시 upstream 요청은 한 번만 실행
+    params = {'api_key': tmdbApiKey, **params}
+
+    async def fetch():
+        response = await client.get(f'{TMDB_BASE_URL}{path}', params=params)
+        response.raise_for_status()
+        return response.json()
+
+    return await tmdb_cache.get_or_fetch(kind, make_cache_key(kind, path, params), fetch)
+
+
+def fallback_details(movie: dict) -> dict:
+    # 세부 정보 요청 실패 시 기본값 설정
+    return {
+        **movie,
+        "cast": [{"id": '0', "name": '출연진 정보 없음'}],
+        "director": {"id": '0', "name": '감독 정보 없음'},
+        "genres": '장르 정보 없음',
+        "production_countries": '제작 국가 정보 없음'
+    }
+
+
+def extract_credits(detail_data: dict) -> Tuple[List[dict], Optional[dict]]:
+    credits_data = detail_data.get("credits") or {}
+
+    # 출연진 및 감독 정보 추출
+    cast = [
+        {"id": actor["id"], "name": actor["name"]}
+        for actor in credits_data.get("cast", []) if actor.get("character")
+    ][:8]  # 상위 8명만 포함
+    director = next(
+        (crew for crew in credits_data.get("crew", []) if crew.get("job") == "Director"), None
+    )
+    return cast, {"id": director["id"], "name": director["name"]} if director else None
+
+
+def format_movie_details(
+    movie: dict, cast: List[dict], director: Optional[dict], genres: List[str], production_countries: List[str]
+) -> dict:
+    director_info = {
+        "id": director["id"] if director else '0',
+        "name": director["name"] if director else '감독 정보 없음'
+    }
+    return {
+        **movie,
+        "cast": cast,
+        "director": director_info,
+        "genres": ', '.join(genres) or '장르 정보 없음',
+        "production_countries": ', '.join(production_countries) or '제작 국가 정보 없음'
+    }
+
+
+def parse_movie_details(movie: dict, detail_data: dict) -> dict:
+    cast, director = extract_credits(detail_data)
+    genres = [genre['name'] for genre in detail_data.get('genres', [])]
+    production_countries = [country['name'] for country in detail_data.get('production_countries', [])]
+    return format_movie_details(movie, cast, director, genres, production_countries)
+
+
+def local_movie_details(movie: dict, doc: dict) -> dict:
+    # 로컬 Movie 컬렉션에 저장된 정보로 검색 결과 구성
+    return format_movie_details(
+        movie, doc.get("cast") or [], doc.get("director"),
+        doc.get("genre_names") or [], doc.get("production_countries") or [],
+    )
+
+
+def movie_record(movie: dict, detail_data: dict) -> dict:
+    # Movie 모델 형식으로 변환 (write-through 저장용)
+    cast, director = extract_credits(detail_data)
+    return {
+        "movie_id": movie["id"],
+        "title": detail_data.get("title") or movie.get("title"),
+        "original_title": detail_data.get("original_title") or movie.get("original_title"),
+        "overview": detail_data.get("overview") or movie.get("overview"),
+        "poster_path": detail_data.get("poster_path") or movie.get("poster_path"),
+        "original_language": detail_data.get("original_language") or movie.get("original_language"),
+        "genres": [genre["id"] for genre in detail_data.get("genres", [])] or movie.get("genre_ids", []),
+        "release_date": detail_data.get("release_date") or movie.get("release_date"),
+        "cast": cast,
+        "director": director,
+        "genre_names": [genre["name"] for genre in detail_data.get("genres", [])],
+        "production_countries": [country["name"] for country in detail_data.get("production_countries", [])],
+    }
+
+
+async def fetch_movie_details(
+    client: httpx.AsyncClient, movie: dict, semaphore: asyncio.Semaphore
+) -> Tuple[dict, Optional[dict]]:
+    # 상세 정보와 출연진/감독 정보를 한 번의 요청으로 조회 (append_to_response=credits)
+    try:
+        async with semaphore:
+            detail_data = await tmdb_get(client, "movie", f'/movie/{movie["id"]}', {
+                'language': 'ko-KR',
+                'append_to_response': 'credits',
+            })
+        return parse_movie_details(movie, detail_data), movie_record(movie, detail_data)
+    except Exception as e:
+        # 영화 한 편의 실패가 전체 검색 결과에 영향을 주지 않도록 기본값 반환
+        logging.warning(f"Failed to fetch TMDb details for movie {movie.get('id')}: {e}")
+        return fallback_details(movie), None
+
+
+async def search_and_enrich(
+    client: httpx.AsyncClient,
+    q: str,
+    limit: int = 10,
+    page: int = 1,
+    engine: Optional[AIOEngine] = None,
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> List[dict]:
+    # TMDb API에 영화 검색 요청
+    search_data = await tmdb_get(client, "search", '/search/movie', {
+        'query': q,
+        'page': page,
+        'language': 'ko-KR',
+        'include_adult': 'false',
+    })
+    movies = search_data.get('results', [])[:limit]  # limit 만큼 결과 제한
+
+    # 로컬 Movie 컬렉션에 최신 정보가 있는 영화는 TMDb를 호출하지 않음
+    local_movies = {}
+    if engine is not None and TMDB_WRITE_THROUGH:
+        try:
+            local_movies = await fetch_local_movie_details(engine, [movie["id"] for movie in movies])
+        except Exception as e:
+            logging.warning(f"Failed to read local movie details: {e}")
+
+    async def enrich(movie: dict):
+        doc = local_movies.get(movie["id"])
+        if doc is not None:
+            return local_movie_details(movie, doc), None
+        return await fetch_movie_details(client, movie, semaphore)
+
+    # 영화 세부 정보를 동시에 요청 (검색 순서 유지)
+    semaphore = asyncio.Semaphore(TMDB_ENRICH_CONCURRENCY)
+    enriched = await asyncio.gather(*(enrich(movie) for movie in movies))
+
+    # TMDb에서 새로 가져온 정보는 응답 후 백그라운드로 Movie 컬렉션에 저장
+    records = [record for _, record in enriched if record is not None]
+    if records and engine is not None and background_tasks is not None and TMDB_WRITE_THROUGH:
+        background_tasks.add_task(upsert_movie_records, engine, records)
+    return [details for details, _ in enriched]
+
+
 # TMDb 영화 검색 엔드포인트
 @tmdb_router.get("/search")
-async def search_movies(q: str, limit: Optional[int] = 10, page: Optional[int] = 1):
+async def search_movies(
+    q: str,
+    background_tasks: BackgroundTasks,
+    limit: Optional[int] = 10,
+    page: Optional[int] = 1,
+    client: httpx.AsyncClient = Depends(get_tmdb_client),
+    engine: AIOEngine = Depends(get_engine),
+):
     """
     TMDb 영화 검색 엔드포인트.
     영화 정보를 검색하고 출연진, 감독, 장르, 제작 국가를 포함한 결과를 반환합니다.
@@ -19,102 +189,37 @@ async def search_movies(q: str, limit: Optional[int] = 10, page: Optional[int] =
     if not q:
         raise HTTPException(status_code=400, detail='Query parameter "q" is required')
 
-    async with httpx.AsyncClient() as client:
-        try:
-            # TMDb API에 영화 검색 요청
-            response = await client.get('https://api.themoviedb.org/3/search/movie', params={
-                'api_key': tmdbApiKey,
-                'query': q,
-                'page': page,
-                'language': 'ko-KR',
-                'include_adult': 'false',
-            })
-            response.raise_for_status()
-            movies = response.json().get('results', [])
-
-            # 영화 세부 정보 추가
-            movie_details = []
-            for movie in movies[:limit]:  # limit 만큼 결과 제한
-                try:
-                    # 출연진 및 감독 정보 요청
-                    credits_response = await client.get(f'https://api.themoviedb.org/3/movie/{movie["id"]}/credits', params={
-                        'api_key': tmdbApiKey,
-                        'language': 'ko-KR',
-                    })
-                    credits_response.raise_for_status()
-                    credits_data = credits_response.json()
-
-                    # 출연진 및 감독 정보 추출
-                    cast = [
-                        {"id": actor["id"], "name": actor["name"]}
-                        for actor in credits_data["cast"] if actor["character"]
-                    ][:8]  # 상위 8명만 포함
-                    director = next(
-                        (crew for crew in credits_data["crew"] if crew["job"] == "Director"), None
-                    )
-                    director_info = {
-                        "id": director["id"] if director else '0',
-                        "name": director["name"] if director else '감독 정보 없음'
-                    }
-
-                    # 영화 장르 및 제작 국가 정보 요청
-                    detail_response = await client.get(f'https://api.themoviedb.org/3/movie/{movie["id"]}', params={
-                        'api_key': tmdbApiKey,
-                        'language': 'ko-KR',
-                    })
-                    detail_response.raise_for_status()
-                    detail_data = detail_response.json()
-
-                    genres = ', '.join([genre['name'] for genre in detail_data.get('genres', [])]) or '장르 정보 없음'
-                    production_countries = ', '.join([country['name'] for country in detail_data.get('production_countries', [])]) or '제작 국가 정보 없음'
-
-                    movie_details.append({
-                        **movie,
-                        "cast": cast,
-                        "director": director_info,
-                        "genres": genres,
-                        "production_countries": production_countries
-                    })
-                except Exception as e:
-                    # 세부 정보 요청 실패 시 기본값 설정
-                    movie_details.append({
-                        **movie,
-                        "cast": [{"id": '0', "name": '출연진 정보 없음'}],
-                        "director": {"id": '0', "name": '감독 정보 없음'},
-                        "genres": '장르 정보 없음',
-                        "production_countries": '제작 국가 정보 없음'
-                    })
-
-            return {"results": movie_details}
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=500, detail="Failed to fetch data from TMDb API")
+    try:
+        movie_details = await search_and_enrich(client, q, limit, page, engine, background_tasks)
+        return {"results": movie_details}
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=500, detail="Failed to fetch data from TMDb API")
 
 # 영화 ID를 기반으로 YouTube 트레일러 URL 반환 엔드포인트
 @tmdb_router.get("/{movieId}/videos")
-async def get_movie_videos(movieId: int):
+async def get_movie_videos(
+    movieId: int, client: httpx.AsyncClient = Depends(get_tmdb_client)
+):
     """
     TMDb 영화 ID를 기반으로 유튜브 트레일러 URL을 반환합니다.
     """
     if movieId <= 0:
         raise HTTPException(status_code=400, detail="Invalid movie ID")
 
-    async with httpx.AsyncClient() as client:
-        try:
-            # TMDb API에 영화 비디오 정보 요청
-            response = await client.get(f'https://api.themoviedb.org/3/movie/{movieId}/videos', params={
-                'api_key': tmdbApiKey,
-                'language': 'ko-KR',
-            })
-            response.raise_for_status()
-
-            videos = response.json().get('results', [])
-            if not videos:
-                raise HTTPException(status_code=404, detail="No videos found for this movie")
-
-            youtube_trailer = next((video for video in videos if video['site'] == 'YouTube'), None)
-            if youtube_trailer:
-                return {"trailerUrl": f"https://www.youtube.com/watch?v={youtube_trailer['key']}"}
-            else:
-                raise HTTPException(status_code=404, detail="YouTube trailer not found")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=500, detail=f"Failed to fetch video data from TMDb: {e}")
+    try:
+        # TMDb API에 영화 비디오 정보 요청
+        video_data = await tmdb_get(client, "videos", f'/movie/{movieId}/videos', {
+            'language': 'ko-KR',
+        })
+
+        videos = video_data.get('results', [])
+        if not videos:
+            raise HTTPException(status_code=404, detail="No videos found for this movie")
+
+        youtube_trailer = next((video for video in videos if video['site'] == 'YouTube'), None)
+        if youtube_trailer:
+            return {"trailerUrl": f"https://www.youtube.com/watch?v={youtube_trailer['key']}"}
+        else:
+            raise HTTPException(status_code=404, detail="YouTube trailer not found")
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch video data from TMDb: {e}")
@@ -1,12 +1,10 @@
-import uuid
-from fastapi import APIRouter, HTTPException, Depends, File, UploadFile
-from fastapi.responses import FileResponse
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Query, BackgroundTasks, Request, Header
 from starlette import status
 from datetime import timedelta, datetime
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import jwt, JWTError
-from passlib.context import CryptContext
-import pytz, os, shutil
+import pytz, os, secrets
 from src.final_backend import user_crud
 from src.final_backend.schema import (
     UserCreate,
@@ -14,6 +12,8 @@ from src.final_backend.schema import (
     Token,
     UserMovieLists,
     PasswordRequest,
+    ChatRegister,
+    UserBatchRequest,
 )
 from src.final_backend.models import User
 from src.final_backend.user_crud import (
@@ -25,42 +25,89 @@ from src.final_backend.user_crud import (
     send_reset_email,
     generate_temporary_password,
     update_user_info,
+    set_user_fields,
     add_follow,
     delete_follow,
     update_movie_list,
     get_user_info_from_follow_id,
+    list_follows,
+    fetch_user_feed,
+    fetch_user_profiles,
+    USER_BATCH_MAX_IDS,
     verify_email_code,
+    verify_login_password,
 )
 from odmantic import AIOEngine, ObjectId
-from src.final_backend.database import DATABASE_URL
-from motor.motor_asyncio import AsyncIOMotorClient
+from src.final_backend.database import get_engine, get_chat_engine
+from src.final_backend.auth_cache import principal_cache
+from src.final_backend.feed_cache import feed_cache
+from src.final_backend.profile_cache import profile_cache
+from src.final_backend.profile_images import profile_image_store
+from src.final_backend.rate_limiter import email_rate_limit
+from src.final_backend.user_deletion import (
+    DELETION_STEPS,
+    get_user_deletion_job,
+    register_chat_collection,
+    run_user_deletion,
+)
 
 # APIRouter는 여러 엔드포인트를 그룹화하고 관리할 수 있도록 도와주는 객체
 user_router = APIRouter(prefix="/user", tags=["User"])
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # 로그인시 필요한 토큰,키,알고리즘
 ACCESS_TOKEN_EXPIRE_MINUTES = 120
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 
 
-# AIOEngine을 FastAPI에서 사용할 수 있도록 설정
-async def get_engine():
-    client = AsyncIOMotorClient(DATABASE_URL)
-    return AIOEngine(client=client, database="cinetalk")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/login")
+# 토큰이 없어도 되는 엔드포인트용 (내부 토큰으로 대신 인증)
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/login", auto_error=False)
+
+# 채팅 서버/관리자 등 내부 서비스 호출용 공유 비밀값 (`X-Internal-Token` 헤더), 설정하지 않으면 내부 호출 불가
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
 
 
-async def chat_engine():
-    client = AsyncIOMotorClient(DATABASE_URL)
-    return AIOEngine(client=client, database="chat")
+def credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token 검증 불가",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/login")
+def decode_token(token: str) -> dict:
+    # 토큰 검증 (서명 + 만료 시간)
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception()
+    if payload.get("sub") is None:
+        raise credentials_exception()
+    return payload
 
 
-@user_router.post("/check/email", status_code=status.HTTP_200_OK)
+# 사용자 문서가 필요 없는 엔드포인트용: 토큰만 검증하고 이메일(sub) 반환
+async def get_current_email(token: str = Depends(oauth2_scheme)) -> str:
+    return decode_token(token)["sub"]
+
+
+def is_internal_request(internal_token: Optional[str]) -> bool:
+    return bool(INTERNAL_API_TOKEN) and internal_token is not None and secrets.compare_digest(
+        internal_token, INTERNAL_API_TOKEN
+    )
+
+
+async def require_internal_token(x_internal_token: Optional[str] = Header(None)):
+    if not is_internal_request(x_internal_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="내부 서비스만 호출할 수 있습니다.")
+
+
+@user_router.post(
+    "/check/email",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(email_rate_limit("check_email"))],
+)
 async def emailcheck(email=str, engine: AIOEngine = Depends(get_engine)):
     existing_email = await get_existing_email(engine, email)
     if existing_email:
@@ -69,11 +116,15 @@ async def emailcheck(email=str, engine: AIOEngine = Depends(get_engine)):
     # 인증 코드 생성
     verification_code = await generate_email_verification_code(engine, email)
 
-    await send_email_verification(email, verification_code)
+    await send_email_verification(engine, email, verification_code)
     return {"message": f"인증번호가 이메일로 전송되었습니다."}
 
 
-@user_router.post("/verify/email", status_code=status.HTTP_200_OK)
+@user_router.post(
+    "/verify/email",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(email_rate_limit("verify_email"))],
+)
 async def verify_email(email: str, code: str, engine: AIOEngine = Depends(get_engine)):
     return await verify_email_code(engine, email, code)
 
@@ -104,38 +155,83 @@ async def user_create(
 @user_router.delete("/delete", status_code=status.HTTP_200_OK)
 async def user_delete(
     password_request: PasswordRequest,
-    token: str = Depends(oauth2_scheme),
+    background_tasks: BackgroundTasks,
+    user_email: str = Depends(get_current_email),
     engine: AIOEngine = Depends(get_engine),
-    chat_engine: AIOEngine = Depends(chat_engine),
+    chat_engine: AIOEngine = Depends(get_chat_engine),
 ):
-    # 토큰 검증
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Token 검증 불가",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_email: str = payload.get("sub")
-        if user_email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
     # 비밀번호로 유저 삭제
     try:
         delete_result = await user_crud.delete_user(
             engine,
-            chat_engine,
             user_email=user_email,
             password=password_request.password,
         )
-        print(password_request)
+        # 연관 데이터 정리는 응답 후 백그라운드에서 진행 (진행 상황: /user/delete/status)
+        if "job_id" in delete_result:
+            background_tasks.add_task(
+                run_user_deletion, engine, chat_engine, ObjectId(delete_result["job_id"])
+            )
         return delete_result
     except HTTPException as e:
         raise e
 
 
+@user_router.get("/delete/status", status_code=status.HTTP_200_OK)
+async def user_delete_status(job_id: str, engine: AIOEngine = Depends(get_engine)):
+    job = await get_user_deletion_job(engine, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="삭제 작업을 찾을 수 없습니다.")
+    return {
+        "job_id": job_id,
+        "status": job.status,
+        "completed_steps": job.completed_steps,
+        "total_steps": len(DELETION_STEPS),
+        "progress": job.progress,
+        "attempts": job.attempts,
+        "last_error": job.last_error,
+    }
+
+
+# 실패한 정리 작업 재시도 (완료한 단계는 건너뜀), 탈퇴한 본인(탈퇴 전 토큰) 또는 내부 토큰으로만 호출 가능
+@user_router.post("/delete/retry", status_code=status.HTTP_200_OK)
+async def user_delete_retry(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    x_internal_token: Optional[str] = Header(None),
+    engine: AIOEngine = Depends(get_engine),
+    chat_engine: AIOEngine = Depends(get_chat_engine),
+):
+    internal = is_internal_request(x_internal_token)
+    if not internal and token is None:
+        raise credentials_exception()
+    email = None if internal else decode_token(token)["sub"]
+    job = await get_user_deletion_job(engine, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="삭제 작업을 찾을 수 없습니다.")
+    if not internal and job.email != email:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="본인의 삭제 작업만 재시도할 수 있습니다.")
+    if job.status == "done":
+        return {"message": "이미 완료된 삭제 작업입니다.", "job_id": job_id}
+    job.status = "pending"
+    job.attempts = 0
+    await engine.save(job)
+    background_tasks.add_task(run_user_deletion, engine, chat_engine, job.id)
+    return {"message": "삭제 작업을 다시 시작합니다.", "job_id": job_id}
+
+
+# 채팅 서버가 채팅방 컬렉션을 만들 때 참여 유저를 등록 (탈퇴 시 바로 삭제하기 위함)
+@user_router.post(
+    "/chat/register",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_internal_token)],
+)
+async def chat_register(chat: ChatRegister, engine: AIOEngine = Depends(get_engine)):
+    await register_chat_collection(engine, chat.name, chat.members)
+    return {"message": f"채팅방 '{chat.name}' 등록 완료"}
+
+
 @user_router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -149,7 +245,7 @@ async def login(
             detail="일치하지 않은 아이디 입니다.",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    if not pwd_context.verify(form_data.password, user.password):
+    if not await verify_login_password(engine, user, form_data.password):
         print("일치하지 않은 비밀번호 입니다")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -176,25 +272,20 @@ async def get_user_info(
     token: str = Depends(oauth2_scheme),
     engine: AIOEngine = Depends(get_engine),
 ):
+    # 최근에 검증한 토큰이면 DB 조회 없이 캐시된 사용자 반환
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
     # 토큰 검증
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Token 검증 불가",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+    payload = decode_token(token)
 
     # 사용자 검색
-    user = await get_existing_email(engine, email=email)
+    user = await get_existing_email(engine, email=payload["sub"])
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
 
+    principal_cache.set(token, user, payload.get("exp"))
     return user
 
 
@@ -221,7 +312,7 @@ async def update_user(
     }
 
 
-@user_router.post("/password/reset")
+@user_router.post("/password/reset", dependencies=[Depends(email_rate_limit("password_reset"))])
 async def reset_password_request(email: str, engine: AIOEngine = Depends(get_engine)):
     # email만으로 사용자 확인
     user_by_email = await get_existing_email(engine, email)
@@ -234,7 +325,7 @@ async def reset_password_request(email: str, engine: AIOEngine = Depends(get_eng
     # 임시 비밀번호 생성
     temporary_password = await generate_temporary_password(engine, user)
     # 이메일로 임시 비밀번호 전송
-    await send_reset_email(email, temporary_password)
+    await send_reset_email(engine, email, temporary_password)
     return {
         "message": f"임시 비밀번호가 이메일로 전송되었습니다. 로그인 후 비밀번호를 변경하세요."
     }
@@ -251,51 +342,76 @@ async def upload_profile_image(
     if not user:
         raise HTTPException(status_code=404, detail="일치하는 유저 id가 없습니다.")
 
-    if user.profile and os.path.exists(user.profile):
-        os.remove(user.profile)
-    # 업로드된 파일 저장 경로 설정
-    upload_directory = "profile_images"
-    if not os.path.exists(upload_directory):
-        os.makedirs(upload_directory)
-
-    file_ext = file.content_type.split("/")[-1]
+    # 크기 제한을 두고 나눠서 저장한 뒤 썸네일 생성 (실패 시 기존 이미지는 그대로 유지)
+    file_location = await profile_image_store.save(file)
 
-    file_location = os.path.join(upload_directory, f"{uuid.uuid4()}.{file_ext}")
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    # 사용자 프로필 이미지 경로 업데이트
-    user.profile = file_location
+    # 사용자 프로필 이미지 경로 업데이트 후 다른 유저가 쓰지 않는 기존 이미지와 썸네일 삭제
+    previous_profile = user.profile
 
     # 사용자 정보 저장
-    await engine.save(user)
+    if not await set_user_fields(engine, user, {"profile": file_location}):
+        raise HTTPException(status_code=404, detail="일치하는 유저 id가 없습니다.")
+    principal_cache.invalidate_user(user.email)
+    profile_cache.invalidate(str(user.id))
+    profile_image_store.remember(str(user.id), file_location)
+    if previous_profile and previous_profile != file_location:
+        await profile_image_store.remove_if_unreferenced(engine, previous_profile)
 
-    return {"message": "프로필 이미지 업로드 완료", "file_path": user.profile}
+    return {
+        "message": "프로필 이미지 업로드 완료",
+        "file_path": user.profile,
+        "image_url": f"/user/profile/image/{os.path.basename(user.profile)}",
+    }
 
 
 @user_router.get("/profile/get", status_code=status.HTTP_200_OK)
-async def get_profile_image(id: str, engine: AIOEngine = Depends(get_engine)):
-
-    user = await engine.find_one(User, User.id == ObjectId(id))
-    if not user:
-        raise HTTPException(status_code=404, detail="일치하는 유저 id가 없습니다.")
+async def get_profile_image(
+    id: str,
+    request: Request,
+    size: Optional[int] = Query(None, ge=1),
+    engine: AIOEngine = Depends(get_engine),
+):
+    # 최근에 조회한 유저는 메모리에 있는 이미지 경로 사용 (DB 조회 생략)
+    profile = profile_image_store.cached_path(id)
+    if profile is None:
+        user = await engine.get_collection(User).find_one({"_id": ObjectId(id)}, {"profile": 1})
+        if not user:
+            raise HTTPException(status_code=404, detail="일치하는 유저 id가 없습니다.")
+
+        # 프로필 이미지 경로 확인
+        profile = user.get("profile")
+        if not profile:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="프로필 이미지가 존재하지 않습니다.",
+            )
+        profile_image_store.remember(id, profile)
+
+    # 요청한 크기(px)에 맞는 썸네일, 없으면 원본 이미지 파일 경로
+    path = profile_image_store.resolve(profile, size)
 
-    # 프로필 이미지 경로 확인
-    if not user.profile:
+    # 이미지 파일의 경로 확인
+    if not os.path.exists(path):
+        profile_image_store.forget(id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="프로필 이미지가 존재하지 않습니다.",
+            detail="서버에서 프로필 이미지 파일을 찾을 수 없습니다.",
         )
 
-    # 이미지 파일의 경로 확인
-    if not os.path.exists(user.profile):
+    # 같은 URL이어도 이미지가 바뀔 수 있으므로 ETag로 재검증 (변경 없으면 304)
+    return profile_image_store.serve(request, path)
+
+
+# 내용 해시 이름의 이미지 (내용이 바뀌지 않으므로 immutable 캐시)
+@user_router.get("/profile/image/{filename}", status_code=status.HTTP_200_OK)
+async def get_profile_image_by_hash(filename: str, request: Request):
+    path = profile_image_store.content_path(filename)
+    if path is None or not os.path.exists(path):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="서버에서 프로필 이미지 파일을 찾을 수 없습니다.",
         )
-
-    # 이미지 파일을 반환
-    return FileResponse(user.profile)
+    return profile_image_store.serve(request, path, immutable=True)
 
 
 @user_router.post("/follow")
@@ -320,6 +436,32 @@ async def follow_Delete(
     return result
 
 
+async def _batch_profiles(engine: AIOEngine, ids: List[str]):
+    if len(ids) > USER_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"한 번에 최대 {USER_BATCH_MAX_IDS}명까지 조회할 수 있습니다.",
+        )
+    users, missing_ids = await fetch_user_profiles(engine, ids)
+    return {"users": users, "missing_ids": missing_ids}
+
+
+# 여러 유저의 닉네임/프로필 이미지/영화 목록을 한 번에 조회 (?ids=a,b,c 또는 ?ids=a&ids=b)
+@user_router.get("/batch")
+async def get_users_batch(
+    ids: List[str] = Query(...),
+    engine: AIOEngine = Depends(get_engine),
+):
+    user_ids = [user_id.strip() for value in ids for user_id in value.split(",") if user_id.strip()]
+    return await _batch_profiles(engine, user_ids)
+
+
+# id가 많아 URL이 길어질 때 사용하는 POST 버전
+@user_router.post("/batch")
+async def post_users_batch(request: UserBatchRequest, engine: AIOEngine = Depends(get_engine)):
+    return await _batch_profiles(engine, request.ids)
+
+
 @user_router.get("/follow/info")
 async def follow_user_getInfo(follow_id: str, engine: AIOEngine = Depends(get_engine)):
     result = await get_user_info_from_follow_id(engine, follow_id)
@@ -327,6 +469,45 @@ async def follow_user_getInfo(follow_id: str, engine: AIOEngine = Depends(get_en
     return result
 
 
+# 팔로워 목록 (follow 컬렉션 인덱스로 최신순 페이지 조회)
+@user_router.get("/followers")
+async def get_followers(
+    user_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    engine: AIOEngine = Depends(get_engine),
+):
+    return await list_follows(engine, user_id, "followers", offset, limit)
+
+
+# 팔로잉 목록
+@user_router.get("/following")
+async def get_following(
+    user_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    engine: AIOEngine = Depends(get_engine),
+):
+    return await list_follows(engine, user_id, "following", offset, limit)
+
+
+# 팔로우 중인 유저들의 영화 목록 피드 (영화별 중복 제거, 담은 친구가 많은 순)
+@user_router.get("/feed")
+async def get_user_feed(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_user_info),
+    engine: AIOEngine = Depends(get_engine),
+):
+    user_id = str(current_user.id)
+    page = feed_cache.get(user_id, offset, limit)
+    if page is None:
+        page = await fetch_user_feed(engine, current_user.id, offset, limit)
+        friend_ids = [str(friend_id) for friend_id in current_user.following or []]
+        feed_cache.set(user_id, friend_ids, offset, limit, page)
+    return page
+
+
 @user_router.put("/update/movies", status_code=status.HTTP_200_OK)
 async def update_user_movies(
     movie_data: UserMovieLists,
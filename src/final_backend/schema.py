@@ -1,6 +1,9 @@
-from pydantic import BaseModel, EmailStr
+import re
+from pydantic import BaseModel, EmailStr, model_validator
 from typing import Optional, List
 
+OBJECT_ID_PATTERN = re.compile(r"[0-9a-f]{24}")
+
 
 # 사용자 생성 시 필요한 데이터 정의
 class UserCreate(BaseModel):
@@ -27,3 +30,21 @@ class UserMovieLists(BaseModel):
 
 class PasswordRequest(BaseModel):
     password: str
+
+
+class ChatRegister(BaseModel):
+    name: str
+    members: List[str]
+
+    # 채팅방 컬렉션 이름은 참여 유저 id로 구성되므로 이름의 id와 members가 같아야 함 (아니면 422)
+    @model_validator(mode="after")
+    def check_members(self):
+        if not self.members or any(not OBJECT_ID_PATTERN.fullmatch(member) for member in self.members):
+            raise ValueError("members는 유저 ObjectId 목록이어야 합니다.")
+        if set(OBJECT_ID_PATTERN.findall(self.name)) != set(self.members):
+            raise ValueError("채팅방 이름에 포함된 유저 id와 members가 일치하지 않습니다.")
+        return self
+
+
+class UserBatchRequest(BaseModel):
+    ids: List[str]
@@ -0,0 +1,77 @@
+"""기존 `YYYYMMDD_similarity` 컬렉션을 사용자별 top-K 이웃 배열 포맷으로 변환
+
+사용법:
+    python -m src.final_backend.similarity_convert 20241201_similarity --k 100
+
+변환 결과는 `<컬렉션>_topk_tmp`에 기록한 뒤 원본 컬렉션 이름으로 교체한다.
+`--target`을 지정하면 원본을 유지하고 해당 이름으로 저장한다.
+"""
+import argparse
+import asyncio
+import logging
+from pymongo import ASCENDING
+from src.final_backend.database import get_client, close_db, DB_NAME
+from src.final_backend.similarity_crud import (
+    SIMILARITY_TOP_K,
+    build_topk_doc,
+    is_topk_doc,
+)
+
+BATCH_SIZE = 500
+
+
+async def convert_similarity_collection(
+    database, source: str, target: str = None, k: int = SIMILARITY_TOP_K
+) -> int:
+    replace_source = target is None
+    write_name = f"{source}_topk_tmp" if replace_source else target
+    source_collection = database[source]
+    write_collection = database[write_name]
+    await write_collection.drop()
+
+    converted = 0
+    batch = []
+    async for doc in source_collection.find({}):
+        if "index" not in doc:
+            continue
+        if is_topk_doc(doc):
+            new_doc = {key: value for key, value in doc.items() if key != "_id"}
+        else:
+            new_doc = build_topk_doc(doc, k)
+        batch.append(new_doc)
+        if len(batch) >= BATCH_SIZE:
+            await write_collection.insert_many(batch, ordered=False)
+            converted += len(batch)
+            batch = []
+    if batch:
+        await write_collection.insert_many(batch, ordered=False)
+        converted += len(batch)
+
+    # find_one({"index": ...}) 조회용 인덱스
+    await write_collection.create_index([("index", ASCENDING)], unique=True)
+
+    if replace_source:
+        # 같은 이름으로 교체하므로 API 서버가 캐싱한 컬렉션 이름은 그대로 유효함
+        await write_collection.rename(source, dropTarget=True)
+    return converted
+
+
+async def main(args):
+    database = get_client()[args.database]
+    try:
+        count = await convert_similarity_collection(
+            database, args.source, target=args.target, k=args.k
+        )
+        logging.info(f"{args.source}: {count} documents converted (k={args.k})")
+    finally:
+        close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="변환할 similarity 컬렉션 이름 (예: 20241201_similarity)")
+    parser.add_argument("--target", default=None, help="원본을 유지하고 저장할 컬렉션 이름")
+    parser.add_argument("--k", type=int, default=SIMILARITY_TOP_K, help="사용자별 보관할 이웃 수")
+    parser.add_argument("--database", default=DB_NAME)
+    asyncio.run(main(parser.parse_args()))
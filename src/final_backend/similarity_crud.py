@@ -0,0 +1,174 @@
+import asyncio
+import heapq
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from bson import ObjectId
+from odmantic import AIOEngine
+from starlette.concurrency import run_in_threadpool
+from src.final_backend.similarity_engine import similarity_engine
+
+USER_COLLECTION = "user"
+SIMILARITY_SUFFIX = "_similarity"
+
+# 압축 포맷(top-K 배열)에 보관하는 사용자별 이웃 수
+SIMILARITY_TOP_K = int(os.getenv("SIMILARITY_TOP_K", "100"))
+
+# 어제 컬렉션을 사용 중일 때 오늘 컬렉션 생성 여부를 다시 확인하는 주기(초)
+SIMILARITY_RECHECK_SECONDS = float(os.getenv("SIMILARITY_RECHECK_SECONDS", "60"))
+
+
+def similarity_collection_name(day: datetime) -> str:
+    return f"{day.strftime('%Y%m%d')}{SIMILARITY_SUFFIX}"
+
+
+class SimilarityCollectionResolver:
+    """현재 사용할 `YYYYMMDD_similarity` 컬렉션 이름을 캐싱
+
+    오늘 컬렉션을 찾은 뒤에는 날짜가 바뀔 때까지 DB를 조회하지 않고,
+    어제 컬렉션을 사용 중일 때만 주기적으로 오늘 컬렉션이 생겼는지 확인한다.
+    """
+
+    def __init__(self, recheck_seconds: float = SIMILARITY_RECHECK_SECONDS):
+        self.recheck_seconds = recheck_seconds
+        self.name: Optional[str] = None
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self, today: str, yesterday: str) -> bool:
+        if self.name == today:
+            return True
+        if self.name == yesterday:
+            return time.monotonic() - self.checked_at < self.recheck_seconds
+        return False
+
+    async def resolve(self, database) -> Optional[str]:
+        now = datetime.now()
+        today = similarity_collection_name(now)
+        yesterday = similarity_collection_name(now - timedelta(days=1))
+        if self._is_fresh(today, yesterday):
+            return self.name
+
+        async with self._lock:
+            # 대기 중 다른 요청이 이미 갱신했을 수 있음
+            if self._is_fresh(today, yesterday):
+                return self.name
+            names = await database.list_collection_names(
+                filter={"name": {"$in": [today, yesterday]}}
+            )
+            if today in names:
+                self.name = today
+            elif yesterday in names:
+                self.name = yesterday
+            else:
+                self.name = None
+            self.checked_at = time.monotonic()
+            return self.name
+
+    def invalidate(self):
+        self.name = None
+        self.checked_at = 0.0
+
+
+similarity_resolver = SimilarityCollectionResolver()
+
+
+async def fetch_similarity_doc(
+    engine: AIOEngine, index: str, top_n: int = SIMILARITY_TOP_K, offset: int = 0
+):
+    collection_name = await similarity_resolver.resolve(engine.database)
+    if collection_name is None:
+        return None, None
+    # top-K 포맷이면 요청한 구간의 이웃만 서버에서 잘라서 가져옴
+    # ($slice만 있는 projection은 나머지 필드를 그대로 반환하므로 기존 포맷도 동일하게 조회됨)
+    doc = await engine.database[collection_name].find_one(
+        {"index": index}, {"neighbors": {"$slice": [offset, top_n]}}
+    )
+    return collection_name, doc
+
+
+def is_topk_doc(doc: dict) -> bool:
+    return isinstance(doc.get("neighbors"), list)
+
+
+def build_topk_doc(legacy_doc: dict, k: int = SIMILARITY_TOP_K) -> dict:
+    """`{index, <user_id>: score, ...}` 문서를 정렬된 top-K 이웃 배열 문서로 변환"""
+    index = legacy_doc["index"]
+    top = select_top_similar(legacy_doc, index, k)
+    return {
+        "index": index,
+        "k": k,
+        "neighbors": [
+            {"user_id": ObjectId(user_id), "score": float(score)}
+            for user_id, score in top
+        ],
+    }
+
+
+USER_DETAIL_PROJECTION = {"nickname": 1, "email": 1, "profile": 1}
+
+
+def select_top_similar(target_doc: dict, index: str, top_n: int, offset: int = 0):
+    """자기 자신을 제외한 (user_id, similarity) 중 offset부터 top_n개를 유사도 내림차순으로 반환
+
+    전체 정렬 대신 힙으로 offset + top_n개만 선택한다.
+    """
+    candidates = (
+        (key, value)
+        for key, value in target_doc.items()
+        if key not in ("_id", "index") and key != index
+        and isinstance(value, (int, float)) and not isinstance(value, bool)
+    )
+    top = heapq.nlargest(offset + top_n, candidates, key=lambda item: item[1])
+    return top[offset:]
+
+
+async def fetch_similar_user_details(
+    engine: AIOEngine, target_doc: dict, index: str, top_n: int, offset: int = 0
+):
+    if is_topk_doc(target_doc):
+        # 이미 정렬되어 있고 fetch_similarity_doc에서 페이지 구간만 잘라온 상태
+        page = [
+            (str(neighbor["user_id"]), neighbor["score"])
+            for neighbor in target_doc["neighbors"][:top_n]
+        ]
+    else:
+        page = select_top_similar(target_doc, index, top_n, offset)
+    return await fetch_user_details_for_page(engine, page)
+
+
+async def fetch_user_details_for_page(engine: AIOEngine, page):
+    if not page:
+        return []
+    # 요청한 페이지의 사용자만 projection으로 한 번에 조회
+    user_object_ids = [ObjectId(user_id) for user_id, _ in page]
+    users = await engine.database[USER_COLLECTION].find(
+        {"_id": {"$in": user_object_ids}}, USER_DETAIL_PROJECTION
+    ).to_list(length=len(user_object_ids))
+    users_by_id = {str(user["_id"]): user for user in users}
+
+    # 유사도 순서를 유지하며 dict로 결합 (탈퇴 등으로 없는 유저는 제외)
+    user_details = []
+    for user_id, similarity in page:
+        user = users_by_id.get(user_id)
+        if user is None:
+            continue
+        user_details.append({
+            "user_id": user_id,
+            "nickname": user.get("nickname", "닉네임 없음"),
+            "email": user.get("email", "이메일 없음"),
+            "profile": user.get("profile", "프로필 없음"),
+            "similarity": similarity,
+        })
+    return user_details
+
+
+async def load_live_similarity(engine: AIOEngine):
+    """모든 사용자의 movie_list를 읽어 실시간 유사도 엔진을 전체 재계산"""
+    cursor = engine.database[USER_COLLECTION].find({}, {"movie_list": 1})
+    user_movies = {
+        str(user["_id"]): user.get("movie_list") or []
+        async for user in cursor
+    }
+    await run_in_threadpool(similarity_engine.rebuild, user_movies)
@@ -0,0 +1,456 @@
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+
+# 실시간 유사도 엔진 설정 (환경 변수로 조정 가능)
+LIVE_SIMILARITY_ENABLED = os.getenv("LIVE_SIMILARITY_ENABLED", "false").lower() == "true"
+LIVE_SIMILARITY_METRIC = os.getenv("LIVE_SIMILARITY_METRIC", "cosine")
+LIVE_SIMILARITY_K = int(os.getenv("LIVE_SIMILARITY_K", "50"))
+# 변경된 행이 이 수를 넘으면 기준 행렬을 다시 만든다
+LIVE_SIMILARITY_COMPACT_THRESHOLD = int(os.getenv("LIVE_SIMILARITY_COMPACT_THRESHOLD", "500"))
+# 후보를 찾을 때 영화(열)마다 살펴볼 최대 사용자 수, 더 많은 사용자가 본 인기 영화는 이 수만큼의 표본만 사용
+LIVE_SIMILARITY_MAX_POSTINGS = int(os.getenv("LIVE_SIMILARITY_MAX_POSTINGS", "100"))
+# 표본으로 찾은 후보 중 정확한 점수를 다시 계산할 사용자별 최대 후보 수
+LIVE_SIMILARITY_MAX_CANDIDATES = int(os.getenv("LIVE_SIMILARITY_MAX_CANDIDATES", "500"))
+# 전체 재계산 시 한 번에 곱하는 사용자 행 수
+REBUILD_BLOCK_SIZE = 256
+
+METRICS = ("cosine", "jaccard")
+
+
+class UserSimilarityEngine:
+    """`User.movie_list`로 만든 사용자×영화 희소 행렬에서 사용자별 top-K 이웃을 계산
+
+    - 전체 재계산: CSR 행렬을 행 블록 단위로 영화→사용자 역색인과 곱해 겹치는 영화 수를 구한 뒤 행별 top-K 선택
+    - 후보 제한: 인기 영화는 본 사용자 수만큼 후보가 늘어 계산량이 사용자 수의 제곱으로 커지므로
+      영화마다 max_postings명(본 영화 수가 적은 사용자 순서)만 후보로 살펴보고, 표본으로 센 점수 상위
+      max_candidates명만 정확한 점수를 다시 계산한다 (모든 영화가 max_postings명 이하면 정확한 결과)
+    - 증분 갱신: 한 사용자의 목록이 바뀌면 같은 역색인으로 그 사용자와 겹치는
+      사용자만 찾아 해당 행과 영향받는 이웃 목록만 갱신 (표본에 없던 기존 이웃은 이웃→사용자 역색인으로 찾음)
+    - 변경된 행은 overrides에 보관하다가 일정 수를 넘으면 기준 행렬에 합친다(compact)
+    - 전체 재계산이 끝나기 전(ready=False)의 변경은 submit()이 보관했다가 재계산 직후 반영
+    """
+
+    def __init__(
+        self,
+        metric: str = LIVE_SIMILARITY_METRIC,
+        k: int = LIVE_SIMILARITY_K,
+        compact_threshold: int = LIVE_SIMILARITY_COMPACT_THRESHOLD,
+        max_postings: int = LIVE_SIMILARITY_MAX_POSTINGS,
+        max_candidates: int = LIVE_SIMILARITY_MAX_CANDIDATES,
+    ):
+        if metric not in METRICS:
+            raise ValueError(f"Unsupported similarity metric: {metric}")
+        self.metric = metric
+        self.k = k
+        self.compact_threshold = compact_threshold
+        self.max_postings = max_postings
+        self.max_candidates = max(max_candidates, k)
+        self._lock = threading.RLock()
+        self.ready = False
+        # 재계산 중 들어온 변경 (user_id -> 영화 목록, None이면 삭제), ready와 함께 _pending_lock으로 보호
+        self._pending_lock = threading.Lock()
+        self._pending: Dict[str, Optional[List[int]]] = {}
+        self.replayed = 0
+        self._reset()
+
+    def _reset(self):
+        self.user_ids: List[Optional[str]] = []
+        self.row_of: Dict[str, int] = {}
+        self.col_of: Dict[int, int] = {}
+        self.sizes = np.zeros(0, dtype=np.int32)
+        self.base = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.base_csc = self.base.tocsc()
+        self.sampled = np.zeros(0, dtype=bool)
+        self.overrides: Dict[int, np.ndarray] = {}
+        self.dirty: set = set()
+        self.nbr_ids = np.full((0, self.k), -1, dtype=np.int32)
+        self.nbr_scores = np.zeros((0, self.k), dtype=np.float32)
+        # 이웃 → 그 이웃을 목록에 가진 사용자 역색인 (재계산/compact 시 만들고, 그 사이에 추가된 항목은 added_owners에 기록)
+        self.owner_indptr: Optional[np.ndarray] = None
+        self.owner_ids = np.zeros(0, dtype=np.int32)
+        self.added_owners: Dict[int, set] = {}
+
+    # ---------- 행렬 구성 ----------
+
+    def _cols_for(self, movie_list: Iterable[int]) -> np.ndarray:
+        cols = set()
+        for movie_id in movie_list or []:
+            col = self.col_of.get(movie_id)
+            if col is None:
+                col = len(self.col_of)
+                self.col_of[movie_id] = col
+            cols.add(col)
+        return np.array(sorted(cols), dtype=np.int32)
+
+    def _ensure_capacity(self, n: int):
+        if n <= self.nbr_ids.shape[0]:
+            return
+        cap = max(n, 2 * self.nbr_ids.shape[0], 16)
+        grow = cap - self.nbr_ids.shape[0]
+        self.nbr_ids = np.vstack([self.nbr_ids, np.full((grow, self.k), -1, dtype=np.int32)])
+        self.nbr_scores = np.vstack([self.nbr_scores, np.zeros((grow, self.k), dtype=np.float32)])
+        self.sizes = np.concatenate([self.sizes, np.zeros(grow, dtype=np.int32)])
+
+    def _build_base(self, rows_cols: List[np.ndarray]):
+        n = len(rows_cols)
+        lengths = np.fromiter((len(c) for c in rows_cols), dtype=np.int64, count=n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        indices = np.concatenate(rows_cols) if n else np.zeros(0, dtype=np.int32)
+        data = np.ones(len(indices), dtype=np.float32)
+        self.base = sparse.csr_matrix(
+            (data, indices, indptr), shape=(n, max(len(self.col_of), 1))
+        )
+        # 열 안의 사용자를 영화 수가 적은 순서로 정렬 (영화 한 편이 겹칠 때 점수가 높은 순서)
+        order = np.argsort(lengths, kind="stable")
+        csc = self.base[order].tocsc()
+        csc.indices = order[csc.indices].astype(np.int32)
+        self.base_csc = csc
+        self.sampled = np.diff(csc.indptr) > self.max_postings
+        self.overrides = {}
+
+    def _postings_t(self) -> sparse.csr_matrix:
+        """영화→사용자 역색인(영화마다 앞쪽 max_postings명까지)을 영화×사용자 CSR로 반환"""
+        csc = self.base_csc
+        counts = np.diff(csc.indptr)
+        position = np.arange(len(csc.indices)) - np.repeat(csc.indptr[:-1], counts)
+        keep = position < self.max_postings
+        indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(np.minimum(counts, self.max_postings), out=indptr[1:])
+        return sparse.csr_matrix(
+            (csc.data[keep], csc.indices[keep], indptr), shape=(csc.shape[1], csc.shape[0])
+        )
+
+    def _movies_of(self, row: int) -> np.ndarray:
+        cols = self.overrides.get(row)
+        if cols is not None:
+            return cols
+        if row < self.base.shape[0]:
+            return self.base.indices[self.base.indptr[row]:self.base.indptr[row + 1]]
+        return np.zeros(0, dtype=np.int32)
+
+    # ---------- 점수 계산 ----------
+
+    def _overlap(self, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """cols와 한 편 이상 겹치는 사용자 행과 겹치는 영화 수, 표본만 본 인기 영화가 있으면 exact=False"""
+        csc = self.base_csc
+        base_cols = cols[cols < csc.shape[1]]
+        parts = [
+            csc.indices[csc.indptr[c]:min(csc.indptr[c + 1], csc.indptr[c] + self.max_postings)]
+            for c in base_cols
+        ]
+        if parts:
+            rows, counts = np.unique(np.concatenate(parts), return_counts=True)
+        else:
+            rows, counts = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)
+        exact = not self.sampled[base_cols].any()
+
+        if self.overrides:
+            # 기준 행렬의 값은 오래되었으므로 변경된 행은 직접 계산한 값으로 교체
+            override_rows = np.fromiter(self.overrides.keys(), dtype=np.int64)
+            keep = ~np.isin(rows, override_rows)
+            rows, counts = rows[keep], counts[keep]
+            extra_rows, extra_counts = [], []
+            for row, row_cols in self.overrides.items():
+                count = np.intersect1d(row_cols, cols, assume_unique=True).size
+                if count:
+                    extra_rows.append(row)
+                    extra_counts.append(count)
+            if extra_rows:
+                rows = np.concatenate([rows, np.array(extra_rows, dtype=rows.dtype)])
+                counts = np.concatenate([counts, np.array(extra_counts, dtype=counts.dtype)])
+                order = np.argsort(rows, kind="stable")
+                rows, counts = rows[order], counts[order]
+        return rows, counts, exact
+
+    def _exact_counts(self, cols: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """rows 각각과 cols의 정확한 겹치는 영화 수"""
+        counts = np.zeros(len(rows), dtype=np.float32)
+        in_base = rows < self.base.shape[0]
+        if in_base.any():
+            indicator = np.zeros(self.base.shape[1], dtype=np.float32)
+            indicator[cols[cols < self.base.shape[1]]] = 1
+            counts[in_base] = self.base[rows[in_base]] @ indicator
+        if self.overrides:
+            for i in np.flatnonzero(np.isin(rows, np.fromiter(self.overrides.keys(), dtype=np.int64))):
+                counts[i] = np.intersect1d(self.overrides[int(rows[i])], cols, assume_unique=True).size
+        return counts
+
+    def _candidates(self, row: int, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """row(영화 목록 cols)의 이웃 후보와 정확한 점수"""
+        size = np.float32(len(cols))
+        rows, counts, exact = self._overlap(cols)
+        if not exact:
+            # 표본으로 센 점수 상위 후보만 정확한 겹치는 수로 다시 계산
+            if len(rows) > self.max_candidates:
+                approx = self._score(size, self.sizes[rows], counts)
+                rows = np.sort(rows[np.argpartition(-approx, self.max_candidates - 1)[:self.max_candidates]])
+            counts = self._exact_counts(cols, rows)
+        return rows, self._score(size, self.sizes[rows], counts)
+
+    def _score(self, size: np.ndarray, other_sizes: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        counts = counts.astype(np.float32)
+        # 겹치는 영화가 없으면 0 (목록이 빈 사용자와의 0/0 포함)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.metric == "jaccard":
+                scores = counts / (size + other_sizes - counts)
+            else:
+                scores = counts / np.sqrt(size.astype(np.float32) * other_sizes)
+        return np.where(counts > 0, scores, np.float32(0))
+
+    def _topk(self, row: int, rows: np.ndarray, scores: np.ndarray):
+        mask = (rows != row) & (scores > 0)
+        rows, scores = rows[mask], scores[mask]
+        if len(rows) > self.k:
+            part = np.argpartition(-scores, self.k - 1)[:self.k]
+            rows, scores = rows[part], scores[part]
+        # 점수 내림차순, 동점이면 행 번호 오름차순
+        order = np.lexsort((rows, -scores))
+        return rows[order], scores[order]
+
+    def _store(self, row: int, rows: np.ndarray, scores: np.ndarray):
+        if self.owner_indptr is not None:
+            for other in rows[~np.isin(rows, self.nbr_ids[row])]:
+                self.added_owners.setdefault(int(other), set()).add(row)
+        self.nbr_ids[row] = -1
+        self.nbr_scores[row] = 0
+        self.nbr_ids[row, :len(rows)] = rows
+        self.nbr_scores[row, :len(rows)] = scores
+
+    def _recompute(self, row: int):
+        rows, scores = self._candidates(row, self._movies_of(row))
+        self._store(row, *self._topk(row, rows, scores))
+        self.dirty.discard(row)
+
+    def _build_owners(self):
+        n = len(self.user_ids)
+        ids = self.nbr_ids[:n].ravel()
+        valid = ids >= 0
+        targets = ids[valid]
+        order = np.argsort(targets, kind="stable")
+        self.owner_ids = (np.flatnonzero(valid) // self.k)[order].astype(np.int32)
+        self.owner_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=n), out=self.owner_indptr[1:])
+        self.added_owners = {}
+
+    def _owners_of(self, row: int) -> np.ndarray:
+        """row를 이웃 목록에 가지고 있는 사용자 (역색인 후보 중 지금도 가지고 있는 사용자만)"""
+        parts = []
+        if row < len(self.owner_indptr) - 1:
+            parts.append(self.owner_ids[self.owner_indptr[row]:self.owner_indptr[row + 1]])
+        added = self.added_owners.get(row)
+        if added:
+            parts.append(np.fromiter(added, dtype=np.int32, count=len(added)))
+        if not parts:
+            return np.zeros(0, dtype=np.int32)
+        rows = np.unique(np.concatenate(parts))
+        return rows[(self.nbr_ids[rows] == row).any(axis=1)]
+
+    # ---------- 공개 API ----------
+
+    def rebuild(self, user_movies: Dict[str, Iterable[int]]):
+        """전체 사용자 목록으로 행렬과 이웃 목록을 새로 계산"""
+        with self._lock:
+            self._reset()
+            rows_cols = []
+            for user_id, movie_list in user_movies.items():
+                self.row_of[user_id] = len(self.user_ids)
+                self.user_ids.append(user_id)
+                rows_cols.append(self._cols_for(movie_list))
+            n = len(self.user_ids)
+            self._ensure_capacity(n)
+            self.sizes[:n] = [len(c) for c in rows_cols]
+            self._build_base(rows_cols)
+
+            postings_t = self._postings_t()
+            exact = not self.sampled.any()
+            for start in range(0, n, REBUILD_BLOCK_SIZE):
+                end = min(start + REBUILD_BLOCK_SIZE, n)
+                # 블록 내 각 사용자와 역색인으로 찾은 후보의 겹치는 영화 수 (인기 영화는 표본 후보만)
+                product = (self.base[start:end] @ postings_t).tocsr()
+                indptr, candidates, counts = product.indptr, product.indices, product.data
+                entry_rows = np.repeat(np.arange(start, end), np.diff(indptr))
+                if not exact:
+                    indptr, candidates, entry_rows, counts = self._rescore_block(
+                        start, end, indptr, candidates, entry_rows, counts
+                    )
+                scores = self._score(self.sizes[entry_rows], self.sizes[candidates], counts)
+                for i, row in enumerate(range(start, end)):
+                    lo, hi = indptr[i], indptr[i + 1]
+                    self._store(row, *self._topk(row, candidates[lo:hi], scores[lo:hi]))
+            self._build_owners()
+            # 재계산 중 보관한 변경을 모두 반영한 뒤에 ready로 바꿔 그 사이의 변경도 유실되지 않게 함
+            while True:
+                with self._pending_lock:
+                    pending, self._pending = self._pending, {}
+                    if not pending:
+                        self.ready = True
+                        break
+                for user_id, movie_list in pending.items():
+                    if movie_list is None:
+                        self.remove_user(user_id)
+                    else:
+                        self.update_user(user_id, movie_list)
+                self.replayed += len(pending)
+
+    def _rescore_block(self, start, end, indptr, candidates, entry_rows, counts):
+        """행별로 표본 점수 상위 max_candidates명만 남기고 정확한 겹치는 영화 수로 다시 계산"""
+        approx = self._score(self.sizes[entry_rows], self.sizes[candidates], counts)
+        selected = []
+        for i in range(end - start):
+            lo, hi = indptr[i], indptr[i + 1]
+            if hi - lo > self.max_candidates:
+                part = np.argpartition(-approx[lo:hi], self.max_candidates - 1)[:self.max_candidates]
+                selected.append(lo + part)
+            else:
+                selected.append(np.arange(lo, hi))
+        lengths = np.fromiter((len(part) for part in selected), dtype=np.int64, count=len(selected))
+        new_indptr = np.zeros(len(selected) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=new_indptr[1:])
+        keep = np.concatenate(selected) if selected else np.zeros(0, dtype=np.int64)
+        candidates, entry_rows = candidates[keep], entry_rows[keep]
+
+        # 블록 사용자의 영화 목록을 (블록 행 × 영화) bool 행렬로 펼친 뒤 후보의 영화 목록을 조회해 겹치는 수를 셈
+        block = self.base[start:end]
+        seen = np.zeros((end - start, self.base.shape[1]), dtype=bool)
+        seen[np.repeat(np.arange(end - start), np.diff(block.indptr)), block.indices] = True
+        starts = self.base.indptr[candidates]
+        lengths = self.base.indptr[candidates + 1] - starts
+        pair = np.repeat(np.arange(len(candidates)), lengths)
+        offsets = np.arange(len(pair)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        hits = seen[entry_rows[pair] - start, self.base.indices[starts[pair] + offsets]]
+        exact_counts = np.bincount(pair[hits], minlength=len(candidates))
+        return new_indptr, candidates, entry_rows, exact_counts
+
+    def submit(self, user_id: str, movie_list: Optional[Iterable[int]]):
+        """영화 목록 변경(None이면 탈퇴)을 반영, 전체 재계산 전이면 보관했다가 재계산 직후 반영"""
+        with self._pending_lock:
+            if not self.ready:
+                self._pending[user_id] = None if movie_list is None else list(movie_list)
+                return
+        if movie_list is None:
+            self.remove_user(user_id)
+        else:
+            self.update_user(user_id, movie_list)
+
+    def update_user(self, user_id: str, movie_list: Iterable[int]):
+        """한 사용자의 영화 목록 변경을 반영 (해당 행과 영향받는 이웃 목록만 갱신)"""
+        with self._lock:
+            row = self.row_of.get(user_id)
+            new_cols = self._cols_for(movie_list)
+            if row is None:
+                row = len(self.user_ids)
+                self.row_of[user_id] = row
+                self.user_ids.append(user_id)
+                self._ensure_capacity(row + 1)
+                old_cols = np.zeros(0, dtype=np.int32)
+            else:
+                old_cols = self._movies_of(row)
+                if np.array_equal(old_cols, new_cols):
+                    return
+
+            # 변경 전 이 사용자를 이웃으로 가질 수 있던 사용자 (유사도는 대칭)
+            old_rows, _, exact = self._overlap(old_cols)
+            if not exact:
+                # 인기 영화 표본에 없는 사용자도 이 사용자를 이웃으로 가지고 있을 수 있음
+                old_rows = np.union1d(old_rows, self._owners_of(row))
+            self.overrides[row] = new_cols
+            self.sizes[row] = len(new_cols)
+            new_rows, new_scores = self._candidates(row, new_cols)
+
+            # 1. 본인의 이웃 목록
+            self._store(row, *self._topk(row, new_rows, new_scores))
+            self.dirty.discard(row)
+
+            # 2. 본인을 이웃으로 가지고 있거나 새로 가질 수 있는 사용자의 목록
+            affected = np.union1d(old_rows, new_rows)
+            affected = affected[affected != row]
+            affected_scores = self._score(
+                np.float32(len(new_cols)), self.sizes[affected], self._exact_counts(new_cols, affected)
+            )
+            ids = self.nbr_ids[affected]
+            has_row = (ids == row).any(axis=1)
+            is_full = ids[:, -1] >= 0
+            enters = (
+                ~has_row & (affected_scores > 0)
+                & (~is_full | (affected_scores > self.nbr_scores[affected, -1]))
+            )
+            for i in np.flatnonzero(has_row | enters):
+                self._apply_neighbor_score(int(affected[i]), row, float(affected_scores[i]))
+
+            if len(self.overrides) > self.compact_threshold:
+                self._build_base([self._movies_of(r) for r in range(len(self.user_ids))])
+                self._build_owners()
+
+    def _apply_neighbor_score(self, owner: int, row: int, score: float):
+        ids = self.nbr_ids[owner]
+        scores = self.nbr_scores[owner]
+        valid = ids >= 0
+        was_full = bool(valid[-1])
+        pos = np.flatnonzero(ids == row)
+        old_score = float(scores[pos[0]]) if len(pos) else None
+
+        keep = valid & (ids != row)
+        new_ids = ids[keep]
+        new_scores = scores[keep]
+        if score > 0:
+            new_ids = np.append(new_ids, row)
+            new_scores = np.append(new_scores, np.float32(score))
+        order = np.lexsort((new_ids, -new_scores))[:self.k]
+        self._store(owner, new_ids[order], new_scores[order])
+
+        # 목록이 가득 찬 상태에서 점수가 내려가 맨 뒤로 밀리거나 빠진 경우
+        # 목록 밖의 (K+1)번째 사용자를 알 수 없으므로 다음 조회 시 다시 계산
+        if old_score is not None and was_full and score < old_score:
+            last = self.nbr_ids[owner, -1]
+            if score <= 0 or last == row or last < 0:
+                self.dirty.add(owner)
+
+    def remove_user(self, user_id: str):
+        with self._lock:
+            if user_id not in self.row_of:
+                return
+            self.update_user(user_id, [])
+            row = self.row_of.pop(user_id)
+            self.user_ids[row] = None
+            self._store(row, np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32))
+
+    def neighbors(self, user_id: str, top_n: int, offset: int = 0) -> Optional[List[Tuple[str, float]]]:
+        """(user_id, similarity) 목록을 유사도 내림차순으로 반환, 모르는 사용자면 None"""
+        with self._lock:
+            row = self.row_of.get(user_id)
+            if row is None:
+                return None
+            if row in self.dirty:
+                self._recompute(row)
+            ids = self.nbr_ids[row]
+            scores = self.nbr_scores[row]
+            result = [
+                (self.user_ids[other], float(score))
+                for other, score in zip(ids, scores)
+                if other >= 0 and self.user_ids[other] is not None
+            ]
+            return result[offset:offset + top_n]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "metric": self.metric,
+                "k": self.k,
+                "users": len(self.row_of),
+                "movies": len(self.col_of),
+                "sampled_movies": int(self.sampled.sum()),
+                "max_postings": self.max_postings,
+                "max_candidates": self.max_candidates,
+                "pending_overrides": len(self.overrides),
+                "dirty_rows": len(self.dirty),
+                "queued_updates": len(self._pending),
+                "replayed_updates": self.replayed,
+            }
+
+
+similarity_engine = UserSimilarityEngine()
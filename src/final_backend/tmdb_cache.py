@@ -0,0 +1,137 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+from src.final_backend.database import get_database
+from src.final_backend.ttl_cache import TTLCache
+
+# 종류별 캐시 유지 시간(초)
+TMDB_CACHE_TTLS = {
+    "search": int(os.getenv("TMDB_CACHE_TTL_SEARCH", "3600")),
+    "movie": int(os.getenv("TMDB_CACHE_TTL_MOVIE", "86400")),
+    "videos": int(os.getenv("TMDB_CACHE_TTL_VIDEOS", "86400")),
+}
+TMDB_CACHE_DEFAULT_TTL = 3600
+TMDB_CACHE_MAX_ENTRIES = int(os.getenv("TMDB_CACHE_MAX_ENTRIES", "5000"))
+# "memory"(기본) 또는 "mongo"(여러 워커가 캐시를 공유)
+TMDB_CACHE_BACKEND = os.getenv("TMDB_CACHE_BACKEND", "memory")
+TMDB_CACHE_COLLECTION = "tmdb_cache"
+
+# 키에서 제외할 파라미터 (API 키 등 응답에 영향이 없는 값)
+IGNORED_PARAMS = {"api_key"}
+
+
+def make_cache_key(kind: str, path: str, params: Optional[dict] = None) -> str:
+    normalized = {
+        key: str(value).strip().lower() if isinstance(value, str) else value
+        for key, value in (params or {}).items()
+        if key not in IGNORED_PARAMS and value is not None
+    }
+    return f"{kind}:{path}?{json.dumps(normalized, sort_keys=True, ensure_ascii=False)}"
+
+
+class MongoCacheBackend:
+    """여러 워커가 공유하는 MongoDB 기반 캐시 저장소 (expires_at TTL 인덱스로 만료)"""
+
+    def __init__(self, collection_getter: Callable[[], Any]):
+        self._collection_getter = collection_getter
+
+    @property
+    def collection(self):
+        return self._collection_getter()
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def get(self, key: str):
+        doc = await self.collection.find_one({"_id": key})
+        if not doc or doc["expires_at"] < datetime.utcnow():
+            return None
+        return doc["value"]
+
+    async def set(self, key: str, value, ttl: int):
+        await self.collection.replace_one(
+            {"_id": key},
+            {"value": value, "expires_at": datetime.utcnow() + timedelta(seconds=ttl)},
+            upsert=True,
+        )
+
+
+class ResponseCache:
+    """종류별 TTL 메모리 캐시와 single-flight 요청 병합
+
+    - 같은 키에 대한 동시 miss는 하나의 upstream 요청만 실행하고 결과를 공유
+    - 선택적으로 공유 저장소(backend)를 메모리 캐시 뒤에 둔다
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, int] = TMDB_CACHE_TTLS,
+        max_entries: int = TMDB_CACHE_MAX_ENTRIES,
+        backend: Optional[MongoCacheBackend] = None,
+    ):
+        self.ttls = ttls
+        self.backend = backend
+        # 종류별 TTL은 항목마다 지정
+        self._cache = TTLCache(None, max_entries)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+        self.backend_hits = 0
+
+    def ttl_for(self, kind: str) -> int:
+        return self.ttls.get(kind, TMDB_CACHE_DEFAULT_TTL)
+
+    async def _fill(self, key: str, kind: str, fetch: Callable[[], Awaitable[Any]]):
+        ttl = self.ttl_for(kind)
+        if self.backend is not None:
+            value = await self.backend.get(key)
+            if value is not None:
+                self.backend_hits += 1
+                self._cache.set(key, value, ttl)
+                return value
+        value = await fetch()
+        self._cache.set(key, value, ttl)
+        if self.backend is not None:
+            await self.backend.set(key, value, ttl)
+        return value
+
+    async def get_or_fetch(self, kind: str, key: str, fetch: Callable[[], Awaitable[Any]]):
+        value = self._cache.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            # 요청한 클라이언트가 끊겨도 다른 대기자를 위해 upstream 요청은 계속 진행
+            task = asyncio.ensure_future(self._fill(key, kind, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: str):
+        self._cache.pop(key)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        # misses는 메모리 캐시에 없던 조회 수 (그중 진행 중인 요청에 합쳐진 수가 coalesced)
+        return {
+            "backend": "mongo" if self.backend is not None else "memory",
+            **self._cache.stats(),
+            "coalesced": self.coalesced,
+            "backend_hits": self.backend_hits,
+            "inflight": len(self._inflight),
+        }
+
+
+def _create_backend() -> Optional[MongoCacheBackend]:
+    if TMDB_CACHE_BACKEND != "mongo":
+        return None
+    return MongoCacheBackend(lambda: get_database()[TMDB_CACHE_COLLECTION])
+
+
+tmdb_cache = ResponseCache(backend=_create_backend())
@@ -0,0 +1,110 @@
+import asyncio
+import importlib.util
+import logging
+import os
+import random
+from typing import Optional
+import httpx
+
+# TMDb 전용 HTTP 클라이언트 설정 (환경 변수로 조정 가능)
+TMDB_MAX_CONNECTIONS = int(os.getenv("TMDB_MAX_CONNECTIONS", "50"))
+TMDB_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("TMDB_MAX_KEEPALIVE_CONNECTIONS", "20"))
+TMDB_KEEPALIVE_EXPIRY = float(os.getenv("TMDB_KEEPALIVE_EXPIRY", "30"))
+TMDB_CONNECT_TIMEOUT = float(os.getenv("TMDB_CONNECT_TIMEOUT", "3"))
+TMDB_READ_TIMEOUT = float(os.getenv("TMDB_READ_TIMEOUT", "10"))
+TMDB_HTTP2 = os.getenv("TMDB_HTTP2", "false").lower() == "true"
+TMDB_MAX_RETRIES = int(os.getenv("TMDB_MAX_RETRIES", "3"))
+TMDB_RETRY_BACKOFF = float(os.getenv("TMDB_RETRY_BACKOFF", "0.2"))
+TMDB_RETRY_MAX_DELAY = float(os.getenv("TMDB_RETRY_MAX_DELAY", "5"))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """429/5xx 응답이나 연결 오류 시 지수 백오프로 재시도하는 transport 래퍼"""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_retries: int = TMDB_MAX_RETRIES,
+        backoff: float = TMDB_RETRY_BACKOFF,
+        max_delay: float = TMDB_RETRY_MAX_DELAY,
+    ):
+        self.transport = transport
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        # Retry-After 헤더가 있으면 우선 사용
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_delay)
+        delay = self.backoff * (2 ** attempt)
+        return min(delay + random.uniform(0, delay), self.max_delay)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = await self.transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError):
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                return response
+            delay = self._delay(attempt, response)
+            await response.aclose()
+            logging.warning(
+                f"TMDb {request.url.path} returned {response.status_code}, retry in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def create_tmdb_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=TMDB_MAX_CONNECTIONS,
+        max_keepalive_connections=TMDB_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=TMDB_KEEPALIVE_EXPIRY,
+    )
+    http2 = TMDB_HTTP2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logging.warning("TMDB_HTTP2 is enabled but the h2 package is not installed, using HTTP/1.1")
+        http2 = False
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+    return httpx.AsyncClient(
+        transport=RetryTransport(transport),
+        timeout=httpx.Timeout(TMDB_READ_TIMEOUT, connect=TMDB_CONNECT_TIMEOUT),
+    )
+
+
+# 앱 전체에서 공유하는 TMDb 클라이언트 (lifespan에서 생성/종료)
+client: Optional[httpx.AsyncClient] = None
+
+
+def open_tmdb_client() -> httpx.AsyncClient:
+    global client
+    if client is None or client.is_closed:
+        client = create_tmdb_client()
+    return client
+
+
+async def close_tmdb_client():
+    global client
+    if client is not None:
+        await client.aclose()
+        client = None
+
+
+# httpx.AsyncClient를 FastAPI 의존성으로 제공 (테스트에서는 dependency_overrides로 교체)
+async def get_tmdb_client() -> httpx.AsyncClient:
+    return open_tmdb_client()
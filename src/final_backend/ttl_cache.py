@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterator, Optional, Tuple
+
+
+class TTLCache:
+    """항목별 만료 시각이 있는 TTL + LRU 메모리 캐시
+
+    각 캐시 모듈은 이 클래스에 저장/만료/LRU 제거와 hit/miss 집계를 맡기고 자기 무효화 규칙만 구현한다.
+    항목이 만료/LRU 제거/pop/덮어쓰기로 빠질 때 on_remove(key, value)를 호출하므로 역색인 등을 함께 정리할 수 있다.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float],
+        max_entries: int,
+        on_remove: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.on_remove = on_remove
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remove(self, key: Hashable):
+        expires_at, value = self._entries.pop(key)
+        if self.on_remove is not None:
+            self.on_remove(key, value)
+        return value
+
+    def get(self, key: Hashable, count: bool = True):
+        """만료되지 않은 값을 반환하고 최근 사용으로 표시, 없으면 None (count=False면 hit/miss 집계 안 함)"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            if count:
+                self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        if count:
+            self.hits += 1
+        return entry[1]
+
+    def record(self, hit: bool):
+        # 값 안쪽까지 확인해야 hit 여부를 알 수 있는 캐시(예: 유저별 피드 페이지)용
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def set(self, key: Hashable, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is None or ttl <= 0:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def pop(self, key: Hashable):
+        if key not in self._entries:
+            return None
+        return self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+
+    def keys(self) -> Iterator[Hashable]:
+        return iter(list(self._entries))
+
+    def values(self) -> Iterator[Any]:
+        return (value for _, value in self._entries.values())
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {"ttl_seconds": self.ttl} if self.ttl is not None else {}
+        stats.update({
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        })
+        return stats
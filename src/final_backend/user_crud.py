@@ -1,33 +1,49 @@
 from datetime import datetime, timedelta
 from pytz import timezone
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-import string, secrets, os, smtplib
+import string, secrets, os
 from typing import List
 from fastapi import HTTPException
 from odmantic import AIOEngine, ObjectId
-from src.final_backend.models import User, EmailVerification
-from passlib.context import CryptContext
+from odmantic.exceptions import DuplicateKeyError as ODMDuplicateKeyError
+from src.final_backend.models import User, Follow, Movie, EmailVerification
 from bson import ObjectId
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+from src.final_backend.similarity_engine import similarity_engine, LIVE_SIMILARITY_ENABLED
+from src.final_backend.password_hasher import password_hasher
+from src.final_backend.email_outbox import email_outbox
+from src.final_backend.auth_cache import principal_cache
+from src.final_backend.user_deletion import start_user_deletion
+from src.final_backend.feed_cache import feed_cache
+from src.final_backend.profile_cache import profile_cache
+from src.final_backend.movie_crud import MOVIE_CARD_PROJECTION, format_movie_card
 
 
-# bcrypt 알고리즘을 사용하여 비밀번호를 암호화
-# pwd_context 객체를 생성하고 pwd_context 객체를 사용하여 비밀번호를 암호화하여 저장
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 KST = timezone("Asia/Seoul")
 current_time = datetime.now(KST)
 
 
+def duplicate_user_exception(error: DuplicateKeyError) -> HTTPException:
+    # email/nickname unique 인덱스 충돌 (동시 가입 등)을 /check/email, /check/nickname과 같은 409로 변환
+    key_pattern = (error.details or {}).get("keyPattern") or {}
+    if "nickname" in key_pattern or ("email" not in key_pattern and "nickname" in str(error)):
+        return HTTPException(status_code=409, detail="이미 사용 중인 닉네임입니다.")
+    return HTTPException(status_code=409, detail="이미 사용 중인 이메일입니다.")
+
+
 async def create_user(engine: AIOEngine, user_data: dict):
     # User 모델을 사용하여 사용자 객체 생성
     user = User(
         email=user_data.email,
         nickname=user_data.nickname,
-        password=pwd_context.hash(user_data.password),
+        password=await password_hasher.hash(user_data.password),
         profile=user_data.profile,
     )
-    await engine.save(user)
+    try:
+        await engine.save(user)
+    except ODMDuplicateKeyError as e:
+        raise duplicate_user_exception(e.driver_error)
     return {"message": f"유저 '{user.nickname}' 생성 완료."}
 
 
@@ -39,49 +55,58 @@ async def get_existing_name(engine: AIOEngine, nickname: str):
     return await engine.find_one(User, User.nickname == nickname)
 
 
+async def set_user_fields(engine: AIOEngine, user: User, fields: dict) -> bool:
+    """바뀐 필드만 $set으로 저장 (upsert 없음), 유저가 없으면 False
+
+    캐시된 사용자 객체를 engine.save()로 저장하면 다른 워커에서 바뀐 following/movie_list를 덮어쓰고
+    이미 탈퇴한 유저 문서를 upsert로 다시 만들기 때문에 사용자 문서 수정은 이 함수로만 한다.
+    """
+    result = await engine.get_collection(User).update_one({"_id": user.id}, {"$set": fields})
+    if not result.matched_count:
+        return False
+    for key, value in fields.items():
+        setattr(user, key, value)
+    return True
+
+
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return await password_hasher.verify(plain_password, hashed_password)
+
 
+async def verify_login_password(engine: AIOEngine, user: User, plain_password: str) -> bool:
+    # 검증 성공 시 bcrypt cost factor가 바뀌었다면 새 cost로 다시 해시하여 저장
+    valid, new_hash = await password_hasher.verify_and_update(plain_password, user.password)
+    if valid and new_hash:
+        await set_user_fields(engine, user, {"password": new_hash})
+        principal_cache.invalidate_user(user.email)
+    return valid
 
-async def delete_user(
-    engine: AIOEngine, chat_engine: AIOEngine, password: str, user_email: str
-):
+
+async def delete_user(engine: AIOEngine, password: str, user_email: str):
     user = await engine.find_one(User, User.email == user_email)
-    user_id = str(user.id)
-    if user and verify_password(password, user.password):
-        # 1. 다른 유저의 `following` 리스트에서 해당 유저 ID 제거
-        users_to_update = await engine.find(User, {"following": {"$in": [user.id]}})
-        if users_to_update:
-            for u in users_to_update:
-                u.following.remove(user.id)
-                await engine.save(u)
-
-        # 4. "chat" 데이터베이스에서 컬렉션 이름에 유저 ID가 포함된 컬렉션 삭제
-        collection_names = (
-            await chat_engine.database.list_collection_names()
-        )  # 모든 컬렉션 이름 가져오기
-        user_related_collections = [
-            name for name in collection_names if user_id in name
-        ]  # 유저 ID 포함 컬렉션 찾기
-        for collection_name in user_related_collections:
-            await chat_engine.database[collection_name].drop()
-
-        # 3. 기존 프로필 이미지 삭제
-        if user.profile and os.path.exists(user.profile):
-            os.remove(user.profile)
-        await engine.delete(user)
-        return {"message": f"유저 '{user.email}' 삭제 완료."}
+    if user and await verify_password(password, user.password):
+        # 유저 문서만 바로 삭제하고 팔로우/채팅방/프로필 이미지 정리는 백그라운드 작업으로 진행
+        job = await start_user_deletion(engine, user)
+        return {"message": f"유저 '{user.email}' 삭제 완료.", "job_id": str(job.id)}
     else:
         return {"message": "유저 비밀번호가 틀립니다."}
 
 
 async def update_user_info(engine: AIOEngine, user: User, updated_data: dict):
+    fields = {}
     for key, value in updated_data.items():
         if key == "password" and value is not None:
-            value = pwd_context.hash(value)
+            value = await password_hasher.hash(value)
         if hasattr(user, key) and value is not None:
-            setattr(user, key, value)
-    await engine.save(user)
+            fields[key] = value
+    try:
+        if fields and not await set_user_fields(engine, user, fields):
+            return None
+    except DuplicateKeyError as e:
+        raise duplicate_user_exception(e)
+    # 닉네임/비밀번호가 바뀌었으므로 캐시된 사용자 정보 제거
+    principal_cache.invalidate_user(user.email)
+    profile_cache.invalidate(str(user.id))
     return user
 
 
@@ -91,41 +116,42 @@ async def generate_email_verification_code(engine: AIOEngine, email: str, length
     characters = string.digits  # 대소문자 + 숫자
     verificaiton_code = "".join(secrets.choice(characters) for _ in range(length))
 
-    existing_verification = await engine.find_one(
-        EmailVerification, EmailVerification.email == email
-    )
-    if existing_verification:
-        # 기존 데이터가 있으면 삭제
-        await engine.delete(existing_verification)
-
     expires_at = datetime.utcnow() + timedelta(minutes=5)
 
-    email_verification = EmailVerification(
-        email=email, verification_code=verificaiton_code, expires_at=expires_at
-    )
-    await engine.save(email_verification)
+    # 이메일당 문서 하나만 유지하도록 upsert 한 번으로 기존 코드를 교체
+    # (동시에 요청해도 email unique 인덱스 덕분에 중복 문서가 생기지 않고, 충돌한 쪽은 한 번 더 시도)
+    verifications = engine.get_collection(EmailVerification)
+    update = {"$set": {"verification_code": verificaiton_code, "expires_at": expires_at}}
+    try:
+        await verifications.update_one({"email": email}, update, upsert=True)
+    except DuplicateKeyError:
+        await verifications.update_one({"email": email}, update, upsert=True)
     return verificaiton_code
 
 
 async def verify_email_code(engine: AIOEngine, email: str, code: str):
-    # MongoDB에서 이메일에 해당하는 인증 데이터 조회
+    current_time = datetime.utcnow()
+    # 코드가 맞고 만료되지 않았으면 조회와 동시에 삭제 (같은 코드는 한 번만 사용 가능)
+    email_verification = await engine.get_collection(EmailVerification).find_one_and_delete(
+        {"email": email, "verification_code": code, "expires_at": {"$gt": current_time}},
+        projection={"_id": 1},
+    )
+    if email_verification:
+        return {"message": "인증에 성공했습니다."}
+
+    # 실패한 경우에만 원인을 구분하기 위해 한 번 더 조회
     email_verification = await engine.find_one(
         EmailVerification, EmailVerification.email == email
     )
-    current_time = datetime.utcnow()
 
     if not email_verification:
         raise HTTPException(status_code=404, detail="인증 기록이 존재하지 않습니다.")
 
     # 만료 시간 확인
-    if email_verification.expires_at < current_time:
+    if email_verification.expires_at <= current_time:
         raise HTTPException(status_code=400, detail="인증 코드가 만료되었습니다.")
 
-    # 인증 코드 확인
-    if email_verification.verification_code != code:
-        raise HTTPException(status_code=400, detail="인증 코드가 일치하지 않습니다.")
-
-    return {"message": "인증에 성공했습니다."}
+    raise HTTPException(status_code=400, detail="인증 코드가 일치하지 않습니다.")
 
 
 async def generate_temporary_password(engine: AIOEngine, user: User, length=8):
@@ -135,28 +161,13 @@ async def generate_temporary_password(engine: AIOEngine, user: User, length=8):
     temporary_password = "".join(secrets.choice(characters) for _ in range(length))
 
     # 암호화하여 DB에 저장
-    user.password = pwd_context.hash(temporary_password)
-    await engine.save(user)
+    await set_user_fields(engine, user, {"password": await password_hasher.hash(temporary_password)})
+    principal_cache.invalidate_user(user.email)
     return temporary_password
 
 
-SMTP_USER = os.getenv("SMTP_USER")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
-
-
-async def send_email_verification(email: str, content: str):
-    # SMTP 서버 설정
-    smtp_server = "smtp.gmail.com"
-    smtp_port = 587
-    smtp_user = SMTP_USER
-    smtp_password = SMTP_PASSWORD
-
-    # 이메일 메시지 설정
-    msg = MIMEMultipart()
-    msg["From"] = "Cinemate"
-    msg["To"] = email
-    msg["Subject"] = "Cinemate 회원가입을 위한 이메일 인증"
-
+async def send_email_verification(engine: AIOEngine, email: str, content: str):
+    # 메일은 outbox에 저장만 하고 전송은 백그라운드 워커가 담당
     body_text = f"Cinemate 회원가입 ."
     body_html = f"""
     <html>
@@ -172,37 +183,17 @@ async def send_email_verification(email: str, content: str):
     </body>
     </html>
     """
+    return await email_outbox.enqueue(
+        engine,
+        to=email,
+        subject="Cinemate 회원가입을 위한 이메일 인증",
+        kind="verification",
+        body_text=body_text,
+        body_html=body_html,
+    )
 
-    # MIME 타입 설정
-    msg.attach(MIMEText(body_text, "plain"))
-    msg.attach(MIMEText(body_html, "html"))
-
-    try:
-        # SMTP 서버 연결 및 이메일 전송
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_password)
-            server.sendmail(msg["From"], msg["To"], msg.as_string())
-        print("이메일 전송 성공")
-        return True
-    except Exception as e:
-        print(f"이메일 전송 오류: {e}")
-        return None
-
-
-async def send_reset_email(email: str, content: str):
-    # SMTP 서버 설정
-    smtp_server = "smtp.gmail.com"
-    smtp_port = 587
-    smtp_user = SMTP_USER
-    smtp_password = SMTP_PASSWORD
-
-    # 이메일 메시지 설정
-    msg = MIMEMultipart()
-    msg["From"] = "Cinemate"
-    msg["To"] = email
-    msg["Subject"] = "Cinemate 임시 비밀번호 발급 안내"
 
+async def send_reset_email(engine: AIOEngine, email: str, content: str):
     body_text = f"요청한 임시 비밀번호입니다. 로그인 후 비밀번호를 변경하세요."
     body_html = f"""
     <html>
@@ -218,82 +209,210 @@ async def send_reset_email(email: str, content: str):
     </body>
     </html>
     """
+    return await email_outbox.enqueue(
+        engine,
+        to=email,
+        subject="Cinemate 임시 비밀번호 발급 안내",
+        kind="password_reset",
+        body_text=body_text,
+        body_html=body_html,
+    )
 
-    # MIME 타입 설정
-    msg.attach(MIMEText(body_text, "plain"))
-    msg.attach(MIMEText(body_html, "html"))
 
-    try:
-        # SMTP 서버 연결 및 이메일 전송
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_password)
-            server.sendmail(msg["From"], msg["To"], msg.as_string())
-        print("이메일 전송 성공")
-        return True
-    except Exception as e:
-        print(f"이메일 전송 오류: {e}")
-        return None
+FOLLOW_PROJECTION = {"nickname": 1, "email": 1}
+# 시작 시 follow 컬렉션 복구에서 한 번에 확인/쓰기하는 관계 수
+FOLLOW_SYNC_BATCH_SIZE = int(os.getenv("FOLLOW_SYNC_BATCH_SIZE", "1000"))
 
 
-async def add_follow(engine: AIOEngine, id: str, follow_id: str):
+async def _set_follow(engine: AIOEngine, id: str, follow_id: str, follow: bool):
+    """팔로우/언팔로우를 조건부 $addToSet/$pull 한 번으로 처리
+
+    전체 문서를 읽고 다시 저장하지 않으므로 같은 유저의 동시 요청에도 변경이 유실되지 않는다.
+    MongoDB의 단일 문서 update는 다른 문서(팔로우 대상)를 조건으로 쓸 수 없고 응답에 대상 닉네임이 필요하므로
+    대상 조회는 따로 한다. 조건(이미 팔로우 중/팔로우 중이 아님)에 맞지 않을 때만 유저 존재 여부를 한 번 더 조회한다.
+    """
     userId = ObjectId(id)
     followingId = ObjectId(follow_id)
-    # 현재 사용자를 찾기 위해 nickname으로 조회
-    user = await engine.find_one(User, User.id == userId)
-    if not user:
-        return {"error": "해당 id를 가진 사용자를 찾을 수 없습니다."}
+    users = engine.get_collection(User)
 
-    # 팔로우할 사용자를 찾기 위해 following_nickname으로 조회
-    following_user = await engine.find_one(User, User.id == followingId)
+    # 팔로우할 사용자 존재 확인
+    following_user = await users.find_one({"_id": followingId}, FOLLOW_PROJECTION)
+    if not following_user:
+        return None, None, False
+
+    if follow:
+        # following이 null/없음인 기존 문서는 $addToSet이 실패하므로 배열인 경우만 조건에 맞춤
+        condition, update = {"$ne": followingId, "$type": "array"}, {"$addToSet": {"following": followingId}}
+    else:
+        condition, update = followingId, {"$pull": {"following": followingId}}
+    user = await users.find_one_and_update(
+        {"_id": userId, "following": condition}, update, projection=FOLLOW_PROJECTION
+    )
+    if user is None and follow:
+        user = await users.find_one_and_update(
+            {"_id": userId, "following": None}, {"$set": {"following": [followingId]}}, projection=FOLLOW_PROJECTION
+        )
+    changed = user is not None
+    if changed:
+        principal_cache.invalidate_user(user["email"])
+        feed_cache.invalidate_user(id)
+    else:
+        user = await users.find_one({"_id": userId}, FOLLOW_PROJECTION)
+        if not user:
+            return None, following_user, False
+
+    # 역방향 인덱스(follow 컬렉션)는 following 변경 후 따로 쓰므로 그 사이에 실패하면 둘이 어긋날 수 있음.
+    # 변경 여부와 관계없이 항상 맞춰 두므로 같은 요청을 다시 보내면 복구되고,
+    # 앱 시작 시 sync_follow_edges가 following 기준으로 빠진 관계는 추가하고 남은 관계는 삭제함
+    edges = engine.get_collection(Follow)
+    if follow:
+        await edges.update_one(
+            {"follower": userId, "followee": followingId},
+            {"$setOnInsert": {"created_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    else:
+        await edges.delete_one({"follower": userId, "followee": followingId})
+    return user, following_user, changed
+
+
+def _check_follow_ids(id: str, follow_id: str):
+    if not ObjectId.is_valid(id) or not ObjectId.is_valid(follow_id):
+        return {"error": "올바른 유저 id가 아닙니다."}
+    if id == follow_id:
+        return {"error": "자기 자신은 팔로우할 수 없습니다."}
+    return None
+
+
+async def add_follow(engine: AIOEngine, id: str, follow_id: str):
+    error = _check_follow_ids(id, follow_id)
+    if error:
+        return error
+    user, following_user, changed = await _set_follow(engine, id, follow_id, follow=True)
     if not following_user:
         return {"error": "해당 following_id를 가진 사용자를 찾을 수 없습니다."}
+    if not user:
+        return {"error": "해당 id를 가진 사용자를 찾을 수 없습니다."}
 
     # 이미 팔로우하고 있는지 확인
-    if user.following and followingId in user.following:
+    if not changed:
         return {
-            "message": f"유저 {user.nickname}가 이미 {following_user.nickname}를 팔로우 중 입니다."
+            "message": f"유저 {user['nickname']}가 이미 {following_user['nickname']}를 팔로우 중 입니다."
         }
 
-    if user.following:
-        user.following.append(followingId)
-    else:
-        user.following = [followingId]
-    await engine.save(user)
-
     return {
-        "message": f"{user.nickname} 유저가 {following_user.nickname} 유저를 팔로우 합니다.",
-        "user": user.nickname,
-        "f_user": following_user.nickname,
+        "message": f"{user['nickname']} 유저가 {following_user['nickname']} 유저를 팔로우 합니다.",
+        "user": user["nickname"],
+        "f_user": following_user["nickname"],
     }
 
 
 async def delete_follow(engine: AIOEngine, id: str, follow_id: str):
-    userId = ObjectId(id)
-    followingId = ObjectId(follow_id)
-
-    user = await engine.find_one(User, User.id == userId)
-    if not user:
-        return {"error": "해당 id를 가진 사용자를 찾을 수 없습니다."}
-
-    following_user = await engine.find_one(User, User.id == followingId)
+    error = _check_follow_ids(id, follow_id)
+    if error:
+        return error
+    user, following_user, changed = await _set_follow(engine, id, follow_id, follow=False)
     if not following_user:
         return {"error": "해당 following_id를 가진 사용자를 찾을 수 없습니다."}
+    if not user:
+        return {"error": "해당 id를 가진 사용자를 찾을 수 없습니다."}
 
-    if not user.following or followingId not in user.following:
+    if not changed:
         return {
-            "message": f"유저 {user.nickname}가 유저 {following_user.nickname}를 팔로우 중이 아닙니다."
+            "message": f"유저 {user['nickname']}가 유저 {following_user['nickname']}를 팔로우 중이 아닙니다."
         }
-    user.following.remove(followingId)
-
-    await engine.save(user)
     return {
-        "message": f"유저 {user.nickname}가 유저 {following_user.nickname}를 언팔로우 합니다.",
-        "user": user.nickname,
-        "f_user": following_user.nickname,
+        "message": f"유저 {user['nickname']}가 유저 {following_user['nickname']}를 언팔로우 합니다.",
+        "user": user["nickname"],
+        "f_user": following_user["nickname"],
     }
 
 
+async def list_follows(engine: AIOEngine, user_id: str, direction: str, offset: int = 0, limit: int = 20):
+    """follow 컬렉션에서 팔로워(followers) 또는 팔로잉(following) 목록을 최신순으로 페이지 조회"""
+    userId = ObjectId(user_id)
+    key, other = ("followee", "follower") if direction == "followers" else ("follower", "followee")
+    edges = engine.get_collection(Follow)
+    total = await edges.count_documents({key: userId})
+    page = await edges.find({key: userId}, {other: 1, "created_at": 1}).sort(
+        "created_at", -1
+    ).skip(offset).limit(limit).to_list(length=limit)
+
+    ids = [edge[other] for edge in page]
+    users = {
+        doc["_id"]: doc
+        async for doc in engine.get_collection(User).find(
+            {"_id": {"$in": ids}}, {"nickname": 1, "profile": 1}
+        )
+    }
+    items = [
+        {
+            "id": str(edge[other]),
+            "nickname": users[edge[other]].get("nickname"),
+            "profile": users[edge[other]].get("profile"),
+            "followed_at": edge["created_at"],
+        }
+        for edge in page
+        if edge[other] in users
+    ]
+    return {"user_id": user_id, "total": total, "offset": offset, "limit": limit, "items": items}
+
+
+async def sync_follow_edges(engine: AIOEngine, batch_size: int = FOLLOW_SYNC_BATCH_SIZE) -> int:
+    """User.following 배열(원본)에 맞춰 follow 컬렉션을 양방향으로 복구하고 추가/삭제한 관계 수를 반환
+
+    - following에는 있는데 follow 컬렉션에 없는 관계는 추가
+    - follow 컬렉션에는 있는데 following에 없는 관계(탈퇴한 유저 포함)는 삭제
+    실행 중 들어온 팔로우/언팔로우를 되돌리지 않도록 쓰기 직전에 유저 문서를 다시 확인하고,
+    실행 이후 만들어진 관계는 삭제하지 않는다.
+    """
+    users = engine.get_collection(User)
+    edges = engine.get_collection(Follow)
+    started_at = datetime.utcnow()
+
+    # 관계를 하나씩 지워 가며 남은 것이 follow 컬렉션에 없는 관계
+    following = {}
+    async for doc in users.find({"following.0": {"$exists": True}}, {"following": 1}):
+        following[doc["_id"]] = set(doc["following"])
+    candidates = []  # (follower, followee, 추가 여부)
+    async for edge in edges.find({}, {"follower": 1, "followee": 1, "created_at": 1}):
+        followees = following.get(edge["follower"])
+        if followees is not None and edge["followee"] in followees:
+            followees.discard(edge["followee"])
+        elif edge.get("created_at", datetime.min) < started_at:
+            candidates.append((edge["follower"], edge["followee"], False))
+    for follower, followees in following.items():
+        candidates.extend((follower, followee, True) for followee in followees)
+
+    repaired = 0
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        current = {
+            doc["_id"]: set(doc.get("following") or [])
+            async for doc in users.find({"_id": {"$in": list({follower for follower, _, _ in batch})}}, {"following": 1})
+        }
+        now = datetime.utcnow()
+        requests = []
+        for follower, followee, add in batch:
+            # 목록을 만든 뒤 팔로우 상태가 바뀌었으면 그 요청이 follow 컬렉션도 맞춤
+            if add != (followee in current.get(follower, ())):
+                continue
+            if add:
+                requests.append(
+                    UpdateOne(
+                        {"follower": follower, "followee": followee},
+                        {"$setOnInsert": {"created_at": now}},
+                        upsert=True,
+                    )
+                )
+            else:
+                requests.append(DeleteOne({"follower": follower, "followee": followee}))
+        if requests:
+            await edges.bulk_write(requests, ordered=False)
+            repaired += len(requests)
+    return repaired
+
+
 async def get_user_info_from_follow_id(engine: AIOEngine, follow_id: str):
     user = await engine.find_one(User, User.id == ObjectId(follow_id))
     return {
@@ -302,9 +421,129 @@ async def get_user_info_from_follow_id(engine: AIOEngine, follow_id: str):
     }
 
 
+# 공개 프로필 조회 시 불러올 필드 (password/email은 읽지 않음)
+USER_PROFILE_PROJECTION = {"nickname": 1, "profile": 1, "movie_list": 1}
+USER_BATCH_MAX_IDS = int(os.getenv("USER_BATCH_MAX_IDS", "500"))
+
+
+async def fetch_user_profiles(engine: AIOEngine, user_ids: List[str]):
+    """요청 순서대로 공개 프로필 목록과 없는(또는 형식이 잘못된) id 목록을 반환 (중복 id는 한 번만 포함)"""
+    unique_ids = list(dict.fromkeys(user_ids))
+    valid_ids = [user_id for user_id in unique_ids if ObjectId.is_valid(user_id)]
+
+    profiles, to_fetch = profile_cache.get_many(valid_ids)
+    if to_fetch:
+        fetched = {}
+        async for doc in engine.get_collection(User).find(
+            {"_id": {"$in": [ObjectId(user_id) for user_id in to_fetch]}}, USER_PROFILE_PROJECTION
+        ):
+            fetched[str(doc["_id"])] = {
+                "id": str(doc["_id"]),
+                "nickname": doc.get("nickname"),
+                "profile": doc.get("profile"),
+                "movie_list": doc.get("movie_list") or [],
+            }
+        profile_cache.set_many(fetched)
+        profiles.update(fetched)
+
+    users = [profiles[user_id] for user_id in unique_ids if user_id in profiles]
+    missing_ids = [user_id for user_id in unique_ids if user_id not in profiles]
+    return users, missing_ids
+
+
 async def update_movie_list(engine: AIOEngine, user: User, new_movie_list: List[int]):
-    # 기존 영화 목록을 새 목록으로 교체
-    user.movie_list = new_movie_list
-    # 업데이트된 사용자 객체 저장
-    await engine.save(user)
+    # 기존 영화 목록을 새 목록으로 교체 (캐시된 사용자일 수 있으므로 movie_list만 저장)
+    if not await set_user_fields(engine, user, {"movie_list": new_movie_list}):
+        return None
+    principal_cache.invalidate_user(user.email)
+    profile_cache.invalidate(str(user.id))
+    # 이 유저를 팔로우하는 유저들의 피드 캐시 제거
+    feed_cache.invalidate_friend(str(user.id))
+    # 실시간 유사도 엔진에 변경된 행만 반영
+    # (시작 시 전체 재계산 중이면 보관했다가 끝난 뒤 반영)
+    if LIVE_SIMILARITY_ENABLED:
+        await run_in_threadpool(similarity_engine.submit, str(user.id), user.movie_list)
     return user
+
+
+async def fetch_user_feed(engine: AIOEngine, user_id: ObjectId, offset: int = 0, limit: int = 20):
+    """팔로우 중인 유저들의 영화 목록을 한 번의 aggregation으로 모아 영화별로 중복 제거 후 페이지 조회
+
+    많은 친구가 담은 영화부터 정렬하고, 현재 페이지의 영화만 Movie 컬렉션에서 카드 정보를 붙인다.
+    """
+    users = engine.get_collection(User)
+    movie_card_fields = {
+        f"movie.{field}": value for field, value in MOVIE_CARD_PROJECTION.items() if field != "_id"
+    }
+    pipeline = [
+        {"$match": {"_id": user_id}},
+        {"$project": {"following": 1}},
+        {
+            "$lookup": {
+                "from": users.name,
+                "localField": "following",
+                "foreignField": "_id",
+                "as": "friends",
+            }
+        },
+        {"$unwind": "$friends"},
+        {
+            "$project": {
+                "_id": 0,
+                "friend": {
+                    "id": "$friends._id",
+                    "nickname": "$friends.nickname",
+                    "profile": "$friends.profile",
+                },
+                "movie_list": "$friends.movie_list",
+            }
+        },
+        {"$unwind": "$movie_list"},
+        {"$group": {"_id": "$movie_list", "users": {"$addToSet": "$friend"}}},
+        {"$addFields": {"count": {"$size": "$users"}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {
+            "$facet": {
+                "total": [{"$count": "count"}],
+                "items": [
+                    {"$skip": offset},
+                    {"$limit": limit},
+                    {
+                        "$lookup": {
+                            "from": engine.get_collection(Movie).name,
+                            "localField": "_id",
+                            "foreignField": "movie_id",
+                            "as": "movie",
+                        }
+                    },
+                    {"$addFields": {"movie": {"$arrayElemAt": ["$movie", 0]}}},
+                    {"$project": {"users": 1, **movie_card_fields}},
+                ],
+            }
+        },
+    ]
+    result = await users.aggregate(pipeline).to_list(length=1)
+    facet = result[0] if result else {"total": [], "items": []}
+
+    items, missing_ids = [], []
+    for doc in facet["items"]:
+        if not doc.get("movie"):
+            missing_ids.append(doc["_id"])
+            continue
+        items.append(
+            {
+                "movie": format_movie_card(doc["movie"]),
+                "users": [
+                    {"id": str(friend["id"]), "nickname": friend.get("nickname"), "profile": friend.get("profile")}
+                    for friend in doc["users"]
+                ],
+            }
+        )
+    return {
+        "user_id": str(user_id),
+        "total": facet["total"][0]["count"] if facet["total"] else 0,
+        "offset": offset,
+        "limit": limit,
+        "items": items,
+        "missing_ids": missing_ids,
+    }
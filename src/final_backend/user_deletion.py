@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import List, Optional
+from odmantic import AIOEngine, ObjectId
+from pymongo import UpdateOne
+from starlette.concurrency import run_in_threadpool
+from src.final_backend.models import User, Follow, ChatCollection, UserDeletionJob
+from src.final_backend.schema import OBJECT_ID_PATTERN
+from src.final_backend.auth_cache import principal_cache
+from src.final_backend.feed_cache import feed_cache
+from src.final_backend.profile_cache import profile_cache
+from src.final_backend.profile_images import profile_image_store
+from src.final_backend.similarity_engine import similarity_engine, LIVE_SIMILARITY_ENABLED
+
+USER_DELETION_MAX_ATTEMPTS = int(os.getenv("USER_DELETION_MAX_ATTEMPTS", "5"))
+USER_DELETION_RETRY_BASE_SECONDS = float(os.getenv("USER_DELETION_RETRY_BASE_SECONDS", "2"))
+
+
+async def register_chat_collection(engine: AIOEngine, name: str, member_ids: List[str]):
+    # 채팅 서버가 채팅방 컬렉션을 만들 때 참여 유저와 함께 등록
+    await engine.get_collection(ChatCollection).update_one(
+        {"name": name},
+        {"$addToSet": {"members": {"$each": [ObjectId(member_id) for member_id in member_ids]}}},
+        upsert=True,
+    )
+
+
+async def sync_chat_registry(engine: AIOEngine, chat_engine: AIOEngine) -> int:
+    """chat 데이터베이스의 기존 컬렉션을 이름에 들어 있는 유저 id로 등록 (여러 번 실행해도 안전)
+
+    채팅 DB 전체 이름 스캔은 앱 시작 시 여기서 한 번만 하고, 탈퇴 시에는 레지스트리만 조회한다.
+    """
+    requests = []
+    for name in await chat_engine.database.list_collection_names():
+        # 채팅방 컬렉션 이름에 들어 있는 유저 ObjectId
+        members = [ObjectId(member_id) for member_id in OBJECT_ID_PATTERN.findall(name)]
+        if members:
+            requests.append(
+                UpdateOne(
+                    {"name": name},
+                    {"$addToSet": {"members": {"$each": members}}},
+                    upsert=True,
+                )
+            )
+    if requests:
+        await engine.get_collection(ChatCollection).bulk_write(requests, ordered=False)
+    return len(requests)
+
+
+async def _delete_user_document(engine, chat_engine, job: UserDeletionJob):
+    result = await engine.get_collection(User).delete_one({"_id": job.user_id})
+    return result.deleted_count
+
+
+async def _pull_following(engine, chat_engine, job: UserDeletionJob):
+    # 다른 유저의 `following` 리스트에서 한 번에 제거
+    result = await engine.get_collection(User).update_many(
+        {"following": job.user_id}, {"$pull": {"following": job.user_id}}
+    )
+    return result.modified_count
+
+
+async def _delete_follow_edges(engine, chat_engine, job: UserDeletionJob):
+    result = await engine.get_collection(Follow).delete_many(
+        {"$or": [{"follower": job.user_id}, {"followee": job.user_id}]}
+    )
+    return result.deleted_count
+
+
+async def _drop_chat_collections(engine, chat_engine, job: UserDeletionJob):
+    # 레지스트리에 등록된 유저의 채팅방만 삭제 (없는 컬렉션 drop은 아무 일도 하지 않음)
+    registry = engine.get_collection(ChatCollection)
+    names = sorted({doc["name"] async for doc in registry.find({"members": job.user_id}, {"name": 1})})
+    for name in names:
+        await chat_engine.database[name].drop()
+    await registry.delete_many({"name": {"$in": names}})
+    return len(names)
+
+
+async def _remove_profile_image(engine, chat_engine, job: UserDeletionJob):
+    # 다른 유저가 같은 이미지를 쓰지 않을 때만 원본과 썸네일 삭제
+    return await profile_image_store.remove_if_unreferenced(engine, job.profile)
+
+
+async def _remove_from_similarity(engine, chat_engine, job: UserDeletionJob):
+    # 전체 재계산 중이면 보관했다가 끝난 뒤 반영
+    if LIVE_SIMILARITY_ENABLED:
+        await run_in_threadpool(similarity_engine.submit, str(job.user_id), None)
+        return 1
+    return 0
+
+
+# 순서대로 실행하며 각 단계는 다시 실행해도 결과가 같음 (완료한 단계는 재시도 시 건너뜀)
+DELETION_STEPS = [
+    ("user", _delete_user_document),
+    ("following", _pull_following),
+    ("follow_edges", _delete_follow_edges),
+    ("chat_collections", _drop_chat_collections),
+    ("profile_image", _remove_profile_image),
+    ("similarity", _remove_from_similarity),
+]
+
+
+async def start_user_deletion(engine: AIOEngine, user: User) -> UserDeletionJob:
+    """작업을 기록하고 유저 문서만 바로 삭제 (나머지 정리는 run_user_deletion에서 진행)"""
+    now = datetime.utcnow()
+    job = UserDeletionJob(
+        user_id=user.id,
+        email=user.email,
+        profile=user.profile,
+        created_at=now,
+        updated_at=now,
+    )
+    await engine.save(job)
+    await engine.delete(user)
+    principal_cache.invalidate_user(user.email)
+    feed_cache.invalidate_user(str(user.id))
+    feed_cache.invalidate_friend(str(user.id))
+    profile_cache.invalidate(str(user.id))
+    profile_image_store.forget(str(user.id))
+    job.completed_steps = ["user"]
+    job.progress = {"user": 1}
+    job.updated_at = datetime.utcnow()
+    await engine.save(job)
+    return job
+
+
+async def _run_steps(engine: AIOEngine, chat_engine: AIOEngine, job: UserDeletionJob):
+    jobs = engine.get_collection(UserDeletionJob)
+    for name, step in DELETION_STEPS:
+        if name in job.completed_steps:
+            continue
+        result = await step(engine, chat_engine, job)
+        job.completed_steps.append(name)
+        job.progress[name] = result
+        await jobs.update_one(
+            {"_id": job.id},
+            {
+                "$addToSet": {"completed_steps": name},
+                "$set": {f"progress.{name}": result, "updated_at": datetime.utcnow()},
+            },
+        )
+
+
+async def run_user_deletion(engine: AIOEngine, chat_engine: AIOEngine, job_id: ObjectId):
+    """탈퇴 정리 작업 실행, 실패 시 지수 백오프로 USER_DELETION_MAX_ATTEMPTS회까지 재시도"""
+    jobs = engine.get_collection(UserDeletionJob)
+    while True:
+        job = await engine.find_one(UserDeletionJob, UserDeletionJob.id == job_id)
+        if job is None or job.status == "done":
+            return
+        await jobs.update_one(
+            {"_id": job.id},
+            {"$set": {"status": "running", "updated_at": datetime.utcnow()}, "$inc": {"attempts": 1}},
+        )
+        attempts = job.attempts + 1
+        try:
+            await _run_steps(engine, chat_engine, job)
+        except Exception as e:
+            failed = attempts >= USER_DELETION_MAX_ATTEMPTS
+            await jobs.update_one(
+                {"_id": job.id},
+                {
+                    "$set": {
+                        "status": "failed" if failed else "pending",
+                        "last_error": str(e),
+                        "updated_at": datetime.utcnow(),
+                    }
+                },
+            )
+            logging.error(f"User deletion {job.id} failed (attempt {attempts}): {e}")
+            if failed:
+                return
+            await asyncio.sleep(USER_DELETION_RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+            continue
+        await jobs.update_one(
+            {"_id": job.id},
+            {"$set": {"status": "done", "last_error": None, "updated_at": datetime.utcnow()}},
+        )
+        return
+
+
+async def recover_user_deletions(engine: AIOEngine, chat_engine: AIOEngine):
+    """앱 시작 시 채팅방 레지스트리를 맞추고, 중단된 탈퇴 정리 작업을 이어서 실행"""
+    await sync_chat_registry(engine, chat_engine)
+    pending = await engine.find(
+        UserDeletionJob, {"status": {"$in": ["pending", "running"]}}
+    )
+    for job in pending:
+        await run_user_deletion(engine, chat_engine, job.id)
+
+
+async def get_user_deletion_job(engine: AIOEngine, job_id: str) -> Optional[UserDeletionJob]:
+    if not ObjectId.is_valid(job_id):
+        return None
+    return await engine.find_one(UserDeletionJob, UserDeletionJob.id == ObjectId(job_id))
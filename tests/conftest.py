@@ -0,0 +1,51 @@
+import asyncio
+import os
+
+import pytest
+
+# database 모듈이 import 시점에 읽는 접속 정보 (테스트는 실제 MongoDB에 연결하지 않음)
+os.environ.setdefault("DB_IP", "localhost")
+os.environ.setdefault("DB_PORT", "27017")
+os.environ.setdefault("DB_PASSWORD", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def _allow_bulk_sort():
+    # pymongo 4.9+의 UpdateOne은 bulk_write 시 sort 인자를 넘기지만 mongomock은 아직 받지 못함
+    from mongomock.collection import BulkOperationBuilder
+
+    add_update = BulkOperationBuilder.add_update
+    if getattr(add_update, "accepts_sort", False):
+        return
+
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    add_update_without_sort.accepts_sort = True
+    BulkOperationBuilder.add_update = add_update_without_sort
+
+
+@pytest.fixture
+def engine():
+    # 메모리 MongoDB(mongomock)를 쓰는 ODMantic 엔진
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from odmantic import AIOEngine
+
+    _allow_bulk_sort()
+    return AIOEngine(client=mongomock_motor.AsyncMongoMockClient(), database="test")
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from src.final_backend.auth_cache import principal_cache
+    from src.final_backend.feed_cache import feed_cache
+    from src.final_backend.profile_cache import profile_cache
+
+    yield
+    principal_cache.clear()
+    feed_cache.clear()
+    profile_cache.clear()
@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from src.final_backend.admission_control import (
+    AdmissionControlMiddleware,
+    AdmissionController,
+    RouteGate,
+    parse_routes,
+)
+from tests.conftest import run
+
+
+def test_parse_routes():
+    assert parse_routes("/user/login=8:32, /tmdb/search=4:16") == {
+        "/user/login": (8, 32),
+        "/tmdb/search": (4, 16),
+    }
+
+
+def test_gate_rejects_when_queue_is_full():
+    async def scenario():
+        gate = RouteGate("/slow", concurrency=1, max_queue=1, max_wait=1)
+        assert await gate.acquire()
+        waiter = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        assert gate.waiting == 1
+        # 실행 1 + 대기 1이 찼으므로 바로 거절
+        assert await gate.acquire() is False
+        assert gate.rejected_queue_full == 1
+
+        # 슬롯은 대기 중인 요청에게 바로 넘어감
+        gate.release()
+        assert await waiter is True
+        assert gate.active == 1 and gate.waiting == 0
+        gate.release()
+        assert gate.active == 0
+
+    run(scenario())
+
+
+def test_gate_rejects_after_max_wait():
+    async def scenario():
+        gate = RouteGate("/slow", concurrency=1, max_queue=4, max_wait=0.01)
+        assert await gate.acquire()
+        assert await gate.acquire() is False
+        assert gate.rejected_timeout == 1
+        assert gate.waiting == 0
+        gate.release()
+        assert gate.active == 0
+
+    run(scenario())
+
+
+def test_middleware_sheds_only_gated_route():
+    controller = AdmissionController({"/slow": (1, 1)}, enabled=True)
+    controller.gates["/slow"].max_wait = 5
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*(client.get("/slow") for _ in range(4)), client.get("/fast"))
+        return responses
+
+    responses = run(scenario())
+    statuses = sorted(response.status_code for response in responses[:4])
+    # 실행 1 + 대기 1만 처리하고 나머지는 503
+    assert statuses == [200, 200, 503, 503]
+    assert all(response.headers["Retry-After"] for response in responses[:4] if response.status_code == 503)
+    assert responses[4].status_code == 200
+    stats = controller.stats()["routes"]["/slow"]
+    assert stats["active"] == 0 and stats["waiting"] == 0
+    assert stats["rejected_queue_full"] == 2
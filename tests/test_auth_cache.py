@@ -0,0 +1,100 @@
+import time
+
+import httpx
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from jose import jwt
+
+from src.final_backend import password_hasher as password_hasher_module
+from src.final_backend.auth_cache import PrincipalCache, principal_cache
+from src.final_backend.database import get_engine
+from src.final_backend.models import User
+from src.final_backend.router.user_router import ALGORITHM, SECRET_KEY, user_router
+from tests.conftest import run
+
+
+@pytest.fixture
+def app(engine):
+    app = FastAPI()
+    app.include_router(user_router)
+    app.dependency_overrides[get_engine] = lambda: engine
+    return app
+
+
+def request(app, method, url, token, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, url, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+
+    return run(send())
+
+
+def create_user(engine, email, nickname):
+    user_id = ObjectId()
+    run(engine.get_collection(User).insert_one(
+        {"_id": user_id, "email": email, "nickname": nickname, "password": "x", "profile": None, "movie_list": [], "following": []}
+    ))
+    return jwt.encode({"sub": email, "exp": time.time() + 3600}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def make_user(email):
+    return User(email=email, nickname=email.split("@")[0], password="x")
+
+
+def test_info_is_served_from_cache_until_profile_changes(app, engine):
+    token = create_user(engine, "a@test.com", "before")
+    other_token = create_user(engine, "b@test.com", "other")
+    assert request(app, "POST", "/user/info", token).json()["nickname"] == "before"
+    request(app, "POST", "/user/info", other_token)
+
+    # 캐시된 동안에는 DB를 직접 바꿔도 이전 값이 보임
+    run(engine.get_collection(User).update_one({"email": "a@test.com"}, {"$set": {"nickname": "direct"}}))
+    assert request(app, "POST", "/user/info", token).json()["nickname"] == "before"
+    hits = principal_cache.stats()["hits"]
+
+    response = request(app, "PUT", "/user/update", token, json={"nickname": "after"})
+    assert response.json()["nickname"] == "after"
+    assert request(app, "POST", "/user/info", token).json()["nickname"] == "after"
+    # 다른 사용자의 토큰은 그대로 캐시에 남음
+    request(app, "POST", "/user/info", other_token)
+    assert principal_cache.stats()["hits"] == hits + 2
+
+
+def test_password_change_invalidates_cached_user(app, engine, monkeypatch):
+    async def fast_hash(password):
+        return f"hashed:{password}"
+
+    monkeypatch.setattr(password_hasher_module.password_hasher, "hash", fast_hash)
+    token = create_user(engine, "a@test.com", "user")
+    assert request(app, "POST", "/user/info", token).json()["password"] == "x"
+
+    request(app, "PUT", "/user/update", token, json={"password": "new"})
+    assert principal_cache.stats()["users"] == 0
+    assert request(app, "POST", "/user/info", token).json()["password"] == "hashed:new"
+
+
+def test_invalidate_user_drops_every_token_of_that_email():
+    cache = PrincipalCache(ttl=60, max_entries=10)
+    user, other = make_user("a@test.com"), make_user("b@test.com")
+    cache.set("t1", user)
+    cache.set("t2", user)
+    cache.set("t3", other)
+
+    cache.invalidate_user("a@test.com")
+    assert cache.get("t1") is None and cache.get("t2") is None
+    assert cache.get("t3").email == "b@test.com"
+    assert cache.stats()["users"] == 1
+
+
+def test_entry_does_not_outlive_token_expiry():
+    cache = PrincipalCache(ttl=60, max_entries=10)
+    cache.set("expired", make_user("a@test.com"), token_exp=time.time() - 1)
+    assert cache.get("expired") is None
+    assert cache.stats()["users"] == 0
+
+    # 요청마다 새 객체를 반환하므로 한 요청의 수정이 캐시에 남지 않음
+    cache.set("token", make_user("a@test.com"))
+    cache.get("token").nickname = "changed"
+    assert cache.get("token").nickname == "a"
@@ -0,0 +1,131 @@
+import smtplib
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.final_backend import email_outbox as email_outbox_module
+from src.final_backend.email_outbox import EmailOutboxWorker
+from src.final_backend.models import EmailOutbox
+from tests.conftest import run
+
+
+class FakeSession:
+    """응답을 순서대로 돌려주는 SMTP 세션 (None이면 전송 성공)"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.sent = []
+        self.connects = 0
+
+    def send_batch(self, outboxes):
+        results = []
+        for outbox in outboxes:
+            error = self.errors.pop(0) if self.errors else None
+            if error is None:
+                self.sent.append(outbox["to"])
+            results.append((outbox, error))
+        return results
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def worker():
+    worker = EmailOutboxWorker(batch_size=10)
+    yield worker
+    worker.shutdown()
+
+
+def insert_outbox(engine, to="user@test.com", **fields):
+    now = datetime.utcnow()
+    doc = {
+        "to": to, "subject": "인증번호", "kind": "verification", "body_text": "123456", "body_html": None,
+        "status": "pending", "attempts": 0, "last_error": None, "created_at": now,
+        "next_attempt_at": now, "locked_at": None, "sent_at": None, "expires_at": None,
+    }
+    doc.update(fields)
+    return run(engine.get_collection(EmailOutbox).insert_one(doc)).inserted_id
+
+
+def get_outbox(engine, outbox_id):
+    return run(engine.get_collection(EmailOutbox).find_one({"_id": outbox_id}))
+
+
+def test_sent_mail_clears_body(engine, worker):
+    outbox_id = insert_outbox(engine)
+    worker.session = FakeSession(None)
+    assert run(worker.process_batch(engine)) == 1
+
+    doc = get_outbox(engine, outbox_id)
+    assert doc["status"] == "sent"
+    assert doc["attempts"] == 1
+    assert doc["body_text"] is None and doc["body_html"] is None
+    assert doc["expires_at"] > datetime.utcnow()
+    # 보낸 메일은 다시 가져가지 않음
+    assert run(worker.process_batch(engine)) == 0
+
+
+def test_transient_error_is_retried_with_backoff(engine, worker):
+    outbox_id = insert_outbox(engine)
+    worker.session = FakeSession(smtplib.SMTPServerDisconnected("closed"), None)
+    started = datetime.utcnow()
+    run(worker.process_batch(engine))
+
+    doc = get_outbox(engine, outbox_id)
+    assert doc["status"] == "pending"
+    assert doc["attempts"] == 1
+    assert doc["last_error"] == "closed"
+    # 인증번호는 재시도를 위해 남아 있음
+    assert doc["body_text"] == "123456"
+    delay = (doc["next_attempt_at"] - started).total_seconds()
+    assert email_outbox_module.EMAIL_OUTBOX_RETRY_BASE_SECONDS <= delay < email_outbox_module.EMAIL_OUTBOX_RETRY_BASE_SECONDS + 5
+
+    # 재시도 시각 전에는 가져가지 않음
+    assert run(worker.process_batch(engine)) == 0
+    run(engine.get_collection(EmailOutbox).update_one(
+        {"_id": outbox_id}, {"$set": {"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)}}
+    ))
+    assert run(worker.process_batch(engine)) == 1
+    doc = get_outbox(engine, outbox_id)
+    assert (doc["status"], doc["attempts"], doc["body_text"]) == ("sent", 2, None)
+    assert worker.retried == 1 and worker.sent == 1
+
+
+def test_permanent_error_fails_without_retry(engine, worker):
+    outbox_id = insert_outbox(engine)
+    refused = smtplib.SMTPRecipientsRefused({"user@test.com": (550, b"no such user")})
+    worker.session = FakeSession(refused)
+    run(worker.process_batch(engine))
+
+    doc = get_outbox(engine, outbox_id)
+    assert doc["status"] == "failed"
+    assert doc["attempts"] == 1
+    assert doc["body_text"] is None
+    assert worker.failed == 1 and worker.retried == 0
+
+
+def test_gives_up_after_max_attempts(engine, worker, monkeypatch):
+    monkeypatch.setattr(email_outbox_module, "EMAIL_OUTBOX_MAX_ATTEMPTS", 3)
+    outbox_id = insert_outbox(engine, attempts=2)
+    worker.session = FakeSession(smtplib.SMTPResponseException(421, b"try later"))
+    run(worker.process_batch(engine))
+
+    doc = get_outbox(engine, outbox_id)
+    assert (doc["status"], doc["attempts"], doc["body_text"]) == ("failed", 3, None)
+
+
+def test_retry_delay_doubles_up_to_max(worker, monkeypatch):
+    monkeypatch.setattr(email_outbox_module, "EMAIL_OUTBOX_RETRY_BASE_SECONDS", 2)
+    monkeypatch.setattr(email_outbox_module, "EMAIL_OUTBOX_RETRY_MAX_SECONDS", 10)
+    assert [worker._retry_delay(attempts) for attempts in range(1, 6)] == [2, 4, 8, 10, 10]
+
+
+def test_stale_sending_mail_is_reclaimed(engine, worker):
+    long_ago = datetime.utcnow() - timedelta(seconds=email_outbox_module.EMAIL_OUTBOX_LOCK_SECONDS + 60)
+    stale_id = insert_outbox(engine, to="stale@test.com", status="sending", locked_at=long_ago)
+    insert_outbox(engine, to="locked@test.com", status="sending", locked_at=datetime.utcnow())
+    worker.session = FakeSession()
+    assert run(worker.process_batch(engine)) == 1
+    assert worker.session.sent == ["stale@test.com"]
+    assert get_outbox(engine, stale_id)["status"] == "sent"
@@ -0,0 +1,69 @@
+from bson import ObjectId
+
+from src.final_backend.feed_cache import FeedCache, feed_cache
+from src.final_backend.models import Movie, User
+from src.final_backend.user_crud import add_follow, fetch_user_feed, update_movie_list
+from tests.conftest import run
+from tests.test_follow import create_users
+from tests.test_movie_crud import movie_data
+
+
+def get_user(engine, user_id):
+    return run(engine.find_one(User, User.id == ObjectId(user_id)))
+
+
+def test_feed_groups_movies_by_friend_count(engine):
+    async def scenario():
+        await engine.get_collection(Movie).insert_many([movie_data(movie_id) for movie_id in (10, 20, 30)])
+        a, b, c = await create_users(engine, "a", "b", "c", following=[])
+        await engine.get_collection(User).update_one({"_id": ObjectId(b)}, {"$set": {"movie_list": [30, 10, 99]}})
+        await engine.get_collection(User).update_one({"_id": ObjectId(c)}, {"$set": {"movie_list": [10, 20]}})
+        await engine.get_collection(User).update_one(
+            {"_id": ObjectId(a)}, {"$set": {"following": [ObjectId(b), ObjectId(c)], "movie_list": [20]}}
+        )
+
+        feed = await fetch_user_feed(engine, ObjectId(a))
+        # 두 친구가 담은 영화가 먼저, 같은 수면 movie_id 순 (본인 목록은 포함하지 않음)
+        assert feed["total"] == 4
+        assert [item["movie"]["movie_id"] for item in feed["items"]] == [10, 20, 30]
+        assert sorted(user["nickname"] for user in feed["items"][0]["users"]) == ["b", "c"]
+        assert feed["items"][1]["users"] == [{"id": c, "nickname": "c", "profile": None}]
+        assert feed["missing_ids"] == [99]
+
+        page = await fetch_user_feed(engine, ObjectId(a), offset=1, limit=1)
+        assert (page["total"], [item["movie"]["movie_id"] for item in page["items"]]) == (4, [20])
+
+    run(scenario())
+
+
+def test_friend_movie_change_invalidates_only_dependent_feeds(engine):
+    a, b, c = run(create_users(engine, "a", "b", "c", following=[]))
+    feed_cache.set(a, [b], 0, 20, {"items": ["a"]})
+    feed_cache.set(c, [], 0, 20, {"items": ["c"]})
+
+    run(update_movie_list(engine, get_user(engine, b), [1, 2]))
+    assert feed_cache.get(a, 0, 20) is None
+    assert feed_cache.get(c, 0, 20) == {"items": ["c"]}
+
+
+def test_follow_invalidates_own_feed(engine):
+    a, b = run(create_users(engine, "a", "b", following=[]))
+    feed_cache.set(a, [], 0, 20, {"items": []})
+    run(add_follow(engine, a, b))
+    assert feed_cache.get(a, 0, 20) is None
+
+
+def test_pages_share_one_entry_per_user():
+    cache = FeedCache(ttl=60, max_users=10)
+    cache.set("a", ["b"], 0, 20, {"page": 1})
+    cache.set("a", ["b"], 20, 20, {"page": 2})
+    assert cache.stats()["pages"] == 2
+
+    # 팔로잉 목록이 바뀐 채로 저장하면 이전 페이지는 버리고 역색인도 새 목록으로 교체
+    cache.set("a", ["c"], 0, 20, {"page": 1})
+    assert cache.get("a", 20, 20) is None
+    cache.invalidate_friend("b")
+    assert cache.get("a", 0, 20) == {"page": 1}
+    cache.invalidate_friend("c")
+    assert cache.get("a", 0, 20) is None
+    assert cache.stats()["invalidations"] == 1
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+
+from src.final_backend.models import Follow, User
+from src.final_backend.user_crud import add_follow, delete_follow, sync_follow_edges
+from tests.conftest import run
+
+
+async def create_users(engine, *nicknames, **fields):
+    users = engine.get_collection(User)
+    ids = []
+    for nickname in nicknames:
+        result = await users.insert_one(
+            {"email": f"{nickname}@test.com", "nickname": nickname, "password": "x", **fields}
+        )
+        ids.append(str(result.inserted_id))
+    return ids
+
+
+async def following_of(engine, user_id):
+    user = await engine.find_one(User, User.id == ObjectId(user_id))
+    return [str(followee) for followee in user.following or []]
+
+
+def test_follow_and_unfollow(engine):
+    async def scenario():
+        a, b = await create_users(engine, "a", "b", following=[])
+        assert "user" in await add_follow(engine, a, b)
+        assert await following_of(engine, a) == [b]
+        assert await engine.get_collection(Follow).count_documents({}) == 1
+
+        # 이미 팔로우 중이면 변경 없음
+        assert "user" not in await add_follow(engine, a, b)
+        assert await following_of(engine, a) == [b]
+
+        assert "user" in await delete_follow(engine, a, b)
+        assert await following_of(engine, a) == []
+        assert await engine.get_collection(Follow).count_documents({}) == 0
+        assert "user" not in await delete_follow(engine, a, b)
+
+    run(scenario())
+
+
+def test_self_follow_is_rejected(engine):
+    async def scenario():
+        (a,) = await create_users(engine, "a", following=[])
+        assert "error" in await add_follow(engine, a, a)
+        assert await following_of(engine, a) == []
+        assert await engine.get_collection(Follow).count_documents({}) == 0
+
+    run(scenario())
+
+
+def test_follow_with_null_following(engine):
+    async def scenario():
+        (a,) = await create_users(engine, "a", following=None)
+        (b,) = await create_users(engine, "b")
+        assert "user" in await add_follow(engine, a, b)
+        assert await following_of(engine, a) == [b]
+
+    run(scenario())
+
+
+def test_unknown_or_malformed_ids(engine):
+    async def scenario():
+        (a,) = await create_users(engine, "a", following=[])
+        assert "error" in await add_follow(engine, a, "0" * 24)
+        assert "error" in await add_follow(engine, "not-an-id", a)
+
+    run(scenario())
+
+
+def test_concurrent_follows_are_not_lost(engine):
+    async def scenario():
+        a, *others = await create_users(engine, "a", "b", "c", "d", "e", following=[])
+        await asyncio.gather(*(add_follow(engine, a, other) for other in others))
+        assert sorted(await following_of(engine, a)) == sorted(others)
+        assert await engine.get_collection(Follow).count_documents({"follower": ObjectId(a)}) == 4
+
+    run(scenario())
+
+
+async def edges_of(engine):
+    return sorted([
+        (str(edge["follower"]), str(edge["followee"]))
+        async for edge in engine.get_collection(Follow).find({})
+    ])
+
+
+def test_sync_repairs_missing_and_stale_edges(engine):
+    async def scenario():
+        a, b, c = await create_users(engine, "a", "b", "c", following=[])
+        await add_follow(engine, a, b)
+        await add_follow(engine, b, c)
+        follows = engine.get_collection(Follow)
+        # following 변경 후 follow 컬렉션 쓰기 전에 중단된 경우
+        await engine.get_collection(User).update_one({"_id": ObjectId(a)}, {"$push": {"following": ObjectId(c)}})
+        await engine.get_collection(User).update_one({"_id": ObjectId(b)}, {"$pull": {"following": ObjectId(c)}})
+        # 탈퇴한 유저의 관계
+        await follows.insert_one({"follower": ObjectId(), "followee": ObjectId(a), "created_at": datetime(2024, 1, 1)})
+
+        assert await sync_follow_edges(engine, batch_size=2) == 3
+        assert await edges_of(engine) == [(a, b), (a, c)]
+        # 다시 실행해도 변경 없음
+        assert await sync_follow_edges(engine) == 0
+
+    run(scenario())
+
+
+def test_sync_keeps_edges_created_after_it_started(engine):
+    async def scenario():
+        a, b = await create_users(engine, "a", "b", following=[])
+        # sync 시작 이후 다른 요청이 만든 관계 (following 반영 전에 읽힌 경우)
+        await engine.get_collection(Follow).insert_one(
+            {"follower": ObjectId(a), "followee": ObjectId(b), "created_at": datetime(2999, 1, 1)}
+        )
+        assert await sync_follow_edges(engine) == 0
+        assert await edges_of(engine) == [(a, b)]
+
+    run(scenario())
@@ -0,0 +1,102 @@
+import asyncio
+
+from src.final_backend.index_manager import reconcile_indexes
+from src.final_backend.models import Movie
+from src.final_backend.movie_crud import bulk_upsert_movies, fetch_movies_by_ids, save_movie_to_db
+from tests.conftest import run
+
+
+def movie_data(movie_id, **fields):
+    data = {
+        "movie_id": movie_id,
+        "title": f"movie {movie_id}",
+        "original_title": f"movie {movie_id}",
+        "overview": "",
+        "poster_path": f"/{movie_id}.jpg",
+        "original_language": "en",
+        "genres": [18],
+        "release_date": "2024-01-01",
+        "cast": [{"name": "actor", "character": "role"}],
+        "director": {"name": "director"},
+    }
+    data.update(fields)
+    return data
+
+
+def test_concurrent_save_of_same_movie(engine, monkeypatch):
+    async def not_found(*args, **kwargs):
+        return None
+
+    async def scenario():
+        await reconcile_indexes(engine, models=[Movie])
+        # 모든 요청이 기존 영화 조회를 통과한 뒤 동시에 저장하는 경우
+        monkeypatch.setattr(engine, "find_one", not_found)
+        results = await asyncio.gather(*(save_movie_to_db(engine, movie_data(1)) for _ in range(3)))
+        messages = sorted(result["message"] for result in results)
+        assert sum("has been saved" in message for message in messages) == 1
+        assert sum("already exists" in message for message in messages) == 2
+        assert await engine.get_collection(Movie).count_documents({"movie_id": 1}) == 1
+
+    run(scenario())
+
+
+def test_fetch_movies_by_ids_keeps_request_order(engine):
+    async def scenario():
+        await engine.get_collection(Movie).insert_many([movie_data(movie_id) for movie_id in (1, 2, 3)])
+        movies, missing_ids = await fetch_movies_by_ids(engine, [3, 99, 1, 3, 2, 98])
+        assert [movie["movie_id"] for movie in movies] == [3, 1, 2]
+        assert missing_ids == [99, 98]
+        assert movies[0] == {
+            "movie_id": 3, "title": "movie 3", "genres": [18], "director": "director",
+            "poster_path": "/3.jpg", "cast": ["actor"],
+        }
+
+    run(scenario())
+
+
+async def items(movies):
+    for movie in movies:
+        yield movie
+
+
+def test_bulk_upsert_reports_status_per_item(engine):
+    async def scenario():
+        await reconcile_indexes(engine, models=[Movie])
+        await engine.get_collection(Movie).insert_one(movie_data(1))
+        # mongomock은 upsert 결과의 index를 upsert 순번으로 돌려주므로 새 영화를 chunk 앞쪽에 둠
+        movies = [
+            movie_data(2),
+            movie_data(1, title="renamed"),
+            {"movie_id": 3, "title": "missing fields"},
+            movie_data(4, genres="drama"),
+            "not an object",
+            movie_data(5),
+        ]
+        result = await bulk_upsert_movies(engine, items(movies), chunk_size=2)
+
+        assert (result["inserted"], result["updated"], result["rejected"], result["total"]) == (2, 1, 3, 6)
+        assert [(item["index"], item["movie_id"], item["status"]) for item in result["results"]] == [
+            (0, 2, "inserted"), (1, 1, "updated"), (2, 3, "rejected"),
+            (3, 4, "rejected"), (4, None, "rejected"), (5, 5, "inserted"),
+        ]
+        assert result["results"][2]["error"].startswith("Missing required fields: original_title")
+        assert result["results"][3]["error"] == "Invalid fields: genres"
+        assert result["results"][4]["error"] == "Movie must be a JSON object"
+        assert (await engine.get_collection(Movie).find_one({"movie_id": 1}))["title"] == "renamed"
+
+    run(scenario())
+
+
+def test_bulk_upsert_keeps_last_duplicate_in_request(engine):
+    async def scenario():
+        movies = [movie_data(1, title="first"), movie_data(2), movie_data(1, title="second")]
+        result = await bulk_upsert_movies(engine, items(movies))
+
+        assert [(item["index"], item["status"]) for item in result["results"]] == [
+            (0, "rejected"), (1, "inserted"), (2, "inserted"),
+        ]
+        assert "Duplicate movie_id" in result["results"][0]["error"]
+        docs = await engine.get_collection(Movie).find({"movie_id": 1}).to_list(None)
+        assert [doc["title"] for doc in docs] == ["second"]
+
+    run(scenario())
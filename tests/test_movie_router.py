@@ -0,0 +1,126 @@
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.final_backend.database import get_engine
+from src.final_backend.models import Movie
+from src.final_backend.movie_catalog import movie_catalog
+from src.final_backend.router.movie_router import movie_router
+from tests.conftest import run
+from tests.test_movie_crud import movie_data
+
+
+@pytest.fixture
+def app(engine):
+    app = FastAPI()
+    app.include_router(movie_router)
+    app.dependency_overrides[get_engine] = lambda: engine
+    return app
+
+
+def request(app, method, url, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, url, **kwargs)
+
+    return run(send())
+
+
+def insert_movies(engine, movie_ids):
+    run(engine.get_collection(Movie).insert_many([movie_data(movie_id) for movie_id in movie_ids]))
+
+
+def test_keyset_pages_cover_catalog_in_movie_id_order(app, engine):
+    insert_movies(engine, [5, 1, 4, 2, 3])
+    pages, after = [], None
+    while True:
+        params = {"limit": 2} if after is None else {"limit": 2, "after": after}
+        body = request(app, "GET", "/movie/all", params=params).json()
+        pages.append([movie["movie_id"] for movie in body["movies"]])
+        after = body["next_after"]
+        if after is None:
+            break
+    # 마지막 페이지가 limit보다 짧으면 next_after가 없음
+    assert pages == [[1, 2], [3, 4], [5]]
+
+
+def test_page_uses_catalog_projection(app, engine):
+    insert_movies(engine, [1])
+    body = request(app, "GET", "/movie/all", params={"limit": 10}).json()
+    assert body["movies"] == [{
+        "movie_id": 1, "title": "movie 1", "original_title": "movie 1", "poster_path": "/1.jpg",
+        "genres": [18], "cast": ["actor"], "director": "director", "original_language": "en",
+    }]
+    assert body["next_after"] is None
+
+
+def test_ndjson_streams_one_movie_per_line(app, engine):
+    insert_movies(engine, [3, 1, 2])
+    response = request(app, "GET", "/movie/all", params={"format": "ndjson", "after": 1})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["movie_id"] for line in lines] == [2, 3]
+
+
+@pytest.fixture
+def catalog():
+    yield movie_catalog
+    # 다른 테스트가 이전 DB의 스냅샷을 받지 않도록 초기화
+    movie_catalog.snapshot = None
+    movie_catalog.invalidate()
+
+
+def test_full_catalog_is_served_from_snapshot_with_etag(app, engine, catalog):
+    insert_movies(engine, [2, 1])
+    first = request(app, "GET", "/movie/all")
+    assert [movie["movie_id"] for movie in first.json()["movies"]] == [1, 2]
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    # 목록이 바뀌지 않으면 DB를 다시 읽지 않고 같은 본문을 반환
+    rebuilds = catalog.rebuilds
+    insert_movies(engine, [3])
+    second = request(app, "GET", "/movie/all")
+    assert second.content == first.content
+    assert catalog.rebuilds == rebuilds
+
+    not_modified = request(app, "GET", "/movie/all", headers={"If-None-Match": f'"stale", {etag}'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+
+def test_saving_a_movie_invalidates_snapshot(app, engine, catalog):
+    insert_movies(engine, [1])
+    etag = request(app, "GET", "/movie/all").headers["etag"]
+
+    assert request(app, "POST", "/movie/save", json=movie_data(2)).status_code == 200
+    response = request(app, "GET", "/movie/all", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [movie["movie_id"] for movie in response.json()["movies"]] == [1, 2]
+
+
+def test_existing_movie_save_keeps_snapshot(app, engine, catalog):
+    insert_movies(engine, [1])
+    request(app, "GET", "/movie/all")
+    version = catalog.version
+    body = request(app, "POST", "/movie/save", json=movie_data(1)).json()
+    assert "already exists" in body["message"]
+    assert catalog.version == version
+
+
+def test_bulk_accepts_ndjson_and_rejects_bad_lines(app, engine):
+    body = "\n".join([json.dumps(movie_data(1)), "{not json", json.dumps(movie_data(2))]) + "\n"
+    response = request(app, "POST", "/movie/bulk", content=body, headers={"content-type": "application/x-ndjson"})
+    result = response.json()
+    assert (result["inserted"], result["rejected"], result["total"]) == (2, 1, 3)
+    assert result["results"][1] == {"index": 1, "movie_id": None, "status": "rejected", "error": "Movie must be a JSON object"}
+
+
+def test_bulk_rejects_non_array_json(app):
+    response = request(app, "POST", "/movie/bulk", json={"movie_id": 1})
+    assert response.status_code == 400
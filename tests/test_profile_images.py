@@ -0,0 +1,201 @@
+import hashlib
+import importlib
+import io
+import os
+
+import httpx
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI, File, UploadFile
+from starlette.datastructures import Headers
+
+from src.final_backend import profile_images
+from src.final_backend.database import get_engine
+from src.final_backend.models import User
+from src.final_backend.profile_images import (
+    PROFILE_UPLOAD_PATH,
+    ProfileImageStore,
+    UploadSizeLimitMiddleware,
+    thumbnail_path,
+)
+from tests.conftest import run
+
+BOUNDARY = "test-boundary"
+
+
+def multipart_body(data: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="a.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileImageStore(directory=str(tmp_path))
+
+
+@pytest.fixture
+def upload_app(store):
+    app = FastAPI()
+    received = []
+
+    @app.post(PROFILE_UPLOAD_PATH)
+    async def upload(file: UploadFile = File(...)):
+        received.append(len(await file.read()))
+        return {"size": received[-1]}
+
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=1024, store=store)
+    return app, received
+
+
+def post(app, content, headers):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(PROFILE_UPLOAD_PATH, content=content, headers=headers)
+
+    return run(request())
+
+
+def test_upload_under_limit_reaches_route(upload_app, store):
+    app, received = upload_app
+    response = post(app, multipart_body(b"x" * 512), {"content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+    assert response.status_code == 200
+    assert received == [512]
+    assert store.rejected == 0
+
+
+def test_content_length_over_limit_is_rejected_before_reading_body(store):
+    async def app(scope, receive, send):
+        raise AssertionError("route should not run")
+
+    async def receive():
+        raise AssertionError("body should not be read")
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = UploadSizeLimitMiddleware(app, max_bytes=1024, store=store)
+    scope = {
+        "type": "http", "method": "POST", "path": PROFILE_UPLOAD_PATH,
+        "headers": Headers({"content-length": "4096"}).raw,
+    }
+    run(middleware(scope, receive, send))
+    assert messages[0]["status"] == 413
+    assert store.rejected == 1
+
+
+def test_streamed_body_over_limit_is_rejected_while_reading(upload_app, store):
+    app, received = upload_app
+    body = multipart_body(b"x" * 4096)
+
+    async def chunks():
+        # Content-Length 없이 나눠서 전송
+        for start in range(0, len(body), 256):
+            yield body[start:start + 256]
+
+    response = post(app, chunks(), {"content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+    assert response.status_code == 413
+    assert received == []
+    assert store.rejected == 1
+
+
+def test_write_upload_caps_file_size(store, monkeypatch, tmp_path):
+    monkeypatch.setattr(profile_images, "PROFILE_IMAGE_MAX_BYTES", 1000)
+    upload = UploadFile(io.BytesIO(b"x" * 1001), filename="a.png")
+    with pytest.raises(profile_images.HTTPException) as error:
+        run(store._write_upload(upload, str(tmp_path / "tmp")))
+    assert error.value.status_code == 413
+
+    upload = UploadFile(io.BytesIO(b"x" * 1000), filename="a.png")
+    digest = run(store._write_upload(upload, str(tmp_path / "tmp")))
+    assert len(digest) == 64
+    assert (tmp_path / "tmp").read_bytes() == b"x" * 1000
+
+
+def png_bytes(color):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (200, 200), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def served_store(store, monkeypatch, engine):
+    user_router_module = importlib.import_module("src.final_backend.router.user_router")
+    monkeypatch.setattr(user_router_module, "profile_image_store", store)
+    app = FastAPI()
+    app.include_router(user_router_module.user_router)
+    app.dependency_overrides[get_engine] = lambda: engine
+    yield app, store
+    store.shutdown()
+
+
+def get(app, url, headers=None):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(url, headers=headers)
+
+    return run(request())
+
+
+def upload(store, data):
+    return run(store.save(UploadFile(io.BytesIO(data), filename="a.png")))
+
+
+def test_same_image_is_stored_once_under_content_hash(store):
+    data = png_bytes("red")
+    first = upload(store, data)
+    second = upload(store, data)
+    assert first == second
+    assert os.path.basename(first) == f"{hashlib.sha256(data).hexdigest()}.png"
+    assert (store.uploads, store.deduplicated) == (1, 1)
+    assert all(os.path.exists(thumbnail_path(first, size)) for size in profile_images.PROFILE_THUMBNAIL_SIZES)
+
+
+def test_content_hash_image_is_immutable_and_revalidates_with_etag(served_store):
+    app, store = served_store
+    path = upload(store, png_bytes("red"))
+    filename = os.path.basename(path)
+    response = get(app, f"/user/profile/image/{filename}")
+    assert response.status_code == 200
+    assert response.content == open(path, "rb").read()
+    etag = response.headers["etag"]
+    assert etag == f'"{os.path.splitext(filename)[0]}"'
+    assert response.headers["cache-control"] == profile_images.IMMUTABLE_CACHE_CONTROL
+
+    not_modified = get(app, f"/user/profile/image/{filename}", {"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert store.not_modified == 1
+    # 내용 해시 형식이 아닌 이름은 조회하지 않음
+    assert get(app, "/user/profile/image/..%2Fsecret.png").status_code == 404
+
+
+def test_profile_etag_changes_with_image_and_size(served_store, engine):
+    app, store = served_store
+    red, blue = upload(store, png_bytes("red")), upload(store, png_bytes("blue"))
+    user_id = ObjectId()
+    run(engine.get_collection(User).insert_one(
+        {"_id": user_id, "email": "a@test.com", "nickname": "a", "password": "x", "profile": red}
+    ))
+
+    response = get(app, f"/user/profile/get?id={user_id}")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == profile_images.REVALIDATE_CACHE_CONTROL
+    assert get(app, f"/user/profile/get?id={user_id}", {"If-None-Match": etag}).status_code == 304
+    thumbnail = get(app, f"/user/profile/get?id={user_id}&size=100")
+    assert thumbnail.headers["etag"] == f'"{os.path.splitext(os.path.basename(red))[0]}_128"'
+
+    # 같은 URL이어도 이미지가 바뀌면 이전 ETag로는 304가 아님
+    run(engine.get_collection(User).update_one({"_id": user_id}, {"$set": {"profile": blue}}))
+    store.forget(str(user_id))
+    changed = get(app, f"/user/profile/get?id={user_id}", {"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
@@ -0,0 +1,68 @@
+import pytest
+from fastapi import HTTPException
+
+from src.final_backend import rate_limiter as rate_limiter_module
+from src.final_backend.rate_limiter import MemoryBucketBackend, RateLimiter
+from tests.conftest import run
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_allows_burst_then_rejects(clock):
+    backend = MemoryBucketBackend()
+    results = [run(backend.consume("k", 3, 1.0))[0] for _ in range(4)]
+    assert results == [True, True, True, False]
+
+
+def test_bucket_refills_over_time(clock):
+    backend = MemoryBucketBackend()
+    for _ in range(2):
+        run(backend.consume("k", 2, 0.5))
+    assert run(backend.consume("k", 2, 0.5))[0] is False
+
+    # 0.5 토큰/초 → 2초 뒤 한 번 더 허용
+    clock.now += 2
+    assert run(backend.consume("k", 2, 0.5))[0] is True
+    assert run(backend.consume("k", 2, 0.5))[0] is False
+
+    # 오래 지나도 burst 이상으로는 쌓이지 않음
+    clock.now += 3600
+    assert [run(backend.consume("k", 2, 0.5))[0] for _ in range(3)] == [True, True, False]
+
+
+def test_buckets_are_independent_per_key(clock):
+    backend = MemoryBucketBackend()
+    assert run(backend.consume("a", 1, 1.0))[0] is True
+    assert run(backend.consume("a", 1, 1.0))[0] is False
+    assert run(backend.consume("b", 1, 1.0))[0] is True
+
+
+def test_bucket_key_count_is_bounded(clock):
+    backend = MemoryBucketBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        run(backend.consume(key, 1, 1.0))
+    assert len(backend) == 2
+
+
+def test_limiter_rejects_with_retry_after(clock):
+    limiter = RateLimiter(MemoryBucketBackend())
+    run(limiter.check("check_email:email", "a@test.com", 1, 6))
+    with pytest.raises(HTTPException) as exc:
+        run(limiter.check("check_email:email", "a@test.com", 1, 6))
+    assert exc.value.status_code == 429
+    # 분당 6개 → 토큰 하나에 10초
+    assert 1 <= int(exc.value.headers["Retry-After"]) <= 11
+    assert limiter.stats()["rejected"] == {"check_email:email": 1}
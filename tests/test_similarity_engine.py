@@ -0,0 +1,112 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.final_backend.similarity_engine import UserSimilarityEngine
+
+K = 5
+
+
+def assert_same_neighbors(incremental, rebuilt, user_ids):
+    for user_id in user_ids:
+        got = incremental.neighbors(user_id, K)
+        expected = rebuilt.neighbors(user_id, K)
+        assert [round(score, 5) for _, score in got] == [round(score, 5) for _, score in expected], user_id
+        # 마지막 점수와 동점인 이웃은 어느 쪽이 목록에 들어가도 맞으므로 그보다 높은 이웃만 비교
+        if expected:
+            boundary = round(expected[-1][1], 5)
+            assert {other for other, score in got if round(score, 5) > boundary} == {
+                other for other, score in expected if round(score, 5) > boundary
+            }, user_id
+
+
+def random_movies(rng):
+    return rng.sample(range(40), rng.randint(0, 8))
+
+
+@pytest.mark.parametrize("metric", ["cosine", "jaccard"])
+def test_incremental_updates_match_full_rebuild(metric):
+    rng = random.Random(7)
+    user_movies = {f"u{i}": random_movies(rng) for i in range(60)}
+    incremental = UserSimilarityEngine(metric=metric, k=K, compact_threshold=15)
+    incremental.rebuild(user_movies)
+
+    # 목록 변경, 신규 가입, 탈퇴를 섞어서 적용 (compact도 여러 번 일어남)
+    for step in range(200):
+        action = rng.random()
+        if action < 0.1:
+            user_id = f"new{step}"
+        else:
+            user_id = rng.choice(sorted(user_movies))
+        if action > 0.95 and len(user_movies) > 10:
+            incremental.remove_user(user_id)
+            user_movies.pop(user_id, None)
+            continue
+        user_movies[user_id] = random_movies(rng)
+        incremental.update_user(user_id, user_movies[user_id])
+
+    rebuilt = UserSimilarityEngine(metric=metric, k=K)
+    rebuilt.rebuild(user_movies)
+    assert_same_neighbors(incremental, rebuilt, sorted(user_movies))
+
+
+def test_updates_submitted_before_rebuild_are_replayed():
+    engine = UserSimilarityEngine(k=K)
+    engine.submit("a", [1, 2, 3])
+    engine.submit("gone", None)
+    assert engine.stats()["queued_updates"] == 2
+
+    # 재계산에 쓰인 목록은 submit 이전 데이터
+    engine.rebuild({"a": [9], "b": [1, 2], "gone": [1]})
+    assert engine.ready
+    assert engine.stats()["queued_updates"] == 0
+
+    rebuilt = UserSimilarityEngine(k=K)
+    rebuilt.rebuild({"a": [1, 2, 3], "b": [1, 2]})
+    assert_same_neighbors(engine, rebuilt, ["a", "b"])
+    assert engine.neighbors("gone", K) is None
+
+
+def true_similarity(metric, a, b):
+    a, b = set(a), set(b)
+    overlap = len(a & b)
+    if not overlap:
+        return 0.0
+    if metric == "jaccard":
+        return overlap / len(a | b)
+    return overlap / (len(a) * len(b)) ** 0.5
+
+
+def popular_movies(rng):
+    # 앞쪽 몇 편에 몰리는 목록 (인기 영화는 max_postings보다 많은 사용자가 봄)
+    return list({min(int(rng.paretovariate(1.0)) - 1, 59) for _ in range(rng.randint(1, 8))})
+
+
+@pytest.mark.parametrize("metric", ["cosine", "jaccard"])
+def test_sampled_candidates_keep_exact_scores(metric):
+    rng = random.Random(11)
+    user_movies = {f"u{i}": popular_movies(rng) for i in range(300)}
+    engine = UserSimilarityEngine(metric=metric, k=K, compact_threshold=20, max_postings=10, max_candidates=12)
+    engine.rebuild(user_movies)
+    assert engine.stats()["sampled_movies"] > 0
+
+    def check():
+        for user_id, movies in user_movies.items():
+            got = engine.neighbors(user_id, K)
+            scores = [score for _, score in got]
+            assert scores == sorted(scores, reverse=True)
+            # 후보는 표본에서 찾지만 목록에 있는 점수는 현재 목록 기준의 정확한 값
+            for other, score in got:
+                assert score == pytest.approx(true_similarity(metric, movies, user_movies[other]), abs=1e-5)
+        # 역색인은 재계산 이후 추가된 이웃까지 포함해 실제 이웃 목록과 일치
+        n = len(engine.user_ids)
+        for row in range(n):
+            assert set(engine._owners_of(row)) == set(np.flatnonzero((engine.nbr_ids[:n] == row).any(axis=1)))
+
+    check()
+    for step in range(150):
+        user_id = rng.choice(sorted(user_movies)) if rng.random() > 0.1 else f"new{step}"
+        user_movies[user_id] = popular_movies(rng)
+        engine.update_user(user_id, user_movies[user_id])
+    check()
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.final_backend import ttl_cache
+from src.final_backend.tmdb_cache import ResponseCache, make_cache_key
+from tests.conftest import run
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # 이벤트 루프도 time.monotonic을 쓰므로 캐시 모듈이 보는 시계만 교체
+    monkeypatch.setattr(ttl_cache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def counting_fetch(value, delay=0.0):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value
+
+    return fetch, calls
+
+
+def test_cache_key_ignores_api_key_and_normalizes_query():
+    key = make_cache_key("search", "/search/movie", {"query": " Parasite ", "api_key": "a", "page": 1})
+    assert key == make_cache_key("search", "/search/movie", {"query": "parasite", "api_key": "b", "page": 1})
+    assert key != make_cache_key("search", "/search/movie", {"query": "parasite", "page": 2})
+
+
+def test_concurrent_misses_share_one_upstream_request():
+    cache = ResponseCache(ttls={"movie": 60})
+    fetch, calls = counting_fetch({"id": 1}, delay=0.01)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_fetch("movie", "movie:1", fetch) for _ in range(5)))
+
+    assert run(scenario()) == [{"id": 1}] * 5
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["coalesced"] == 4
+    assert stats["inflight"] == 0
+
+
+def test_failed_fetch_is_not_cached():
+    cache = ResponseCache(ttls={"movie": 60})
+
+    async def broken():
+        raise RuntimeError("tmdb down")
+
+    with pytest.raises(RuntimeError):
+        run(cache.get_or_fetch("movie", "movie:1", broken))
+    fetch, calls = counting_fetch({"id": 1})
+    assert run(cache.get_or_fetch("movie", "movie:1", fetch)) == {"id": 1}
+    assert len(calls) == 1
+
+
+def test_entries_expire_after_kind_ttl(clock):
+    cache = ResponseCache(ttls={"search": 10, "movie": 100})
+    search, search_calls = counting_fetch(["result"])
+    movie, movie_calls = counting_fetch({"id": 1})
+    run(cache.get_or_fetch("search", "search:a", search))
+    run(cache.get_or_fetch("movie", "movie:1", movie))
+
+    clock.now += 11
+    run(cache.get_or_fetch("search", "search:a", search))
+    run(cache.get_or_fetch("movie", "movie:1", movie))
+    # 검색 결과만 만료돼 다시 요청
+    assert len(search_calls) == 2
+    assert len(movie_calls) == 1
+
+    clock.now += 100
+    run(cache.get_or_fetch("movie", "movie:1", movie))
+    assert len(movie_calls) == 2
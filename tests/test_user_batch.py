@@ -0,0 +1,73 @@
+import httpx
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+
+from src.final_backend.database import get_engine
+from src.final_backend.models import User
+from src.final_backend.profile_cache import profile_cache
+from src.final_backend.router.user_router import user_router
+from src.final_backend.user_crud import USER_BATCH_MAX_IDS, fetch_user_profiles, update_movie_list
+from tests.conftest import run
+from tests.test_follow import create_users
+
+
+@pytest.fixture
+def app(engine):
+    app = FastAPI()
+    app.include_router(user_router)
+    app.dependency_overrides[get_engine] = lambda: engine
+    return app
+
+
+def request(app, method, url, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, url, **kwargs)
+
+    return run(send())
+
+
+def test_profiles_keep_request_order_and_report_missing_ids(engine):
+    a, b, c = run(create_users(engine, "a", "b", "c", movie_list=[1]))
+    unknown = str(ObjectId())
+    users, missing_ids = run(fetch_user_profiles(engine, [c, unknown, a, "not-an-id", c, b]))
+
+    assert [user["nickname"] for user in users] == ["c", "a", "b"]
+    assert users[0] == {"id": c, "nickname": "c", "profile": None, "movie_list": [1]}
+    assert "password" not in users[0] and "email" not in users[0]
+    assert missing_ids == [unknown, "not-an-id"]
+
+
+def test_profiles_are_cached_until_invalidated(engine):
+    (a,) = run(create_users(engine, "a", movie_list=[1]))
+    run(fetch_user_profiles(engine, [a]))
+    run(fetch_user_profiles(engine, [a]))
+    assert profile_cache.stats()["hits"] == 1
+
+    user = run(engine.find_one(User, User.id == ObjectId(a)))
+    run(update_movie_list(engine, user, [2, 3]))
+    users, _ = run(fetch_user_profiles(engine, [a]))
+    assert users[0]["movie_list"] == [2, 3]
+
+
+def test_get_and_post_batch_return_same_result(app, engine):
+    a, b = run(create_users(engine, "a", "b"))
+    unknown = str(ObjectId())
+    by_get = request(app, "GET", "/user/batch", params=[("ids", f"{b}, {a}"), ("ids", unknown)]).json()
+    by_post = request(app, "POST", "/user/batch", json={"ids": [b, a, unknown]}).json()
+
+    assert [user["nickname"] for user in by_get["users"]] == ["b", "a"]
+    assert by_get["missing_ids"] == [unknown]
+    assert by_post == by_get
+
+
+def test_batch_rejects_more_than_max_ids(app):
+    ids = [str(ObjectId()) for _ in range(USER_BATCH_MAX_IDS + 1)]
+    response = request(app, "POST", "/user/batch", json={"ids": ids})
+    assert response.status_code == 400
+
+    response = request(app, "POST", "/user/batch", json={"ids": ids[:USER_BATCH_MAX_IDS]})
+    assert response.status_code == 200
+    assert len(response.json()["missing_ids"]) == USER_BATCH_MAX_IDS
@@ -0,0 +1,149 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from odmantic import AIOEngine
+
+from src.final_backend import user_deletion
+from src.final_backend.models import ChatCollection, Follow, User, UserDeletionJob
+from src.final_backend.user_deletion import (
+    recover_user_deletions,
+    register_chat_collection,
+    run_user_deletion,
+)
+from tests.conftest import run
+
+
+@pytest.fixture
+def chat_engine(engine):
+    return AIOEngine(client=engine.client, database="chat")
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(user_deletion, "USER_DELETION_RETRY_BASE_SECONDS", 0)
+
+
+async def create_deleted_user(engine):
+    """start_user_deletion 직후 상태: 유저 문서는 삭제되고 나머지 정리만 남은 작업"""
+    user_id, friend_id = ObjectId(), ObjectId()
+    await engine.get_collection(User).insert_one(
+        {"_id": friend_id, "email": "friend@test.com", "nickname": "friend", "password": "x", "following": [user_id]}
+    )
+    await engine.get_collection(Follow).insert_one(
+        {"follower": friend_id, "followee": user_id, "created_at": datetime.utcnow()}
+    )
+    now = datetime.utcnow()
+    result = await engine.get_collection(UserDeletionJob).insert_one({
+        "user_id": user_id, "email": "gone@test.com", "profile": None, "status": "pending",
+        "completed_steps": ["user"], "progress": {"user": 1}, "attempts": 0,
+        "last_error": None, "created_at": now, "updated_at": now,
+    })
+    return user_id, friend_id, result.inserted_id
+
+
+async def get_job(engine, job_id):
+    return await engine.find_one(UserDeletionJob, UserDeletionJob.id == job_id)
+
+
+def test_deletion_cleans_up_follows_and_registered_chats(engine, chat_engine):
+    async def scenario():
+        user_id, friend_id, job_id = await create_deleted_user(engine)
+        room = f"{user_id}_{friend_id}"
+        other_room = f"{friend_id}_{ObjectId()}"
+        for name in (room, other_room):
+            await chat_engine.database[name].insert_one({"message": "hi"})
+        await register_chat_collection(engine, room, [str(user_id), str(friend_id)])
+
+        await run_user_deletion(engine, chat_engine, job_id)
+
+        job = await get_job(engine, job_id)
+        assert job.status == "done"
+        assert job.attempts == 1
+        assert job.progress["chat_collections"] == 1
+        friend = await engine.get_collection(User).find_one({"_id": friend_id})
+        assert friend["following"] == []
+        assert await engine.get_collection(Follow).count_documents({}) == 0
+        assert await chat_engine.database.list_collection_names() == [other_room]
+        assert await engine.get_collection(ChatCollection).count_documents({}) == 0
+
+    run(scenario())
+
+
+def test_unregistered_chat_is_found_by_startup_sync(engine, chat_engine):
+    async def scenario():
+        user_id, friend_id, job_id = await create_deleted_user(engine)
+        room = f"{friend_id}_{user_id}"
+        await chat_engine.database[room].insert_one({"message": "hi"})
+
+        # 탈퇴 처리는 레지스트리만 보므로 등록되지 않은 채팅방은 남음
+        await run_user_deletion(engine, chat_engine, job_id)
+        assert await chat_engine.database.list_collection_names() == [room]
+
+        # 재시작 시 이름 스캔으로 레지스트리에 등록된 뒤 다음 탈퇴 정리에서 삭제
+        await engine.get_collection(UserDeletionJob).update_one(
+            {"_id": job_id}, {"$set": {"status": "pending", "completed_steps": ["user"]}}
+        )
+        await recover_user_deletions(engine, chat_engine)
+        assert await chat_engine.database.list_collection_names() == []
+        assert (await get_job(engine, job_id)).status == "done"
+
+    run(scenario())
+
+
+def test_failed_step_is_retried_and_completed_steps_are_skipped(engine, chat_engine, monkeypatch):
+    calls = {"following": 0, "follow_edges": 0}
+    steps = dict(user_deletion.DELETION_STEPS)
+
+    async def count_following(engine, chat_engine, job):
+        calls["following"] += 1
+        return await steps["following"](engine, chat_engine, job)
+
+    async def flaky_follow_edges(engine, chat_engine, job):
+        calls["follow_edges"] += 1
+        if calls["follow_edges"] == 1:
+            raise RuntimeError("connection reset")
+        return await steps["follow_edges"](engine, chat_engine, job)
+
+    monkeypatch.setattr(user_deletion, "DELETION_STEPS", [
+        (name, {"following": count_following, "follow_edges": flaky_follow_edges}.get(name, step))
+        for name, step in user_deletion.DELETION_STEPS
+    ])
+
+    async def scenario():
+        _, _, job_id = await create_deleted_user(engine)
+        await run_user_deletion(engine, chat_engine, job_id)
+
+        job = await get_job(engine, job_id)
+        assert job.status == "done"
+        assert job.attempts == 2
+        assert job.last_error is None
+        # 첫 시도에서 끝난 단계는 재시도에서 다시 실행하지 않음
+        assert calls == {"following": 1, "follow_edges": 2}
+        assert await engine.get_collection(Follow).count_documents({}) == 0
+
+    run(scenario())
+
+
+def test_job_fails_after_max_attempts(engine, chat_engine, monkeypatch):
+    async def broken(engine, chat_engine, job):
+        raise RuntimeError("chat database unavailable")
+
+    monkeypatch.setattr(user_deletion, "USER_DELETION_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(user_deletion, "DELETION_STEPS", [
+        (name, broken if name == "chat_collections" else step)
+        for name, step in user_deletion.DELETION_STEPS
+    ])
+
+    async def scenario():
+        _, _, job_id = await create_deleted_user(engine)
+        await run_user_deletion(engine, chat_engine, job_id)
+
+        job = await get_job(engine, job_id)
+        assert job.status == "failed"
+        assert job.attempts == 3
+        assert job.last_error == "chat database unavailable"
+        assert "follow_edges" in job.completed_steps
+        assert "chat_collections" not in job.completed_steps
+
+    run(scenario())